@@ -2,3 +2,4 @@ from .openai import (
     ChatOpenAI,
     OpenAIError,
 )
+from .verdicts import VerdictCache
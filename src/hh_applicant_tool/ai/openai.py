@@ -3,12 +3,13 @@ import logging
 import time
 from dataclasses import KW_ONLY, dataclass, field
 from email.utils import parsedate_to_datetime
-from threading import Lock
+from threading import BoundedSemaphore, Lock
 
 import requests
 from urllib3.util import Timeout
 
 from ..constants import (
+    DEFAULT_OPENAI_CONCURRENCY,
     DEFAULT_OPENAI_CONNECT_TIMEOUT,
     DEFAULT_OPENAI_TIMEOUT,
 )
@@ -43,15 +44,21 @@ class ChatOpenAI:
 
     # количество запросов в минуту (0 = отключено)
     rate_limit: int = 40
+    # Сколько запросов может ждать ответа одновременно
+    max_concurrency: int = DEFAULT_OPENAI_CONCURRENCY
 
     session: requests.Session = field(default_factory=requests.Session)
 
     # Внутренние поля для retry логики
-    _previous_request_time: float = field(default=0.0, init=False)
+    _next_request_time: float = field(default=0.0, init=False)
+    # После 429 до этого момента не отправляет запросы ни один поток
+    _paused_until: float = field(default=0.0, init=False)
     _lock: Lock = field(init=False, repr=False)
+    _slots: BoundedSemaphore = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         self._lock = Lock()
+        self._slots = BoundedSemaphore(max(self.max_concurrency, 1))
 
     def _default_headers(self) -> dict[str, str]:
         return {
@@ -62,32 +69,43 @@ class ChatOpenAI:
     def _min_request_interval(self) -> float:
         return 60.0 / self.rate_limit if self.rate_limit > 0 else 0.0
 
-    def _request(self, payload: dict) -> requests.Response:
-        """Выполнение запроса с минимальным интервалом между запросами."""
+    def _reserve(self) -> float:
+        """Занимает время отправки следующего запроса. Возвращает ожидание."""
         with self._lock:
-            if self._previous_request_time > 0:
-                delay = (
-                    self._min_request_interval
-                    - time.monotonic()
-                    + self._previous_request_time
-                )
-                if delay > 0:
-                    logger.debug("Wait %.2fs before OpenAI request", delay)
-                    time.sleep(delay)
+            now = time.monotonic()
+            start = max(now, self._next_request_time, self._paused_until)
+            self._next_request_time = start + self._min_request_interval
+            return start - now
 
-            try:
-                return self.session.post(
-                    self.base_url,
-                    json=payload,
-                    headers=self._default_headers(),
-                    # Ожидание ответа урезается на время, потраченное
-                    # на соединение
-                    timeout=Timeout(
-                        connect=self.connect_timeout, total=self.timeout
-                    ),
-                )
-            finally:
-                self._previous_request_time = time.monotonic()
+    def _pause(self, delay: float) -> None:
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + delay
+            )
+
+    def _request(self, payload: dict) -> requests.Response:
+        """Выполнение запроса с минимальным интервалом между запросами.
+
+        Блокировка держится только пока рассчитывается время отправки, сам
+        запрос идет без нее: ответа могут ждать до `max_concurrency`
+        запросов сразу.
+        """
+        with self._slots:
+            if (delay := self._reserve()) > 0:
+                logger.debug("Wait %.2fs before OpenAI request", delay)
+                time.sleep(delay)
+            # Пока ждали, другой поток мог получить 429
+            while (delay := self._paused_until - time.monotonic()) > 0:
+                time.sleep(delay)
+
+            return self.session.post(
+                self.base_url,
+                json=payload,
+                headers=self._default_headers(),
+                # Ожидание ответа урезается на время, потраченное
+                # на соединение
+                timeout=Timeout(connect=self.connect_timeout, total=self.timeout),
+            )
 
     def _get_retry_delay(
         self, response: requests.Response, attempt: int
@@ -145,7 +163,8 @@ class ChatOpenAI:
                     "OpenAI returned 429 Too Many Requests, retry in %.2fs",
                     delay,
                 )
-                time.sleep(delay)
+                # Ждут все потоки: лимит у провайдера общий
+                self._pause(delay)
                 continue
 
             try:
@@ -226,7 +245,8 @@ class ChatOpenAI:
                     "OpenAI returned 429 Too Many Requests, retry in %.2fs",
                     delay,
                 )
-                time.sleep(delay)
+                # Ждут все потоки: лимит у провайдера общий
+                self._pause(delay)
                 continue
 
             try:
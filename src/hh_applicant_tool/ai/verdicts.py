@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from ..utils.misc import calc_hash
+
+if TYPE_CHECKING:
+    from ..storage.repositories.ai_verdicts import AIVerdictsRepository
+
+__all__ = ("VerdictCache",)
+
+logger = logging.getLogger(__package__)
+
+
+# Thread-safe
+@dataclass
+class VerdictCache:
+    """Ответы AI-фильтра, сохраненные в базе профиля.
+
+    Ключ — хеш системного промпта, id вакансии и хеш отправленного текста
+    вакансии: при смене резюме, промпта или описания вакансия будет
+    оценена заново.
+    """
+
+    repository: AIVerdictsRepository
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def get(
+        self, system_prompt: str, vacancy_id: int | str, context: str
+    ) -> bool | None:
+        try:
+            with self._lock:
+                return self.repository.get_verdict(
+                    calc_hash(system_prompt), int(vacancy_id), calc_hash(context)
+                )
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось прочитать ответ AI из базы: %s", ex)
+            return None
+
+    def put(
+        self,
+        system_prompt: str,
+        vacancy_id: int | str,
+        context: str,
+        suitable: bool,
+        *,
+        model: str | None = None,
+        latency: float | None = None,
+    ) -> None:
+        try:
+            with self._lock:
+                self.repository.save(
+                    self.repository.model(
+                        prompt_hash=calc_hash(system_prompt),
+                        vacancy_id=int(vacancy_id),
+                        context_hash=calc_hash(context),
+                        suitable=suitable,
+                        model=model,
+                        latency=latency,
+                        # Иначе None в INSERT перебивает DEFAULT
+                        # CURRENT_TIMESTAMP (UTC без часового пояса)
+                        created_at=datetime.now(timezone.utc).replace(
+                            tzinfo=None
+                        ),
+                    )
+                )
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось сохранить ответ AI в базу: %s", ex)
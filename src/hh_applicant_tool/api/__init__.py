@@ -1,5 +1,13 @@
 """See <https://github.com/hhru/api>"""
 
+from .async_client import *  # noqa: F403
 from .client import *  # noqa: F403
 from .datatypes import *  # noqa: F403
+from .employer_cache import *  # noqa: F403
 from .errors import *  # noqa: F403
+from .negotiations_sync import *  # noqa: F403
+from .rate_limiter import *  # noqa: F403
+from .reference import *  # noqa: F403
+from .search_shards import *  # noqa: F403
+from .token_broker import *  # noqa: F403
+from .vacancy_details import *  # noqa: F403
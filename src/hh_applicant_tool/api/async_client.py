@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import KW_ONLY, dataclass, field
+from typing import Any, TypeVar
+
+from . import errors
+from .client import AllowedMethods, ApiClient
+from .datatypes import AccessToken
+
+__all__ = ("AsyncApiClient",)
+
+DEFAULT_CONCURRENCY = 4
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__package__)
+
+
+@dataclass
+class AsyncApiClient:
+    """Асинхронная обертка над `ApiClient`.
+
+    Разделяет с синхронным клиентом сессию, токены и ограничитель частоты,
+    поэтому оба клиента можно использовать одновременно. Запросы,
+    прошедшие ограничитель, выполняются параллельно, но не более
+    `max_concurrency` одновременно. HTTP-вызов уходит в пул потоков, так
+    как у `requests` нет асинхронного API.
+    """
+
+    client: ApiClient
+    _: KW_ONLY
+    max_concurrency: int = DEFAULT_CONCURRENCY
+    _semaphore: asyncio.Semaphore | None = field(
+        default=None, init=False, repr=False
+    )
+    _refresh_lock: asyncio.Lock | None = field(
+        default=None, init=False, repr=False
+    )
+    _loop: asyncio.AbstractEventLoop | None = field(
+        default=None, init=False, repr=False
+    )
+
+    def _bind_loop(self) -> None:
+        # Примитивы asyncio привязаны к циклу событий, а клиент живет
+        # дольше одного asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(max(self.max_concurrency, 1))
+            self._refresh_lock = asyncio.Lock()
+
+    @property
+    def access_token(self) -> str | None:
+        return self.client.access_token
+
+    @property
+    def refresh_token(self) -> str | None:
+        return self.client.refresh_token
+
+    @property
+    def access_expires_at(self) -> int:
+        return self.client.access_expires_at
+
+    @property
+    def is_access_expired(self) -> bool:
+        return self.client.is_access_expired
+
+    async def _do_request(
+        self,
+        method: AllowedMethods,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        delay: float | None,
+        as_json: bool,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        async with self._semaphore:
+            await self.client.limiter.acquire_async(delay)
+            return await asyncio.to_thread(
+                self.client._send_request,
+                method,
+                endpoint,
+                params,
+                as_json,
+                **kwargs,
+            )
+
+    # Реализовано автоматическое обновление токена
+    async def request(
+        self,
+        method: AllowedMethods,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        delay: float | None = None,
+        as_json: bool = False,
+        **kwargs: Any,
+    ) -> T:
+        assert method in AllowedMethods.__args__
+        self._bind_loop()
+        if self.client.needs_refresh:
+            async with self._refresh_lock:
+                await asyncio.to_thread(self.client.ensure_fresh_token)
+        used_token = self.client.access_token
+        try:
+            return await self._do_request(
+                method, endpoint, params, delay, as_json, kwargs
+            )
+        except errors.Forbidden as ex:
+            # Токен мог обновить параллельный запрос, тогда просто повторяем
+            if self.client.access_token == used_token and (
+                not self.is_access_expired or not self.refresh_token
+            ):
+                raise ex
+            async with self._refresh_lock:
+                # Пока ждали блокировку, токен мог обновить другой запрос
+                if self.client.access_token == used_token:
+                    logger.info("try to refresh access_token")
+                    await asyncio.to_thread(self.client.refresh_access_token)
+            return await self._do_request(
+                method, endpoint, params, delay, as_json, kwargs
+            )
+
+    async def get(self, *args, **kwargs) -> T:
+        return await self.request("GET", *args, **kwargs)
+
+    async def post(self, *args, **kwargs) -> T:
+        return await self.request("POST", *args, **kwargs)
+
+    async def put(self, *args, **kwargs) -> T:
+        return await self.request("PUT", *args, **kwargs)
+
+    async def delete(self, *args, **kwargs) -> T:
+        return await self.request("DELETE", *args, **kwargs)
+
+    def handle_access_token(self, token: AccessToken) -> None:
+        self.client.handle_access_token(token)
+
+    def get_access_token(self) -> AccessToken:
+        return self.client.get_access_token()
@@ -7,11 +7,12 @@ import time
 from dataclasses import dataclass
 from functools import cached_property
 from threading import Lock
-from typing import Any, Literal, TypeVar
+from typing import Any, Callable, Literal, TypeVar
 from urllib.parse import urlencode, urljoin
 
 import requests
 from requests import Session
+from requests.structures import CaseInsensitiveDict
 
 from hh_applicant_tool.api.user_agent import generate_android_useragent
 
@@ -21,16 +22,26 @@ from .client_keys import (
     ANDROID_CLIENT_SECRET,
 )
 from .datatypes import AccessToken
+from .rate_limiter import AdaptiveRateLimiter, RateLimiter
+from .token_broker import TokenBroker
 
 __all__ = ("ApiClient", "OAuthClient")
 
 HH_API_URL = "https://api.hh.ru/"
 HH_OAUTH_URL = "https://hh.ru/oauth/"
 DEFAULT_DELAY = 0.345
+# За сколько секунд до истечения access_token пытаться его обновить.
+# refresh_token обычно принимается только после истечения access_token,
+# поэтому по умолчанию — ровно в момент истечения, до запроса с ним
+DEFAULT_REFRESH_MARGIN = 0.0
 
 AllowedMethods = Literal["GET", "POST", "PUT", "DELETE"]
 T = TypeVar("T")
 
+# Обновление токена — одна критическая секция на процесс, сколько бы
+# клиентов и потоков ни было
+_token_refresh_lock = Lock()
+
 
 logger = logging.getLogger(__package__)
 
@@ -43,11 +54,14 @@ class BaseClient:
     user_agent: str | None = None
     session: Session | None = None
     delay: float | None = None
-    _previous_request_time: float = 0.0
+    limiter: RateLimiter | None = None
 
     def __post_init__(self) -> None:
         assert self.base_url.endswith("/"), "base_url must ends with /"
         self.delay = self.delay or DEFAULT_DELAY
+        # Ограничитель отделен от соединения: он только решает, когда
+        # можно отправить запрос, а сами запросы идут параллельно
+        self.limiter = self.limiter or AdaptiveRateLimiter(1 / self.delay)
         self.user_agent = self.user_agent or generate_android_useragent()
 
         # logger.debug(f"user agent: {self.user_agent}")
@@ -56,8 +70,6 @@ class BaseClient:
             logger.debug("create new session")
             self.session = requests.session()
 
-        self.lock = Lock()
-
     @property
     def proxies(self):
         return self.session.proxies
@@ -79,57 +91,126 @@ class BaseClient:
     ) -> T:
         # Не знаю насколько это "правильно"
         assert method in AllowedMethods.__args__
+        # На серваке какая-то анти-DDOS система
+        self.limiter.acquire(delay)
+        return self._send_request(method, endpoint, params, as_json, **kwargs)
+
+    def _send_request(
+        self,
+        method: AllowedMethods,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        as_json: bool = False,
+        **kwargs: Any,
+    ) -> T:
+        """Выполняет запрос без ожидания ограничителя."""
+        _, rv = self._perform(method, endpoint, params, as_json, **kwargs)
+        return rv
+
+    def _perform(
+        self,
+        method: AllowedMethods,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        as_json: bool = False,
+        *,
+        headers: dict[str, str] | None = None,
+        allow_not_modified: bool = False,
+        **kwargs: Any,
+    ) -> tuple[requests.Response, T]:
         params = dict(params or {})
         params.update(kwargs)
         url = self.resolve_url(endpoint)
-        with self.lock:
-            # На серваке какая-то анти-DDOS система
-            if (
-                delay := (self.delay if delay is None else delay)
-                - time.monotonic()
-                + self._previous_request_time
-            ) > 0:
-                logger.debug("wait %fs before request", delay)
-                time.sleep(delay)
-            has_body = method in ["POST", "PUT"]
-            payload = {
-                ["data", "json"][as_json] if has_body else "params": params
-            }
-            # logger.debug(f"request info: {method = }, {url = }, {headers = }, params = {repr(params)[:255]}")
-            response = self.session.request(
+        has_body = method in ["POST", "PUT"]
+        payload = {["data", "json"][as_json] if has_body else "params": params}
+        # logger.debug(f"request info: {method = }, {url = }, {headers = }, params = {repr(params)[:255]}")
+        response = self.session.request(
+            method,
+            url,
+            **payload,
+            headers=self._default_headers() | (headers or {}),
+            allow_redirects=False,
+        )
+        rv = {}
+        try:
+            # У этих лошков сервер не отдает Content-Length, а кривое API
+            # отдает пустые ответы, например, при отклике на вакансии,
+            # и мы не можем узнать содержит ли ответ тело
+            # 'Server': 'ddos-guard'
+            # ...
+            # 'Transfer-Encoding': 'chunked'
+            try:
+                rv = response.json() if response.text else {}
+            except json.JSONDecodeError as ex:
+                raise errors.BadResponse(
+                    f"Can't decode JSON: {method} {url} ({response.status_code})"
+                ) from ex
+        finally:
+            logger.debug(
+                "%d %s %s with params: %.1000s",
+                response.status_code,
                 method,
                 url,
-                **payload,
-                headers=self._default_headers(),
-                allow_redirects=False,
+                params or "-",
             )
-            try:
-                # У этих лошков сервер не отдает Content-Length, а кривое API
-                # отдает пустые ответы, например, при отклике на вакансии,
-                # и мы не можем узнать содержит ли ответ тело
-                # 'Server': 'ddos-guard'
-                # ...
-                # 'Transfer-Encoding': 'chunked'
-                try:
-                    rv = response.json() if response.text else {}
-                except json.JSONDecodeError as ex:
-                    raise errors.BadResponse(
-                        f"Can't decode JSON: {method} {url} ({response.status_code})"
-                    ) from ex
-            finally:
-                logger.debug(
-                    "%d %s %s with params: %.1000s",
-                    response.status_code,
-                    method,
-                    url,
-                    params or "-",
-                )
-                self._previous_request_time = time.monotonic()
+            self._record_response(response, rv)
+        if allow_not_modified and response.status_code == 304:
+            return response, None
         errors.ApiError.raise_for_status(response, rv)
         assert 300 > response.status_code >= 200, (
             f"Unexpected status code for {method} {url}: {response.status_code}"
         )
-        return rv
+        return response, rv
+
+    def get_conditional(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> tuple[T | None, CaseInsensitiveDict]:
+        """GET с ревалидацией по ETag/Last-Modified.
+
+        Возвращает `None` вместо данных, если ресурс не изменился (304).
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        self.limiter.acquire()
+        response, rv = self._perform(
+            "GET",
+            endpoint,
+            params,
+            headers=headers,
+            allow_not_modified=True,
+        )
+        return rv, response.headers
+
+    def _record_response(
+        self, response: requests.Response, data: dict[str, Any]
+    ) -> None:
+        if (
+            response.status_code == 429
+            or response.status_code >= 500
+            or (
+                isinstance(data, dict)
+                and errors.ApiError.has_error_value("captcha_required", data)
+            )
+        ):
+            self.limiter.record_throttle()
+        else:
+            self.limiter.record_success()
+
+    def set_delay(self, delay: float) -> None:
+        """Меняет задержку между запросами и стартовую частоту ограничителя."""
+        # Частота — это 1 / delay, а запросы без ограничения hh.ru режет
+        if not delay > 0:
+            raise ValueError(f"Задержка должна быть больше нуля: {delay!r}")
+        self.delay = delay
+        self.limiter.reset(1 / delay)
 
     def get(self, *args, **kwargs) -> T:
         return self.request("GET", *args, **kwargs)
@@ -213,11 +294,28 @@ class ApiClient(BaseClient):
     client_id: str | None = None
     client_secret: str | None = None
     base_url: str = HH_API_URL
+    token_broker: TokenBroker | None = None
+    refresh_margin: float = DEFAULT_REFRESH_MARGIN
+    _refresh_postponed_until: float = dataclasses.field(
+        default=0.0, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.token_broker = self.token_broker or TokenBroker()
 
     @property
     def is_access_expired(self) -> bool:
         return time.time() >= (self.access_expires_at or 0)
 
+    @property
+    def needs_refresh(self) -> bool:
+        """Пора обновлять токен, не дожидаясь отказа API."""
+        return bool(self.refresh_token) and time.time() >= max(
+            (self.access_expires_at or 0) - self.refresh_margin,
+            self._refresh_postponed_until,
+        )
+
     @cached_property
     def oauth_client(self) -> OAuthClient:
         return OAuthClient(
@@ -237,6 +335,34 @@ class ApiClient(BaseClient):
         assert self.access_token.startswith("USER")
         return headers | {"authorization": f"Bearer {self.access_token}"}
 
+    def ensure_fresh_token(self) -> None:
+        """Обновляет токен незадолго до истечения."""
+        if not self.needs_refresh:
+            return
+        try:
+            self.refresh_access_token()
+        except errors.ApiError as ex:
+            if self.is_access_expired:
+                raise
+            # hh.ru может не дать обновить токен раньше срока. Тогда
+            # работаем со старым и пробуем снова в момент истечения
+            logger.debug("early token refresh rejected: %s", ex)
+            self._refresh_postponed_until = self.access_expires_at
+
+    def _with_token_refresh(self, do_request: Callable[[], T]) -> T:
+        self.ensure_fresh_token()
+        try:
+            return do_request()
+        # TODO: добавить класс для ошибок типа AccessTokenExpired
+        except errors.Forbidden as ex:
+            if not self.is_access_expired or not self.refresh_token:
+                raise ex
+            logger.info("try to refresh access_token")
+            # Пробуем обновить токен
+            self.refresh_access_token()
+            # И повторно отправляем запрос
+            return do_request()
+
     # Реализовано автоматическое обновление токена
     def request(
         self,
@@ -247,33 +373,52 @@ class ApiClient(BaseClient):
         as_json: bool = False,
         **kwargs: Any,
     ) -> T:
-        def do_request():
-            return BaseClient.request(
+        return self._with_token_refresh(
+            lambda: BaseClient.request(
                 self, method, endpoint, params, delay, as_json, **kwargs
             )
+        )
 
-        try:
-            return do_request()
-        # TODO: добавить класс для ошибок типа AccessTokenExpired
-        except errors.Forbidden as ex:
-            if not self.is_access_expired or not self.refresh_token:
-                raise ex
-            logger.info("try to refresh access_token")
-            # Пробуем обновить токен
-            self.refresh_access_token()
-            # И повторно отправляем запрос
-            return do_request()
+    def get_conditional(self, *args: Any, **kwargs: Any):
+        return self._with_token_refresh(
+            lambda: BaseClient.get_conditional(self, *args, **kwargs)
+        )
 
     def handle_access_token(self, token: AccessToken) -> None:
         for field in ("access_token", "refresh_token", "access_expires_at"):
             if field in token and hasattr(self, field):
                 setattr(self, field, token[field])
 
+    def _adopt_saved_token(self) -> bool:
+        """Берет токен, уже обновленный другим процессом."""
+        token = self.token_broker.load()
+        if (
+            not token
+            or not token.get("access_token")
+            or token["access_token"] == self.access_token
+            or time.time()
+            >= (token.get("access_expires_at") or 0) - self.refresh_margin
+        ):
+            return False
+        logger.info("use access_token refreshed by another process")
+        self.handle_access_token(token)
+        return True
+
     def refresh_access_token(self) -> None:
         if not self.refresh_token:
             raise ValueError("Refresh token required.")
-        token = self.oauth_client.refresh_access_token(self.refresh_token)
-        self.handle_access_token(token)
+        stale_token = self.access_token
+        with _token_refresh_lock, self.token_broker.lock():
+            # Пока ждали блокировку, токен мог обновить другой поток...
+            if self.access_token != stale_token:
+                return
+            # ...или другой процесс
+            if self._adopt_saved_token():
+                return
+            token = self.oauth_client.refresh_access_token(self.refresh_token)
+            self.handle_access_token(token)
+            self._refresh_postponed_until = 0.0
+            self.token_broker.save(self.get_access_token())
 
     def get_access_token(self) -> AccessToken:
         return {
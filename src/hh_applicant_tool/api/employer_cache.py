@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from .errors import Forbidden, ResourceNotFound
+
+if TYPE_CHECKING:
+    from ..storage.repositories.employers import EmployersRepository
+    from ..storage.repositories.hidden_employers import (
+        HiddenEmployersRepository,
+    )
+    from ..storage.write_buffer import WriteBuffer
+    from .client import ApiClient
+    from .datatypes import Employer
+
+__all__ = ("EmployerCache",)
+
+DEFAULT_EMPLOYER_TTL = timedelta(days=7)
+# Скрытый профиль могут открыть, поэтому отказ помним недолго
+DEFAULT_HIDDEN_EMPLOYER_TTL = timedelta(days=1)
+
+logger = logging.getLogger(__package__)
+
+
+def _utcnow() -> datetime:
+    # CURRENT_TIMESTAMP в SQLite — UTC без часового пояса
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Thread-safe
+@dataclass
+class EmployerCache:
+    """Профили работодателей с чтением через таблицу employers.
+
+    Профиль берется из базы, пока его `updated_at` моложе `ttl`, иначе
+    запрашивается `GET /employers/{id}` и сохраняется. Если API профиль не
+    отдает (скрыт или заблокирован), это запоминается на `hidden_ttl`.
+    """
+
+    client: ApiClient
+    employers: EmployersRepository
+    hidden: HiddenEmployersRepository
+    ttl: timedelta = DEFAULT_EMPLOYER_TTL
+    hidden_ttl: timedelta = DEFAULT_HIDDEN_EMPLOYER_TTL
+    # Профили пишутся пачками вместе с вакансиями
+    buffer: WriteBuffer | None = None
+    _memo: dict[str, dict[str, Any] | None] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def get(self, employer_id: str | int) -> dict[str, Any] | None:
+        """Профиль работодателя или None, если он недоступен."""
+        employer_id = str(employer_id)
+        with self._lock:
+            if employer_id in self._memo:
+                return self._memo[employer_id]
+            found, profile = self._load_saved(employer_id)
+        if not found:
+            profile = self._fetch(employer_id)
+        with self._lock:
+            self._memo[employer_id] = profile
+        return profile
+
+    def _load_saved(
+        self, employer_id: str
+    ) -> tuple[bool, dict[str, Any] | None]:
+        now = _utcnow()
+        try:
+            hidden = self.hidden.get(employer_id)
+            if (
+                hidden
+                and hidden.checked_at
+                and now - hidden.checked_at < self.hidden_ttl
+            ):
+                return True, None
+            saved = self.employers.get(employer_id)
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось прочитать работодателя из базы: %s", ex)
+            return False, None
+        if saved and saved.updated_at and now - saved.updated_at < self.ttl:
+            logger.debug("employer %s from cache", employer_id)
+            return True, saved.to_dict()
+        return False, None
+
+    def _fetch(self, employer_id: str) -> dict[str, Any] | None:
+        try:
+            profile: Employer = self.client.get(f"/employers/{employer_id}")
+        except (ResourceNotFound, Forbidden) as ex:
+            logger.debug("employer %s unavailable: %s", employer_id, ex)
+            self._save(
+                self.hidden,
+                self.hidden.model(
+                    id=int(employer_id),
+                    status_code=ex.status_code,
+                    checked_at=_utcnow(),
+                ),
+            )
+            return None
+        model = self.employers.model.from_api(profile)
+        model.updated_at = _utcnow()
+        self._save(self.employers, model)
+        return profile
+
+    def _save(self, repository: Any, model: Any) -> None:
+        try:
+            with self._lock:
+                if self.buffer is not None:
+                    self.buffer.save(repository, model)
+                else:
+                    repository.save(model)
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось сохранить работодателя в базу: %s", ex)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from ..utils.date import try_parse_datetime
+
+if TYPE_CHECKING:
+    from ..storage.repositories.negotiations import NegotiationRepository
+    from ..storage.repositories.settings import SettingsRepository
+    from .client import ApiClient
+    from .datatypes import Negotiation, PaginatedItems
+
+__all__ = ("NegotiationsSync",)
+
+NEGOTIATIONS_PER_PAGE = 100
+# Ключ в settings: для каждого статуса своя отметка
+WATERMARK_KEY = "negotiations_synced_at.{status}"
+
+logger = logging.getLogger(__package__)
+
+
+def _updated_at(item: Negotiation) -> datetime | None:
+    dt = try_parse_datetime(item.get("updated_at"))
+    return dt if isinstance(dt, datetime) else None
+
+
+@dataclass
+class NegotiationsSync:
+    """Инкрементальная синхронизация откликов в таблицу negotiations.
+
+    Отклики запрашиваются от недавно обновленных к старым, пока не
+    встретится отклик старше отметки прошлой синхронизации. Отметка
+    (самый свежий `updated_at`) хранится в settings отдельно для каждого
+    статуса.
+    """
+
+    client: ApiClient
+    negotiations: NegotiationRepository
+    settings: SettingsRepository
+    per_page: int = NEGOTIATIONS_PER_PAGE
+
+    def sync(self, status: str = "all") -> int:
+        """Сохраняет измененные отклики и возвращает их количество."""
+        key = WATERMARK_KEY.format(status=status)
+        mark_value = self.settings.get_value(key)
+        mark = try_parse_datetime(mark_value) if mark_value else None
+        newest, newest_value = mark, mark_value
+        changed: list[Negotiation] = []
+        page = 0
+        while True:
+            r: PaginatedItems[Negotiation] = self.client.get(
+                "/negotiations",
+                page=page,
+                per_page=self.per_page,
+                status=status,
+                order_by="updated_at",
+                order="desc",
+            )
+            reached = False
+            for item in r.get("items", []):
+                updated = _updated_at(item)
+                # Отклики с той же датой, что и отметка, перезаписываем:
+                # за одну секунду могло измениться несколько
+                if mark and updated and updated < mark:
+                    reached = True
+                    break
+                changed.append(item)
+                if updated and (newest is None or updated > newest):
+                    newest, newest_value = updated, item["updated_at"]
+            page += 1
+            if reached or page >= r.get("pages", 0):
+                break
+        logger.debug(
+            "negotiations sync (%s): %d changed, %d pages",
+            status,
+            len(changed),
+            page,
+        )
+        # Если что-то не сохранилось, отметку не двигаем: повторим в
+        # следующий раз
+        if self._save(changed) and newest_value != mark_value:
+            self.settings.set_value(key, newest_value)
+        return len(changed)
+
+    def _save(self, items: list[Negotiation]) -> bool:
+        try:
+            self.negotiations.save_batch(items)
+            return True
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось сохранить отклики пачкой: %s", ex)
+        # Один кривой отклик не должен терять остальные
+        ok = True
+        for item in items:
+            try:
+                self.negotiations.save(item)
+            except sqlite3.Error as ex:
+                ok = False
+                logger.warning(
+                    "Не удалось сохранить отклик %s: %s", item.get("id"), ex
+                )
+        return ok
+
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+
+__all__ = (
+    "RateLimiter",
+    "TokenBucket",
+    "AdaptiveRateLimiter",
+)
+
+logger = logging.getLogger(__package__)
+
+
+class RateLimiter:
+    """Интерфейс ограничителя частоты запросов.
+
+    Ограничитель только выдает разрешение на запрос и ничего не знает о
+    соединении: после `acquire()` запросы выполняются параллельно.
+    """
+
+    def acquire(self, min_interval: float | None = None) -> float:
+        """Блокирует поток до разрешения на запрос. Возвращает время ожидания.
+
+        `min_interval` — минимальный промежуток с предыдущего разрешения,
+        используется для запросов с явной задержкой (отклики и т.п.).
+        """
+        return 0.0
+
+    async def acquire_async(self, min_interval: float | None = None) -> float:
+        """То же, что `acquire()`, но не блокирует цикл событий.
+
+        По умолчанию `acquire()` ждет в отдельном потоке.
+        """
+        return await asyncio.to_thread(self.acquire, min_interval)
+
+    def record_success(self) -> None:
+        pass
+
+    def record_throttle(self) -> None:
+        pass
+
+    def reset(self, rate: float) -> None:
+        pass
+
+
+# Thread-safe
+@dataclass
+class TokenBucket(RateLimiter):
+    # Запросов в секунду
+    rate: float
+    # Сколько запросов можно отправить подряд без ожидания
+    burst: float = 1.0
+    _tokens: float = field(init=False, repr=False)
+    _updated_at: float = field(init=False, repr=False)
+    _last_grant: float = field(default=0.0, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        assert self.rate > 0, "rate must be positive"
+        self.burst = max(self.burst, 1.0)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._updated_at) * self.rate,
+        )
+        self._updated_at = now
+
+    def _reserve(self, min_interval: float | None) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = (
+                (1.0 - self._tokens) / self.rate if self._tokens < 1.0 else 0.0
+            )
+            if min_interval:
+                wait = max(wait, self._last_grant + min_interval - now)
+            # Токен списывается сразу, даже если придется подождать: так
+            # следующий поток встанет в очередь за нами, а не перед нами
+            self._tokens -= 1.0
+            self._last_grant = now + wait
+            return wait
+
+    def acquire(self, min_interval: float | None = None) -> float:
+        if (wait := self._reserve(min_interval)) > 0:
+            logger.debug("wait %fs before request", wait)
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, min_interval: float | None = None) -> float:
+        if (wait := self._reserve(min_interval)) > 0:
+            logger.debug("wait %fs before request", wait)
+            await asyncio.sleep(wait)
+        return wait
+
+    def reset(self, rate: float) -> None:
+        assert rate > 0, "rate must be positive"
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+@dataclass
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket с AIMD-регулятором.
+
+    Пока ответы чистые, частота растет на `increase` запросов в секунду за
+    каждый ответ (до `max_rate`). На 429, 5xx и капче частота умножается на
+    `decrease` (но не ниже `min_rate`).
+    """
+
+    min_rate: float | None = None
+    max_rate: float | None = None
+    increase: float | None = None
+    decrease: float = 0.5
+    # Заданные явно границы: при смене частоты они сохраняются
+    _configured: tuple[float | None, ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._configured = (self.min_rate, self.max_rate, self.increase)
+        self._set_bounds(self.rate)
+
+    def _set_bounds(self, rate: float) -> None:
+        # Незаданные границы отсчитываются от стартовой частоты
+        min_rate, max_rate, increase = self._configured
+        self.min_rate = min_rate or rate / 8
+        self.max_rate = max_rate or rate * 2
+        self.increase = increase or rate / 20
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Сгорают накопленные токены, чтобы не было залпа после отказа
+            self._tokens = min(self._tokens, 0.0)
+        logger.debug("throttled, decrease rate to %.3f rps", self.rate)
+
+    def reset(self, rate: float) -> None:
+        assert rate > 0, "rate must be positive"
+        with self._lock:
+            self._refill(time.monotonic())
+            self._set_bounds(rate)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from .errors import ApiError
+
+if TYPE_CHECKING:
+    from ..storage.repositories.references import ReferencesRepository
+    from .client import ApiClient
+
+__all__ = ("ReferenceCache", "ReferenceItem", "AreaInfo")
+
+# Справочники меняются редко, а /areas весит несколько мегабайт
+DEFAULT_REFERENCE_TTL = timedelta(days=7)
+
+logger = logging.getLogger(__package__)
+
+
+class ReferenceItem(NamedTuple):
+    id: str
+    parent_id: str | None
+    name: str
+    depth: int
+
+
+class AreaInfo(NamedTuple):
+    name: str
+    # Полный путь, например, "Россия / Московская область / Химки"
+    path: str
+
+
+def _flatten_tree(
+    nodes: list[dict[str, Any]], children_key: str
+) -> list[list[Any]]:
+    """Дерево -> строки [id, parent_id, name, depth] в порядке обхода."""
+    rows: list[list[Any]] = []
+    stack = [(node, None, 0) for node in reversed(nodes)]
+    while stack:
+        node, parent_id, depth = stack.pop()
+        rows.append([str(node["id"]), parent_id, node["name"], depth])
+        stack.extend(
+            (child, str(node["id"]), depth + 1)
+            for child in reversed(node.get(children_key) or [])
+        )
+    return rows
+
+
+# Что хранить для справочника: деревья сразу раскладываются в плоский
+# список, чтобы не разбирать мегабайты JSON при каждом обращении
+FLATTENERS: dict[str, Callable[[Any], Any]] = {
+    "/areas": lambda data: _flatten_tree(data, "areas"),
+    "/industries": lambda data: _flatten_tree(data, "industries"),
+    "/professional_roles": lambda data: _flatten_tree(
+        data.get("categories", []), "roles"
+    ),
+}
+
+
+@dataclass
+class ReferenceCache:
+    """Кеш справочников API в базе профиля.
+
+    Пока не истек `ttl`, справочник отдается из базы без запросов. После —
+    выполняется условный запрос с ETag/Last-Modified, и при ответе 304
+    продлевается срок жизни сохраненной копии.
+    """
+
+    client: ApiClient
+    repository: ReferencesRepository
+    ttl: timedelta = DEFAULT_REFERENCE_TTL
+    _memo: dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def get(self, endpoint: str) -> Any:
+        if endpoint not in self._memo:
+            self._memo[endpoint] = self._load(endpoint)
+        return self._memo[endpoint]
+
+    def _load(self, endpoint: str) -> Any:
+        cached = self.repository.get(endpoint)
+        if (
+            cached
+            and cached.fetched_at
+            and datetime.now() - cached.fetched_at < self.ttl
+        ):
+            return cached.data
+
+        try:
+            data, headers = self.client.get_conditional(
+                endpoint,
+                etag=cached.etag if cached else None,
+                last_modified=cached.last_modified if cached else None,
+            )
+        except ApiError as ex:
+            if not cached:
+                raise
+            logger.warning(
+                "Не удалось обновить справочник %s, используем сохраненный: %s",
+                endpoint,
+                ex,
+            )
+            return cached.data
+
+        if data is None:
+            logger.debug("Справочник не изменился: %s", endpoint)
+            data = cached.data
+        else:
+            logger.debug("Загружен справочник: %s", endpoint)
+            if flatten := FLATTENERS.get(endpoint):
+                data = flatten(data)
+
+        self.repository.save(
+            self.repository.model(
+                endpoint=endpoint,
+                etag=headers.get("ETag") or (cached and cached.etag),
+                last_modified=headers.get("Last-Modified")
+                or (cached and cached.last_modified),
+                data=data,
+                fetched_at=datetime.now(),
+            )
+        )
+        return data
+
+    def _items(self, endpoint: str) -> list[ReferenceItem]:
+        key = f"{endpoint}#items"
+        if key not in self._memo:
+            self._memo[key] = [ReferenceItem(*row) for row in self.get(endpoint)]
+        return self._memo[key]
+
+    def areas(self) -> list[ReferenceItem]:
+        return self._items("/areas")
+
+    def industries(self) -> list[ReferenceItem]:
+        return self._items("/industries")
+
+    def professional_roles(self) -> list[ReferenceItem]:
+        """Категории (depth=0) и роли в них (depth=1)."""
+        return self._items("/professional_roles")
+
+    def dictionaries(self) -> dict[str, list[dict[str, Any]]]:
+        return self.get("/dictionaries")
+
+    def area_index(self) -> dict[str, AreaInfo]:
+        """id региона -> название и полный путь."""
+        if "/areas#index" not in self._memo:
+            index: dict[str, AreaInfo] = {}
+            for item in self.areas():
+                parent = index.get(item.parent_id) if item.parent_id else None
+                index[item.id] = AreaInfo(
+                    item.name,
+                    f"{parent.path} / {item.name}" if parent else item.name,
+                )
+            self._memo["/areas#index"] = index
+        return self._memo["/areas#index"]
+
+    def industry_ids_by_name(self) -> dict[str, str]:
+        """Название отрасли в нижнем регистре -> id."""
+        return {item.name.lower(): item.id for item in self.industries()}
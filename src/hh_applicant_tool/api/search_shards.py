@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, Mapping
+
+from ..utils.date import DATETIME_FORMAT, try_parse_datetime
+
+__all__ = ("SearchShardPlanner", "fetch_shards")
+
+# Дальше этого числа результатов поиск страницы не отдает
+SEARCH_RESULTS_LIMIT = 2000
+# Окно публикации короче этого не делится
+MIN_DATE_WINDOW = timedelta(hours=1)
+# Окно, если в поиске не задан ни период, ни даты
+DEFAULT_SEARCH_DAYS = 30
+DEFAULT_MAX_SHARDS = 50
+# Параметры страницы к подзапросу не относятся
+_PAGE_PARAMS = ("page", "per_page")
+
+logger = logging.getLogger(__package__)
+
+Params = dict[str, Any]
+
+
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _parse_date(value: Any) -> datetime | None:
+    dt = try_parse_datetime(value)
+    # Без часового пояса — местное время
+    return dt.astimezone() if isinstance(dt, datetime) else None
+
+
+@dataclass
+class SearchShardPlanner:
+    """Разбивает поиск на подзапросы, каждый из которых отдается целиком.
+
+    Поиск отдает не больше 2000 результатов, и при широком запросе
+    большая часть вакансий недоступна. Самый большой подзапрос делится,
+    пока в нем больше `limit` результатов: списки профролей и регионов —
+    поодиночке, затем окно публикации `date_from`/`date_to` — пополам,
+    а когда окно уже не делится — регион на вложенные. Подзапросы
+    пересекаются на границах окон, так что результаты нужно склеивать
+    по id вакансии.
+    """
+
+    # Параметры поиска -> сколько найдено (`found`)
+    count: Callable[[Params], int]
+    # id региона -> id вложенных
+    area_children: Mapping[str, list[str]] = field(default_factory=dict)
+    limit: int = SEARCH_RESULTS_LIMIT
+    max_shards: int = DEFAULT_MAX_SHARDS
+    min_window: timedelta = MIN_DATE_WINDOW
+    now: datetime = field(default_factory=lambda: datetime.now().astimezone())
+
+    def plan(self, params: Mapping[str, Any]) -> list[Params]:
+        base = {k: v for k, v in params.items() if k not in _PAGE_PARAMS}
+        # [найдено, параметры, можно ли делить дальше]
+        shards: list[list[Any]] = [[self.count(base), base, True]]
+        while shards and len(shards) < self.max_shards:
+            n, (found, shard, splittable) = max(
+                enumerate(shards),
+                key=lambda x: x[1][0] if x[1][2] else -1,
+            )
+            if found <= self.limit or not splittable:
+                break
+            # Пустые подзапросы не нужны
+            parts = [
+                [c, part, True]
+                for part in self._split(shard)
+                if (c := self.count(part))
+            ]
+            if not parts:
+                # found приблизительный: части могут оказаться пустыми,
+                # хотя в целом что-то нашлось. Тогда ищем без деления
+                shards[n][2] = False
+                continue
+            shards[n : n + 1] = parts
+        if truncated := [s for s in shards if s[0] > self.limit]:
+            logger.debug(
+                "%d подзапросов больше %d результатов", len(truncated), self.limit
+            )
+        logger.debug(
+            "Поиск разбит на %d подзапросов: %d результатов",
+            len(shards),
+            sum(s[0] for s in shards),
+        )
+        return [s[1] for s in shards]
+
+    def _split(self, shard: Params) -> list[Params]:
+        for key in ("professional_role", "area"):
+            if len(values := _as_list(shard.get(key))) > 1:
+                return [shard | {key: [value]} for value in values]
+        if parts := self._split_window(shard):
+            return parts
+        areas = _as_list(shard.get("area"))
+        if areas and (children := self.area_children.get(str(areas[0]))):
+            return [shard | {"area": [child]} for child in children]
+        return []
+
+    def _split_window(self, shard: Params) -> list[Params]:
+        date_to = _parse_date(shard.get("date_to")) or self.now
+        date_from = _parse_date(shard.get("date_from")) or date_to - timedelta(
+            days=int(shard.get("period") or DEFAULT_SEARCH_DAYS)
+        )
+        if date_to - date_from <= self.min_window:
+            return []
+        middle = date_from + (date_to - date_from) / 2
+        # period с датами не сочетается
+        base = {k: v for k, v in shard.items() if k != "period"}
+        # Сначала свежие
+        return [
+            base
+            | {
+                "date_from": middle.strftime(DATETIME_FORMAT),
+                "date_to": date_to.strftime(DATETIME_FORMAT),
+            },
+            base
+            | {
+                "date_from": date_from.strftime(DATETIME_FORMAT),
+                "date_to": middle.strftime(DATETIME_FORMAT),
+            },
+        ]
+
+
+def fetch_shards(
+    fetch_page: Callable[[Params, int], dict[str, Any]],
+    shards: list[Params],
+    max_pages: int,
+    *,
+    workers: int = 3,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Загружает подзапросы параллельно и отдает страницы без повторов.
+
+    Каждый подзапрос листается по порядку в своем потоке, страницы
+    отдаются по мере загрузки. Вакансии, уже отданные из других
+    подзапросов, из страниц убираются. Если потребитель прекратил
+    итерацию или выставлен `cancel_event`, загрузка останавливается.
+    """
+    if not shards or max_pages <= 0:
+        return
+
+    done = object()
+    stop = threading.Event()
+    pages: queue.Queue[Any] = queue.Queue(maxsize=max(workers, 1) * 2)
+
+    def stopped() -> bool:
+        return stop.is_set() or (
+            cancel_event is not None and cancel_event.is_set()
+        )
+
+    def put(item: Any) -> None:
+        while not stopped():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def load(shard: Params) -> None:
+        try:
+            page = 0
+            while page < max_pages and not stopped():
+                res = fetch_page(shard, page)
+                put(res)
+                page += 1
+                if not res.get("items") or page >= res.get("pages", 0):
+                    break
+        except BaseException as ex:
+            put(ex)
+        finally:
+            put(done)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(workers, 1), thread_name_prefix="shard"
+    )
+    for shard in shards:
+        executor.submit(load, shard)
+    seen: set[Any] = set()
+    remaining = len(shards)
+    try:
+        while remaining and not stopped():
+            try:
+                item = pages.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is done:
+                remaining -= 1
+                continue
+            if isinstance(item, BaseException):
+                raise item
+            items = []
+            for vacancy in item.get("items", []):
+                if vacancy["id"] not in seen:
+                    seen.add(vacancy["id"])
+                    items.append(vacancy)
+            yield item | {"items": items}
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..utils.filelock import FileLock
+from .datatypes import AccessToken
+
+if TYPE_CHECKING:
+    from ..utils.config import Config
+
+__all__ = ("TokenBroker", "ConfigTokenBroker")
+
+logger = logging.getLogger(__package__)
+
+
+class TokenBroker:
+    """Точка согласования токена между процессами одного профиля.
+
+    refresh_token одноразовый: если два процесса обновят токен
+    одновременно, один из них получит ошибку и потеряет авторизацию.
+    Реализация по умолчанию ничего не согласовывает.
+    """
+
+    def lock(self) -> AbstractContextManager:
+        """Межпроцессная блокировка на время обновления токена."""
+        return nullcontext()
+
+    def load(self) -> AccessToken | None:
+        """Последний сохраненный токен, возможно, обновленный другим процессом."""
+        return None
+
+    def save(self, token: AccessToken) -> None:
+        pass
+
+
+@dataclass
+class ConfigTokenBroker(TokenBroker):
+    """Хранит токен в config.json профиля, блокировка — файл рядом."""
+
+    config: Config
+    lock_path: Path
+
+    def lock(self) -> AbstractContextManager:
+        return FileLock(self.lock_path)
+
+    def load(self) -> AccessToken | None:
+        # Токен в файле мог обновить другой процесс. Остальные настройки
+        # не трогаем
+        self.config.reload("token")
+        return self.config.get("token") or None
+
+    def save(self, token: AccessToken) -> None:
+        self.config.save(token=token)
+        logger.debug("token saved to %s", self.config)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import html
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Mapping, NamedTuple
+
+from ..utils.string import strip_tags
+
+if TYPE_CHECKING:
+    from ..storage.repositories.vacancy_details import (
+        VacancyDetailsRepository,
+    )
+    from .client import ApiClient
+
+__all__ = ("VacancyDetail", "VacancyDetailStore")
+
+# Сохраненные данные перепроверяются не раньше, а при переопубликации
+# вакансии — сразу
+DEFAULT_VACANCY_DETAIL_TTL = timedelta(days=7)
+
+logger = logging.getLogger(__package__)
+
+
+class VacancyDetail(NamedTuple):
+    id: str
+    # Описание без HTML
+    description: str
+    key_skills: list[str]
+
+
+# Thread-safe
+@dataclass
+class VacancyDetailStore:
+    """Полные данные вакансий для фильтров.
+
+    Каждая вакансия запрашивается не больше одного раза за запуск, а
+    описание и ключевые навыки сохраняются в базе профиля. Сохраненная
+    копия устаревает по `ttl` или если у вакансии сменилась `published_at`.
+    """
+
+    client: ApiClient
+    repository: VacancyDetailsRepository
+    ttl: timedelta = DEFAULT_VACANCY_DETAIL_TTL
+    _memo: dict[str, VacancyDetail] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def get(self, vacancy: Mapping[str, Any]) -> VacancyDetail:
+        """`vacancy` — элемент поиска или полная вакансия."""
+        if detail := self.cached(vacancy):
+            return detail
+        vacancy_id = str(vacancy["id"])
+        detail = self._fetch(vacancy_id)
+        with self._lock:
+            self._memo[vacancy_id] = detail
+        return detail
+
+    def cached(self, vacancy: Mapping[str, Any]) -> VacancyDetail | None:
+        """Как `get()`, но без запроса к API: None, если свежей копии нет."""
+        vacancy_id = str(vacancy["id"])
+        with self._lock:
+            if detail := self._memo.get(vacancy_id):
+                return detail
+            detail = self._load_saved(vacancy_id, vacancy.get("published_at"))
+            if detail is not None:
+                self._memo[vacancy_id] = detail
+            return detail
+
+    def _load_saved(
+        self, vacancy_id: str, published_at: str | None
+    ) -> VacancyDetail | None:
+        try:
+            saved = self.repository.get(vacancy_id)
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось прочитать вакансию из базы: %s", ex)
+            return None
+        if (
+            not saved
+            or not saved.fetched_at
+            or datetime.now() - saved.fetched_at >= self.ttl
+            or (published_at and published_at != saved.published_at)
+        ):
+            return None
+        return VacancyDetail(vacancy_id, saved.description, saved.key_skills)
+
+    def _fetch(self, vacancy_id: str) -> VacancyDetail:
+        logger.debug("fetch vacancy details: %s", vacancy_id)
+        full_vacancy = self.client.get(f"/vacancies/{vacancy_id}")
+        detail = VacancyDetail(
+            vacancy_id,
+            html.unescape(strip_tags(full_vacancy.get("description") or "")),
+            [
+                s["name"]
+                for s in full_vacancy.get("key_skills") or []
+                if s.get("name")
+            ],
+        )
+        try:
+            with self._lock:
+                self.repository.save(
+                    self.repository.model(
+                        id=int(vacancy_id),
+                        description=detail.description,
+                        key_skills=detail.key_skills,
+                        published_at=full_vacancy.get("published_at"),
+                        fetched_at=datetime.now(),
+                    )
+                )
+        except sqlite3.Error as ex:
+            logger.warning("Не удалось сохранить вакансию в базу: %s", ex)
+        return detail
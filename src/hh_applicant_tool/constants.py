@@ -7,6 +7,8 @@ CONFIG_FILENAME = "config.json"
 LOG_FILENAME = "log.txt"
 DATABASE_FILENAME = "data"
 COOKIES_FILENAME = "cookies.txt"
+# Блокировка, под которой процессы профиля по очереди обновляют токен
+TOKEN_LOCK_FILENAME = "token.lock"
 DESKTOP_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -17,3 +19,5 @@ DEFAULT_OPENAI_TIMEOUT = 30.0
 # Отдельно на установку соединения, чтобы недоступный сервер не съедал
 # весь таймаут
 DEFAULT_OPENAI_CONNECT_TIMEOUT = 5.0
+# Сколько запросов к AI может быть в полете одновременно
+DEFAULT_OPENAI_CONCURRENCY = 4
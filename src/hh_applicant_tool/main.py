@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import html
 import json
 import logging
@@ -13,14 +14,14 @@ import sys
 import threading
 from collections.abc import Sequence
 from contextlib import contextmanager
+from datetime import timedelta
 from functools import cached_property
 from http.cookiejar import MozillaCookieJar
 from importlib import import_module
-from itertools import count
 from os import getenv
 from pathlib import Path
 from pkgutil import iter_modules
-from typing import Any, Callable, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
 import requests
 import urllib3
@@ -31,13 +32,17 @@ from .constants import (
     CONFIG_FILENAME,
     COOKIES_FILENAME,
     DATABASE_FILENAME,
+    DEFAULT_OPENAI_CONCURRENCY,
     DEFAULT_OPENAI_CONNECT_TIMEOUT,
     DEFAULT_OPENAI_TIMEOUT,
     DESKTOP_USER_AGENT,
     LOG_FILENAME,
+    TOKEN_LOCK_FILENAME,
 )
-from .storage import StorageFacade
+from .storage import ConnectionManager, StorageFacade
+from .storage.write_buffer import DEFAULT_BUFFER_DELAY, DEFAULT_BUFFER_ROWS
 from .utils.cookiejar import HHOnlyCookieJar
+from .utils.http import HH_POOL_PREFIXES, PooledSession, setup_session_pools
 from .utils.log import setup_logger
 from .utils.mixins import MegaTool
 
@@ -208,8 +213,12 @@ class HHApplicantTool(MegaTool):
         proxies: dict[str, str],
         *,
         log_label: str,
+        pool_prefixes: dict[str, str] | None = None,
     ) -> requests.Session:
         session = requests.Session()
+        self.http_pools[log_label] = setup_session_pools(
+            session, self.config.get("http_pool"), pool_prefixes
+        )
 
         if proxies:
             logger.info("Use proxies for %s: %r", log_label, proxies)
@@ -218,11 +227,18 @@ class HHApplicantTool(MegaTool):
         session.headers.update({"User-Agent": DESKTOP_USER_AGENT})
         return session
 
+    @cached_property
+    def http_pools(self) -> dict[str, PooledSession]:
+        return {}
+
     @cached_property
     def session(self) -> requests.Session:
+        # У api.hh.ru и hh.ru свои пулы, чтобы сайты работодателей не
+        # вытесняли их keep-alive соединения
         session = self._create_http_session(
             self._get_proxies(),
             log_label="requests",
+            pool_prefixes=HH_POOL_PREFIXES,
         )
 
         session.cookies = HHOnlyCookieJar(str(self.cookies_file))
@@ -231,6 +247,14 @@ class HHApplicantTool(MegaTool):
 
         return session
 
+    @cached_property
+    def site_session(self) -> requests.Session:
+        # Сайты работодателей — без куков hh.ru и в своем пуле
+        return self._create_http_session(
+            self._get_proxies(),
+            log_label="employer sites",
+        )
+
     @cached_property
     def openai_session(self) -> requests.Session:
         return self._create_http_session(
@@ -261,30 +285,161 @@ class HHApplicantTool(MegaTool):
     def db_path(self) -> Path:
         return self.config_path / DATABASE_FILENAME
 
+    @cached_property
+    def db_connections(self) -> ConnectionManager:
+        return ConnectionManager(self.db_path, self.config.get("sqlite"))
+
     @cached_property
     def db(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        return conn
+        # У каждого потока (UI, отклики, авторизация) свое соединение
+        return self.db_connections.local
 
     @cached_property
     def storage(self) -> StorageFacade:
-        return StorageFacade(self.db)
+        conf = self.config.get("write_buffer", {})
+        return StorageFacade(
+            self.db,
+            buffer_rows=conf.get("max_rows", DEFAULT_BUFFER_ROWS),
+            buffer_delay=conf.get("max_delay", DEFAULT_BUFFER_DELAY),
+            writer=self.db_connections.writer,
+        )
+
+    def _create_rate_limiter(
+        self, delay: float | None
+    ) -> api.rate_limiter.RateLimiter:
+        conf = self.config.get("rate_limiter", {})
+        rate = 1 / (delay or api.client.DEFAULT_DELAY)
+        if not conf.get("adaptive", True):
+            return api.rate_limiter.TokenBucket(
+                rate, burst=conf.get("burst", 1.0)
+            )
+        return api.rate_limiter.AdaptiveRateLimiter(
+            rate,
+            burst=conf.get("burst", 1.0),
+            min_rate=conf.get("min_rate"),
+            max_rate=conf.get("max_rate"),
+        )
 
     @cached_property
     def api_client(self) -> api.client.ApiClient:
         config = self.config
         token = config.get("token", {})
+        delay = self.api_delay or config.get("api_delay")
         return api.client.ApiClient(
             client_id=config.get("client_id"),
             client_secret=config.get("client_secret"),
             access_token=token.get("access_token"),
             refresh_token=token.get("refresh_token"),
             access_expires_at=token.get("access_expires_at"),
-            delay=self.api_delay or config.get("api_delay"),
+            token_broker=api.token_broker.ConfigTokenBroker(
+                config, self.config_path / TOKEN_LOCK_FILENAME
+            ),
+            refresh_margin=config.get(
+                "token_refresh_margin", api.client.DEFAULT_REFRESH_MARGIN
+            ),
+            delay=delay,
+            limiter=self._create_rate_limiter(delay),
             user_agent=self.user_agent or config.get("user_agent"),
             session=self.session,
         )
 
+    @cached_property
+    def async_api_client(self) -> api.async_client.AsyncApiClient:
+        return api.async_client.AsyncApiClient(
+            self.api_client,
+            max_concurrency=self.config.get(
+                "api_concurrency", api.async_client.DEFAULT_CONCURRENCY
+            ),
+        )
+
+    def _get_pages(
+        self, endpoint: str, pages: range, **params: Any
+    ) -> Iterator[dict[str, Any]]:
+        """Загружает независимые страницы выдачи параллельно.
+
+        За раз запрашивается не больше `api_concurrency` страниц, следующие
+        — когда эти разобраны, так что генератор остается ленивым.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Внутри работающего цикла событий asyncio.run() не запустить
+            for page in pages:
+                yield self.api_client.get(endpoint, page=page, **params)
+            return
+
+        client = self.async_api_client
+        window = max(client.max_concurrency, 1)
+
+        async def fetch(chunk: range) -> list[dict[str, Any]]:
+            return await asyncio.gather(
+                *(client.get(endpoint, page=page, **params) for page in chunk)
+            )
+
+        for start in range(0, len(pages), window):
+            yield from asyncio.run(fetch(pages[start : start + window]))
+
+    @cached_property
+    def reference(self) -> api.reference.ReferenceCache:
+        """Справочники API, закешированные в базе профиля."""
+        ttl_days = self.config.get("reference_cache_ttl")
+        return api.reference.ReferenceCache(
+            self.api_client,
+            self.storage.references,
+            ttl=(
+                timedelta(days=ttl_days)
+                if ttl_days is not None
+                else api.reference.DEFAULT_REFERENCE_TTL
+            ),
+        )
+
+    @cached_property
+    def vacancy_details(self) -> api.vacancy_details.VacancyDetailStore:
+        """Полные данные вакансий для фильтров, общие на весь запуск."""
+        ttl_days = self.config.get("vacancy_detail_ttl")
+        return api.vacancy_details.VacancyDetailStore(
+            self.api_client,
+            self.storage.vacancy_details,
+            ttl=(
+                timedelta(days=ttl_days)
+                if ttl_days is not None
+                else api.vacancy_details.DEFAULT_VACANCY_DETAIL_TTL
+            ),
+        )
+
+    @cached_property
+    def employer_cache(self) -> api.employer_cache.EmployerCache:
+        """Профили работодателей, закешированные в базе профиля."""
+        conf = self.config.get("employer_cache", {})
+        return api.employer_cache.EmployerCache(
+            self.api_client,
+            self.storage.employers,
+            self.storage.hidden_employers,
+            ttl=timedelta(
+                days=conf.get(
+                    "ttl", api.employer_cache.DEFAULT_EMPLOYER_TTL.days
+                )
+            ),
+            hidden_ttl=timedelta(
+                days=conf.get(
+                    "hidden_ttl",
+                    api.employer_cache.DEFAULT_HIDDEN_EMPLOYER_TTL.days,
+                )
+            ),
+            buffer=self.storage.buffer,
+        )
+
+    @cached_property
+    def negotiations_sync(self) -> api.negotiations_sync.NegotiationsSync:
+        """Инкрементальная синхронизация откликов в базу профиля."""
+        return api.negotiations_sync.NegotiationsSync(
+            self.api_client,
+            self.storage.negotiations,
+            self.storage.settings,
+        )
+
     def get_me(self) -> api.datatypes.User:
         return self.api_client.get("/me")
 
@@ -296,37 +451,31 @@ class HHApplicantTool(MegaTool):
         return resume["id"]
 
     def get_blacklisted(self) -> list[str]:
-        rv = []
-        for page in count():
-            r: api.datatypes.PaginatedItems[api.datatypes.EmployerShort] = (
-                self.api_client.get("/employers/blacklisted", page=page)
-            )
-            rv += [item["id"] for item in r["items"]]
-            if page + 1 >= r["pages"]:
-                break
+        r: api.datatypes.PaginatedItems[api.datatypes.EmployerShort] = (
+            self.api_client.get("/employers/blacklisted", page=0)
+        )
+        rv = [item["id"] for item in r["items"]]
+        for page in self._get_pages(
+            "/employers/blacklisted", range(1, r["pages"])
+        ):
+            rv += [item["id"] for item in page["items"]]
         return rv
 
     def get_negotiations(
         self, status: str = "active"
     ) -> Iterable[api.datatypes.Negotiation]:
-        for page in count():
-            r: dict[str, Any] = self.api_client.get(
-                "/negotiations",
-                page=page,
-                per_page=100,
-                status=status,
-            )
-
-            items = r.get("items", [])
-
-            if not items:
-                break
-
-            yield from items
+        params = {"per_page": 100, "status": status}
+        r: dict[str, Any] = self.api_client.get(
+            "/negotiations", page=0, **params
+        )
+        yield from r.get("items", [])
+        # Количество страниц известно после первого запроса, остальные
+        # друг от друга не зависят
+        for page in self._get_pages(
+            "/negotiations", range(1, r.get("pages", 0)), **params
+        ):
+            yield from page.get("items", [])
 
-            if page + 1 >= r.get("pages", 0):
-                break
-                
     def _is_authenticated(self, config: dict[str, Any]) -> bool:
         account = config.get('account') or {}
         if not account:
@@ -444,6 +593,11 @@ class HHApplicantTool(MegaTool):
             system_prompt=system_prompt,
             base_url=base_url,
             rate_limit=c.get("rate_limit", 40),
+            max_concurrency=(
+                c.get("max_concurrency")
+                or openai_config.get("max_concurrency")
+                or DEFAULT_OPENAI_CONCURRENCY
+            ),
             timeout=(
                 self.openai_timeout
                 or c.get("timeout")
@@ -626,6 +780,14 @@ class HHApplicantTool(MegaTool):
         except Exception as e:
             logger.exception(e)
         finally:
+            if "storage" in self.__dict__:
+                # Отложенные записи не должны пропасть ни при ошибке, ни
+                # при отмене
+                try:
+                    self.storage.flush()
+                except sqlite3.Error as ex:
+                    logger.error(f"Не удалось записать данные в базу: {ex}")
+
             # Токен мог автоматически обновиться
             if self.save_token():
                 logger.info("Токен был сохранен после обновления.")
@@ -634,6 +796,9 @@ class HHApplicantTool(MegaTool):
                 self.save_cookies()
             except Exception as ex:
                 logger.error(f"Не удалось сохранить cookies: {ex}")
+
+            for pooled in self.http_pools.values():
+                pooled.log_stats()
         return 1
 
     def _check_system_safe(self) -> None:
@@ -2,29 +2,49 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import html
 import logging
 import random
 import re
+import threading
 import time
+from contextlib import closing
+from dataclasses import dataclass, field
 from datetime import datetime
 from email.message import EmailMessage
-from itertools import chain
+from functools import cached_property
+from itertools import chain, islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Iterator, Literal
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Literal
 from urllib.parse import urlparse
 
 import requests
 
 from ..ai.base import AIError
+from ..ai.verdicts import VerdictCache
 from ..api import BadResponse, Redirect, datatypes
 from ..api.datatypes import PaginatedItems, SearchVacancy
 from ..api.errors import ApiError, CaptchaRequired, LimitExceeded
+from ..api.search_shards import SearchShardPlanner, fetch_shards
 from ..main import BaseNamespace, BaseOperation
 from ..storage.repositories.errors import RepositoryError
 from ..utils.datatypes import VacancyTestsData
+from ..utils import json as utils_json
+from ..utils.exclusion import ExclusionFilter, ExclusionMatch, ExclusionRule
 from ..utils.find import find_key
-from ..utils.json import JSONDecoder
+from ..utils.misc import calc_hash
+from ..utils.pipeline import DEFAULT_QUEUE_SIZE, Pipeline, Stage
+from ..utils.predicate import PredicateContext, PredicateError, VacancyPredicate
+from ..utils.prefetch import prefetch_pages
+from ..utils.ranking import DEFAULT_RANK_WEIGHTS, VacancyRanker
+from ..utils.relevance import RelevanceScorer
+from ..utils.site_crawler import (
+    DEFAULT_CLOSE_TIMEOUT,
+    DEFAULT_CRAWLER_WORKERS,
+    DEFAULT_DOMAIN_DELAY,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_TIMEOUT,
+    SiteCrawler,
+)
 from ..utils.string import (
     bool2str,
     rand_text,
@@ -39,6 +59,48 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__package__)
 
+# Воркеры стадий конвейера откликов. Поиск, дешевые фильтры, отклик и
+# побочные эффекты выполняются в одном потоке каждый
+DEFAULT_STAGE_WORKERS: dict[str, int] = {
+    "enrich": 3,
+    "ai": 2,
+    "letter": 2,
+}
+
+
+@dataclass
+class _ApplyTask:
+    """Вакансия, проходящая через стадии конвейера."""
+
+    vacancy: SearchVacancy
+    placeholders: dict[str, str]
+    # Причина отказа: стадии пропускают такую задачу до побочных эффектов
+    skip_reason: str | None = None
+    letter: str = ""
+    # Задача заняла место в бюджете --max-responses
+    reserved: bool = False
+
+
+def _is_decided(task: _ApplyTask) -> bool:
+    # Отказ уже решен: задача доходит до побочных эффектов и после
+    # остановки конвейера, иначе вердикт потеряется
+    return task.skip_reason is not None
+
+
+@dataclass
+class _ResumeRun:
+    """Состояние рассылки по одному резюме, общее для стадий."""
+
+    resume: datatypes.Resume
+    placeholders: dict[str, str]
+    seen_employers: set[str]
+    applied_count: int = 0
+    # Задачи, прошедшие стадию письма, но еще не дошедшие до отклика
+    reserved_count: int = 0
+    limit_reached: bool = False
+    pipeline: Pipeline | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
 
 class Namespace(BaseNamespace):
     resume_id: str | None
@@ -48,6 +110,9 @@ class Namespace(BaseNamespace):
     use_ai: bool
     ai_filter: Literal["heavy", "light", "custom"] | None
     ai_rate_limit: int
+    ai_batch_size: int
+    ai_prefilter_reject: float | None
+    ai_prefilter_accept: float | None
     ai_filter_prompt: str | None
     system_prompt: str
     message_prompt: str
@@ -81,8 +146,13 @@ class Namespace(BaseNamespace):
     no_magic: bool
     premium: bool
     per_page: int
+    rank_pages: int
     total_pages: int
+    prefetch_pages: int
+    shard_search: bool
+    shard_workers: int
     excluded_filter: str | None
+    where: str | None
     max_responses: int
     send_email: bool
     skip_tests: bool
@@ -132,6 +202,22 @@ class Operation(BaseOperation):
             type=int,
             default=40,
         )
+        parser.add_argument(
+            "--ai-batch-size",
+            help="Сколько вакансий отправлять AI-фильтру одним запросом (1 — по одной)",  # noqa: E501
+            type=int,
+            default=1,
+        )
+        parser.add_argument(
+            "--ai-prefilter-reject",
+            help="Отклонять без AI вакансии, чья текстовая близость к резюме (0–1) ниже этого порога",  # noqa: E501
+            type=float,
+        )
+        parser.add_argument(
+            "--ai-prefilter-accept",
+            help="Принимать без AI вакансии, чья текстовая близость к резюме (0–1) не ниже этого порога",  # noqa: E501
+            type=float,
+        )
         parser.add_argument(
             "--ai-filter-prompt",
             help="Системный промпт для AI-фильтра (используется только в режиме custom)",
@@ -162,6 +248,29 @@ class Operation(BaseOperation):
             default=100,
             type=int,
         )
+        parser.add_argument(
+            "--prefetch-pages",
+            help="Сколько следующих страниц поиска загружать заранее, пока идут отклики (0 — не загружать)",  # noqa: E501
+            default=2,
+            type=int,
+        )
+        parser.add_argument(
+            "--rank-pages",
+            help="Собрать вакансии с первых N страниц поиска и откликаться сначала на лучшие: свежие, с зарплатой не ниже ожидаемой, похожие на резюме, от отвечающих работодателей (0 — в порядке выдачи)",  # noqa: E501
+            default=0,
+            type=int,
+        )
+        parser.add_argument(
+            "--shard-search",
+            help="Разбить поиск на подзапросы по датам публикации, регионам и профролям, чтобы обойти предел в 2000 результатов, и загружать их параллельно. --total-pages тогда считается на каждый подзапрос",  # noqa: E501
+            action=argparse.BooleanOptionalAction,
+        )
+        parser.add_argument(
+            "--shard-workers",
+            help="Сколько подзапросов загружать одновременно при --shard-search",  # noqa: E501
+            default=3,
+            type=int,
+        )
         parser.add_argument(
             "--send-email",
             help="Отправлять письмо на email компании или рекрутера с просьбой рассмотреть резюме",
@@ -177,6 +286,11 @@ class Operation(BaseOperation):
             type=str,
             help=r"Исключить вакансии, если название или описание не соответствует шаблону. Например, `--excluded-filter 'junior|стажир|bitrix|дружн\w+ коллектив|полиграф|open\s*space|опенспейс|хакатон|конкурс|тестов\w+ задан'`",
         )
+        parser.add_argument(
+            "--where",
+            type=str,
+            help="Условие на вакансии из поиска, проверяется до загрузки деталей и AI. Например, `--where 'salary >= 200000 and experience in (between1And3, between3And6) and employer not in (1740) and age <= 7 and work_format in (REMOTE)'`. Поля: salary, salary_from, salary_to (в рублях; можно `salary >= 3000 USD`), age (дней с публикации), experience, employer, schedule, employment, area (с вложенными регионами), work_format, has_salary, has_contacts, has_test, premium",  # noqa: E501
+        )
         parser.add_argument(
             "--max-responses",
             type=int,
@@ -306,6 +420,17 @@ class Operation(BaseOperation):
             help="Поля поиска (name, company_name и т.п.)",
         )
 
+    stage_workers: dict[str, int] = DEFAULT_STAGE_WORKERS
+    rank_weights: dict[str, float] = DEFAULT_RANK_WEIGHTS
+    ai_batch_size: int = 1
+    ai_prefilter_reject: float | None = None
+    ai_prefilter_accept: float | None = None
+    rank_pages: int = 0
+    shard_search: bool = False
+    shard_workers: int = 3
+    exclusion_rules: list[ExclusionRule] = []
+    vacancy_where: str | None = None
+
     cover_letter: str = "{Здравствуйте|Добрый день}, меня зовут %(first_name)s. {Прошу|Предлагаю} рассмотреть {мою кандидатуру|мое резюме «%(resume_title)s»} на вакансию «%(vacancy_name)s». С уважением, %(first_name)s."
 
     @property
@@ -316,6 +441,82 @@ class Operation(BaseOperation):
     def args(self) -> Namespace:
         return self._args
 
+    @cached_property
+    def _site_crawler(self) -> SiteCrawler:
+        conf = self.tool.config.get("site_crawler") or {}
+        return SiteCrawler(
+            self.tool.site_session,
+            self.tool.storage.employer_sites,
+            writer=self.tool.storage.writer,
+            workers=conf.get("workers", DEFAULT_CRAWLER_WORKERS),
+            max_bytes=conf.get("max_bytes", DEFAULT_MAX_BYTES),
+            timeout=conf.get("timeout", DEFAULT_TIMEOUT),
+            domain_delay=conf.get("domain_delay", DEFAULT_DOMAIN_DELAY),
+            follow_contacts=conf.get("follow_contacts", True),
+            close_timeout=conf.get("close_timeout", DEFAULT_CLOSE_TIMEOUT),
+        )
+
+    @cached_property
+    def _skipped_index(self) -> dict[str, set[int]]:
+        # id резюме -> id пропущенных для него вакансий
+        return {}
+
+    @cached_property
+    def _resume_analysis_cache(self) -> dict[tuple[str | None, str], str]:
+        # (id резюме, режим) -> текст для AI-фильтра
+        return {}
+
+    @cached_property
+    def _exclusion_filter(self) -> ExclusionFilter:
+        # Компилируется один раз на запуск
+        rules = list(self.exclusion_rules)
+        if self.excluded_filter:
+            rules.insert(
+                0,
+                ExclusionRule(
+                    self.excluded_filter,
+                    ("name", "snippet", "description"),
+                    "--excluded-filter",
+                ),
+            )
+        return ExclusionFilter(rules)
+
+    @cached_property
+    def _vacancy_predicate(self) -> VacancyPredicate | None:
+        # Компилируется один раз на запуск
+        if not self.vacancy_where:
+            return None
+        reference = self.tool.reference
+        rates = {
+            c["code"]: c["rate"]
+            for c in reference.dictionaries().get("currency") or []
+        }
+        rates.setdefault("RUR", 1.0)
+        rates.setdefault("RUB", rates["RUR"])
+        # Дерево регионов весит несколько мегабайт: только если нужно
+        area_parents = (
+            {item.id: item.parent_id for item in reference.areas()}
+            if re.search(r"\barea\b", self.vacancy_where)
+            else {}
+        )
+        return VacancyPredicate.compile(
+            self.vacancy_where, PredicateContext(rates, area_parents)
+        )
+
+    @cached_property
+    def _relevance_scorers(self) -> dict[str, RelevanceScorer]:
+        # id резюме -> оценка близости вакансий к нему
+        return {}
+
+    @cached_property
+    def _verdict_cache(self) -> VerdictCache:
+        return VerdictCache(self.tool.storage.ai_verdicts)
+
+    @cached_property
+    def _applied_index(self) -> dict[str, set[int]]:
+        # id резюме -> id вакансий, на которые уже есть отклик
+        return {}
+
     def run(
         self,
         tool: HHApplicantTool,
@@ -338,6 +539,29 @@ class Operation(BaseOperation):
         self.employment = args.employment
         self.excluded_employer_id = args.excluded_employer_id
         self.excluded_filter = args.excluded_filter
+        try:
+            self.exclusion_rules = [
+                ExclusionRule.from_config(conf, n)
+                for n, conf in enumerate(
+                    tool.config.get("exclusion_rules") or [], 1
+                )
+            ]
+            # Неверное выражение — ошибка до первого запроса к поиску
+            _ = self._exclusion_filter
+        except ValueError as ex:
+            logger.error(ex)
+            return 1
+        self.vacancy_where = " and ".join(
+            f"({cond})"
+            for cond in (tool.config.get("vacancy_where"), args.where)
+            if cond
+        )
+        # Ошибка в условии — до первого запроса к поиску
+        try:
+            _ = self._vacancy_predicate
+        except PredicateError as ex:
+            logger.error("Ошибка в условии --where/vacancy_where: %s", ex)
+            return 1
         self.experience = args.experience
         self.force_message = args.force_message
         self.industry = args.industry
@@ -349,6 +573,13 @@ class Operation(BaseOperation):
         self.only_with_salary = args.only_with_salary
         self.order_by = args.order_by
         self.per_page = args.per_page
+        self.prefetch_pages = args.prefetch_pages
+        self.rank_pages = args.rank_pages
+        self.shard_search = bool(args.shard_search)
+        self.shard_workers = max(args.shard_workers, 1)
+        self.rank_weights = DEFAULT_RANK_WEIGHTS | (
+            tool.config.get("apply_ranking") or {}
+        )
         self.period = args.period
         self.message_prompt = args.message_prompt
         self.premium = args.premium
@@ -364,6 +595,9 @@ class Operation(BaseOperation):
         self.sort_point_lng = args.sort_point_lng
         self.top_lat = args.top_lat
         self.total_pages = args.total_pages
+        self.stage_workers = DEFAULT_STAGE_WORKERS | (
+            tool.config.get("apply_workers") or {}
+        )
         self.cover_letter_ai = (
             tool.get_cover_letter_ai(args.system_prompt)
             if args.use_ai
@@ -371,8 +605,10 @@ class Operation(BaseOperation):
         )
         self.ai_filter = args.ai_filter
         self.ai_filter_prompt = args.ai_filter_prompt
+        self.ai_batch_size = max(args.ai_batch_size, 1)
+        self.ai_prefilter_reject = args.ai_prefilter_reject
+        self.ai_prefilter_accept = args.ai_prefilter_accept
         self.vacancy_filter_ai = None
-        self._resume_analysis_cache: dict[tuple[str | None, str], str] = {}
 
         self._apply_vacancies()
 
@@ -380,66 +616,112 @@ class Operation(BaseOperation):
         return self.api_client.get(f"/resumes/{resume_id}")
 
     def _analyze_resume_heavy(self, resume: dict) -> str:
+        if not resume.get("id"):
+            return ""
+        try:
+            return self._resume_analysis(
+                resume, "heavy", self._format_resume_heavy
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось получить полное резюме: {e}")
+            return ""
+
+    def _analyze_resume_light(self, resume: dict) -> str:
+        return self._resume_analysis(
+            resume, "light", self._format_resume_light
+        )
+
+    def _resume_analysis(
+        self,
+        resume: dict,
+        mode: str,
+        build: Callable[[dict], str],
+    ) -> str:
+        """Текст резюме для AI-фильтра.
+
+        Хранится в базе по id резюме и режиму вместе с хешем `updated_at`
+        резюме и пересобирается, только когда резюме изменилось. Один и
+        тот же текст дает один и тот же системный промпт, а такие промпты
+        провайдер кеширует.
+        """
         resume_id = resume.get("id")
-        cache_key = (resume_id, "heavy")
+        cache_key = (resume_id, mode)
         if cache_key in self._resume_analysis_cache:
             return self._resume_analysis_cache[cache_key]
 
-        if resume_id:
-            try:
-                full_resume = self._get_full_resume(resume_id)
+        full_resume = None
+        if updated_at := resume.get("updated_at"):
+            resume_hash = calc_hash(updated_at)
+        else:
+            full_resume = self._get_full_resume(resume_id)
+            resume_hash = calc_hash(
+                utils_json.dumps(full_resume, sort_keys=True)
+            )
 
-                parts = []
+        repository = self.tool.storage.resume_analyses
+        try:
+            result = repository.get_analysis(resume_id, mode, resume_hash)
+        except RepositoryError as ex:
+            logger.warning(ex)
+            result = None
 
-                title = full_resume.get("title", "")
-                if title:
-                    parts.append(f"Должность: {title}")
+        if result is None:
+            result = build(full_resume or self._get_full_resume(resume_id))
+            try:
+                repository.save(
+                    repository.model(
+                        resume_id=resume_id,
+                        mode=mode,
+                        resume_hash=resume_hash,
+                        analysis=result,
+                    )
+                )
+            except RepositoryError as ex:
+                logger.warning(ex)
+        else:
+            logger.debug("resume analysis %s (%s) from cache", resume_id, mode)
 
-                if "skills" in full_resume:
-                    parts.append("\n---------- О СЕБЕ ----------")
-                    parts.append(full_resume.get("skills", ""))
+        self._resume_analysis_cache[cache_key] = result
+        return result
 
-                if "skill_set" in full_resume and full_resume["skill_set"]:
-                    parts.append("\n---------- НАВЫКИ ----------")
-                    skills_row = ", ".join(full_resume["skill_set"])
-                    parts.append(skills_row)
+    def _format_resume_heavy(self, full_resume: dict) -> str:
+        parts = []
 
-                if "experience" in full_resume:
-                    parts.append("\n---------- ОПЫТ РАБОТЫ ----------")
-                    for exp in full_resume.get("experience", []):
-                        company = exp.get("company", "Не указано")
-                        position = exp.get("position", "Не указано")
-                        start = exp.get("start", "")
-                        end = exp.get("end") or "по настоящее время"
+        title = full_resume.get("title", "")
+        if title:
+            parts.append(f"Должность: {title}")
 
-                        parts.append(f"\n- {company}")
-                        parts.append(f" Должность: {position}")
-                        parts.append(f" Период: {start} - {end}")
+        if "skills" in full_resume:
+            parts.append("\n---------- О СЕБЕ ----------")
+            parts.append(full_resume.get("skills", ""))
 
-                        description = exp.get("description")
-                        if description:
-                            parts.append(" Описание:")
-                            parts.append(f" {description}")
+        if "skill_set" in full_resume and full_resume["skill_set"]:
+            parts.append("\n---------- НАВЫКИ ----------")
+            skills_row = ", ".join(full_resume["skill_set"])
+            parts.append(skills_row)
 
-                result = "\n".join(parts)
-                self._resume_analysis_cache[cache_key] = result
-                return result
+        if "experience" in full_resume:
+            parts.append("\n---------- ОПЫТ РАБОТЫ ----------")
+            for exp in full_resume.get("experience", []):
+                company = exp.get("company", "Не указано")
+                position = exp.get("position", "Не указано")
+                start = exp.get("start", "")
+                end = exp.get("end") or "по настоящее время"
 
-            except Exception as e:
-                logger.warning(f"Не удалось получить полное резюме: {e}")
+                parts.append(f"\n- {company}")
+                parts.append(f" Должность: {position}")
+                parts.append(f" Период: {start} - {end}")
 
-        return ""
+                description = exp.get("description")
+                if description:
+                    parts.append(" Описание:")
+                    parts.append(f" {description}")
 
-    def _analyze_resume_light(self, resume: dict) -> str:
-        resume_id = resume.get("id")
-        cache_key = (resume_id, "light")
-        if cache_key in self._resume_analysis_cache:
-            return self._resume_analysis_cache[cache_key]
+        return "\n".join(parts)
 
+    def _format_resume_light(self, full_resume: dict) -> str:
         parts = []
 
-        full_resume = self._get_full_resume(resume_id)
-
         title = full_resume.get("title", "")
         if title:
             parts.append(f"Должность: {title}")
@@ -449,27 +731,22 @@ class Operation(BaseOperation):
             skills_row = ", ".join(full_resume["skill_set"])
             parts.append(skills_row)
 
-        result = "\n".join(parts)
-        self._resume_analysis_cache[cache_key] = result
-        return result
+        return "\n".join(parts)
 
-    def _get_vacancy_key_skills(self, vacancy_id: str | int) -> str:
+    def _get_vacancy_key_skills(self, vacancy: dict) -> str:
         try:
-            full_vacancy = self.api_client.get(f"/vacancies/{vacancy_id}")
-            key_skills_data = full_vacancy.get("key_skills") or []
-            return ", ".join(
-                s["name"] for s in key_skills_data if s.get("name")
-            )
+            return ", ".join(self.tool.vacancy_details.get(vacancy).key_skills)
         except Exception as e:
             logger.warning(
-                "Не удалось получить key_skills вакансии %s: %s", vacancy_id, e
+                "Не удалось получить key_skills вакансии %s: %s",
+                vacancy.get("id"),
+                e,
             )
             return ""
 
     def _build_vacancy_context(
         self,
         vacancy: dict,
-        full_vacancy: dict | None = None,
         include_full: bool = False,
     ) -> str:
         parts: list[str] = []
@@ -478,26 +755,29 @@ class Operation(BaseOperation):
         if name:
             parts.append(f"Вакансия: {name}")
 
-        if full_vacancy:
-            description = full_vacancy.get("description")
+        if not vacancy.get("id"):
+            return "\n".join(parts)
+
+        if include_full:
+            description = self.tool.vacancy_details.get(vacancy).description
             if description:
-                parts.append(f"Описание: {strip_tags(description)}")
+                parts.append(f"Описание: {description}")
         else:
-            if vacancy.get("id"):
-                key_skills = self._get_vacancy_key_skills(vacancy["id"])
-                if key_skills:
-                    parts.append(f"Ключевые навыки: {key_skills}")
+            key_skills = self._get_vacancy_key_skills(vacancy)
+            if key_skills:
+                parts.append(f"Ключевые навыки: {key_skills}")
 
         return "\n".join(parts)
 
-    def _ask_ai_suitability(
+    def _ask_ai_verdict(
         self, prompt: str, vacancy_name: str, log_suffix: str = ""
-    ) -> bool:
+    ) -> bool | None:
+        """Ответ AI или None, если он не ответил по делу."""
 
         MAX_RETRIES = 3
 
         if not self.vacancy_filter_ai:
-            return True
+            return None
 
         for attempt in range(MAX_RETRIES):
             try:
@@ -533,7 +813,7 @@ class Operation(BaseOperation):
             except AIError as e:
                 # ChatOpenAI уже делает retry для 429, поэтому здесь только логируем
                 logger.error("Ошибка AI %s: %s", log_suffix, e)
-                return True
+                return None
 
         logger.warning(
             "AI %s не дал валидный JSON после %d попыток для вакансии %s",
@@ -541,7 +821,104 @@ class Operation(BaseOperation):
             MAX_RETRIES,
             vacancy_name,
         )
-        return True
+        return None
+
+    def _ask_ai_cached(
+        self, vacancy: dict, vacancy_info: str, log_suffix: str
+    ) -> bool:
+        """Ответ AI-фильтра с учетом сохраненных ранее ответов."""
+        if not self.vacancy_filter_ai:
+            return True
+
+        prompt = f"Вакансия: {vacancy_info}"
+        system_prompt = self.vacancy_filter_ai.system_prompt or ""
+        verdict = self._verdict_cache.get(system_prompt, vacancy["id"], prompt)
+        if verdict is not None:
+            logger.debug(
+                "AI %s ответ для вакансии %s из кеша: %s",
+                log_suffix,
+                vacancy["id"],
+                verdict,
+            )
+            return verdict
+
+        started = time.monotonic()
+        verdict = self._ask_ai_verdict(
+            prompt, vacancy.get("name", ""), log_suffix
+        )
+        if verdict is None:
+            # Без внятного ответа вакансию не отбрасываем и не запоминаем
+            return True
+        self._verdict_cache.put(
+            system_prompt,
+            vacancy["id"],
+            prompt,
+            verdict,
+            model=self.vacancy_filter_ai.model,
+            latency=time.monotonic() - started,
+        )
+        return verdict
+
+    def _ask_ai_batch(self, prompts: dict[str, str]) -> dict[str, bool]:
+        """Один запрос на несколько вакансий: id вакансии -> ответ.
+
+        Вакансий, которых нет в ответе (или весь ответ не разобран), в
+        результате нет — их спрашивают по одной.
+        """
+        message = (
+            "Оцени каждую вакансию отдельно. Ответ строго JSON-массив, по"
+            " элементу на вакансию:\n"
+            '[{"id": "<id вакансии>", "suitable": true}, ...]\n\n'
+            + "\n\n".join(
+                f"[id: {vid}]\n{prompt}" for vid, prompt in prompts.items()
+            )
+        )
+        started = time.monotonic()
+        try:
+            response = self.vacancy_filter_ai.complete(message)
+        except AIError as e:
+            logger.error("Ошибка AI (пачка из %d): %s", len(prompts), e)
+            return {}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("AI ответ на пачку: %s", response)
+
+        verdicts = {
+            vid: suitable
+            for vid, suitable in self._parse_ai_batch_response(
+                response
+            ).items()
+            if vid in prompts
+        }
+        if len(verdicts) < len(prompts):
+            logger.warning(
+                "AI ответил на %d из %d вакансий пачки",
+                len(verdicts),
+                len(prompts),
+            )
+        # Время пачки делим поровну между вакансиями
+        latency = (time.monotonic() - started) / len(prompts)
+        system_prompt = self.vacancy_filter_ai.system_prompt or ""
+        for vid, suitable in verdicts.items():
+            self._verdict_cache.put(
+                system_prompt,
+                vid,
+                prompts[vid],
+                suitable,
+                model=self.vacancy_filter_ai.model,
+                latency=latency,
+            )
+        return verdicts
+
+    def _parse_ai_batch_response(self, response: str) -> dict[str, bool]:
+        verdicts: dict[str, bool] = {}
+        # Массив разбираем по объектам: так переживаем обрезанный ответ,
+        # markdown и мусор вокруг
+        for obj in re.findall(r"\{[^{}]*\}", response):
+            id_match = re.search(r'"id"\s*:\s*"?(\d+)"?', obj)
+            suitable = self._parse_ai_json_response(obj)
+            if id_match and suitable is not None:
+                verdicts[id_match.group(1)] = suitable
+        return verdicts
 
     def _parse_ai_json_response(self, response: str) -> bool | None:
         response = response.strip().lower()
@@ -553,8 +930,6 @@ class Operation(BaseOperation):
 
         import re
 
-        from ..utils import json as utils_json
-
         if response.startswith("```"):
             response = re.sub(r"^```(?:json)?\s*", "", response)
             response = re.sub(r"\s*```$", "", response)
@@ -577,26 +952,12 @@ class Operation(BaseOperation):
     def _is_vacancy_suitable_heavy(
         self, vacancy: dict, log_suffix: str = "(heavy)"
     ) -> bool:
-        full_vacancy = None
-        if vacancy.get("id"):
-            full_vacancy = self.api_client.get(f"/vacancies/{vacancy['id']}")
-
-        vacancy_info = self._build_vacancy_context(
-            vacancy,
-            full_vacancy=full_vacancy,
-            include_full=True,
-        )
-        prompt = f"Вакансия: {vacancy_info}"
-        return self._ask_ai_suitability(
-            prompt, vacancy.get("name", ""), log_suffix
-        )
+        vacancy_info = self._build_vacancy_context(vacancy, include_full=True)
+        return self._ask_ai_cached(vacancy, vacancy_info, log_suffix)
 
     def _is_vacancy_suitable_light(self, vacancy: dict) -> bool:
         vacancy_info = self._build_vacancy_context(vacancy, include_full=False)
-        prompt = f"Вакансия: {vacancy_info}"
-        return self._ask_ai_suitability(
-            prompt, vacancy.get("name", ""), "(light)"
-        )
+        return self._ask_ai_cached(vacancy, vacancy_info, "(light)")
 
     def _build_filter_system_prompt_heavy(self, resume_analysis: str) -> str:
         return f"""
@@ -723,28 +1084,35 @@ class Operation(BaseOperation):
             logger.warning("У вас нет опубликованных резюме")
             return
 
+        # Свежие отклики нужны до старта: по ним отсеиваются вакансии
+        try:
+            self.tool.negotiations_sync.sync()
+        except (ApiError, RepositoryError) as ex:
+            logger.warning("Не удалось синхронизировать отклики: %s", ex)
+
         me: datatypes.User = self.tool.get_me()
         seen_employers = set()
 
-        for resume in resumes:
-            limit_reached = self._apply_resume(
-                resume=resume,
-                user=me,
-                seen_employers=seen_employers,
-            )
-            if limit_reached:
-                logger.warning(
-                    "Лимит откликов hh.ru исчерпан. Пропускаю оставшиеся резюме."
+        finished = False
+        try:
+            for resume in resumes:
+                limit_reached = self._apply_resume(
+                    resume=resume,
+                    user=me,
+                    seen_employers=seen_employers,
                 )
-                print("⛔ Лимит откликов hh.ru исчерпан. Попробуйте позже.")
-                break
-
-        # Синхронизация откликов
-        # for neg in self.tool.get_negotiations():
-        #     try:
-        #         self.tool.storage.negotiations.save(neg)
-        #     except RepositoryError as e:
-        #         logger.warning(e)
+                if limit_reached:
+                    logger.warning(
+                        "Лимит откликов hh.ru исчерпан. Пропускаю оставшиеся резюме."
+                    )
+                    print("⛔ Лимит откликов hh.ru исчерпан. Попробуйте позже.")
+                    break
+            finished = True
+        finally:
+            # Потоки обхода сайтов не должны пережить операцию. Собранное
+            # пригодится в следующий раз, но после ошибки обход не ждем
+            if "_site_crawler" in self.__dict__:
+                self._site_crawler.close(None if finished else 0)
 
         print("📝 Отклики на вакансии разосланы!")
 
@@ -760,8 +1128,6 @@ class Operation(BaseOperation):
             resume["title"],
         )
         print("🚀 Начинаю рассылку откликов для резюме:", resume["title"])
-        applied_count = 0
-        limit_reached = False
 
         placeholders = {
             "first_name": user.get("first_name") or "",
@@ -773,10 +1139,6 @@ class Operation(BaseOperation):
             "resume_url": resume.get("alternate_url") or "",
         }
 
-        do_apply = True
-        storage = self.tool.storage
-        site_emails = {}
-
         if self.ai_filter:
             if self.ai_filter in ("heavy", "custom"):
                 resume_analysis = self._analyze_resume_heavy(resume)
@@ -823,312 +1185,614 @@ class Operation(BaseOperation):
             if self.args.ai_rate_limit:
                 self.vacancy_filter_ai.rate_limit = self.args.ai_rate_limit
 
-        for vacancy in self._get_vacancies(resume_id=resume["id"]):
             if (
-                getattr(self, "_cancel_event", None)
-                and self._cancel_event.is_set()
+                self.ai_prefilter_reject is not None
+                or self.ai_prefilter_accept is not None
             ):
-                logger.info("Операция отменена пользователем")
-                break
-            if self.max_responses and applied_count >= self.max_responses:
-                logger.info(
-                    "Достигнут лимит откликов --max-responses (%d). Останавливаюсь.",
-                    self.max_responses,
+                self._relevance_scorers[resume["id"]] = RelevanceScorer(
+                    resume_analysis
                 )
-                break
+
+        # Индексы грузим до старта, а не на первой вакансии
+        try:
+            self._applied_ids(resume["id"])
+            if self.ai_filter:
+                self._skipped_ids(resume["id"])
+                self._skipped_ids("")
+        except RepositoryError as ex:
+            logger.warning(ex)
+
+        run = _ResumeRun(
+            resume=resume,
+            placeholders=placeholders,
+            seen_employers=seen_employers,
+        )
+        workers = self.stage_workers
+        vacancies = self._get_vacancies(resume_id=resume["id"])
+        if self.rank_pages > 0:
+            vacancies = self._rank_vacancies(resume, vacancies)
+        run.pipeline = Pipeline(
+            # Поиск: страницы подгружаются впрок в _get_vacancies
+            vacancies,
+            [
+                Stage("filter", self._stage(run, self._filter_vacancy)),
+                Stage(
+                    "enrich",
+                    self._stage(run, self._enrich_vacancy),
+                    workers=workers.get("enrich", 1),
+                ),
+                Stage(
+                    "ai",
+                    self._stage(
+                        run,
+                        self._judge_vacancies
+                        if self.ai_batch_size > 1
+                        else self._judge_vacancy,
+                    ),
+                    workers=workers.get("ai", 1),
+                    batch=self.ai_batch_size,
+                    passthrough=_is_decided,
+                ),
+                Stage(
+                    "letter",
+                    self._stage(run, self._write_letter),
+                    workers=workers.get("letter", 1),
+                    passthrough=_is_decided,
+                ),
+                # Отклики строго по одному: их частоту ограничивает API
+                Stage(
+                    "apply",
+                    self._stage(run, self._apply_reserved),
+                    passthrough=_is_decided,
+                ),
+                Stage(
+                    "effects",
+                    self._stage(run, self._finish_vacancy),
+                    drain=True,
+                ),
+            ],
+            # Пачка для AI набирается из очереди перед стадией
+            queue_size=max(DEFAULT_QUEUE_SIZE, self.ai_batch_size),
+            cancel_event=getattr(self, "_cancel_event", None),
+        )
+        try:
+            run.pipeline.run()
+        finally:
+            # Остаток отложенной записи, в том числе при отмене
             try:
-                employer = vacancy.get("employer", {})
+                self.tool.storage.flush()
+            except RepositoryError as ex:
+                logger.warning(ex)
 
-                message_placeholders = {
-                    "vacancy_name": vacancy.get("name", ""),
-                    "employer_name": employer.get("name", ""),
-                    **placeholders,
-                }
+        if (
+            getattr(self, "_cancel_event", None)
+            and self._cancel_event.is_set()
+        ):
+            logger.info("Операция отменена пользователем")
 
-                try:
-                    storage.vacancies.save(vacancy)
-                except RepositoryError as ex:
-                    logger.debug(ex)
+        logger.info(
+            "Закончили рассылку откликов для резюме: %s (%s). Отправлено: %d",
+            resume["alternate_url"],
+            resume["title"],
+            run.applied_count,
+        )
+        print(
+            f"✅️ Закончили рассылку для резюме: {resume['title']}. Отправлено: {run.applied_count}"
+        )
+        return run.limit_reached
 
-                # По факту контакты можно получить только здесь?!
-                if vacancy.get("contacts"):
-                    logger.debug(
-                        f"Найдены контакты в вакансии: {vacancy['alternate_url']}"
-                    )
+    def _stage(
+        self,
+        run: _ResumeRun,
+        handler: Callable[[_ResumeRun, Any], _ApplyTask | None],
+    ) -> Callable[[Any], _ApplyTask | None]:
+        """Оборачивает стадию: ошибка API пропускает только эту вакансию."""
 
-                    try:
-                        # logger.debug(vacancy)
-                        storage.vacancy_contacts.save(vacancy)
-                    except RepositoryError as ex:
-                        logger.exception(ex)
+        def process(item: Any) -> _ApplyTask | None:
+            try:
+                return handler(run, item)
+            except LimitExceeded:
+                run.limit_reached = True
+                run.pipeline.stop()
+                logger.warning(
+                    "Достигли лимита на отклики (отправлено в этой сессии: %d)",
+                    run.applied_count,
+                )
+            except ApiError as ex:
+                logger.warning(ex)
+            except (BadResponse, AIError) as ex:
+                logger.error(ex)
+            return None
 
-                if not do_apply:
-                    continue
+        return process
 
-                vacancy_id = vacancy["id"]
-                relations = vacancy.get("relations", [])
+    def _filter_vacancy(
+        self, run: _ResumeRun, vacancy: SearchVacancy
+    ) -> _ApplyTask | None:
+        """Дешевые проверки без сети."""
+        storage = self.tool.storage
+        try:
+            storage.buffer.save(storage.vacancies, vacancy)
+        except RepositoryError as ex:
+            logger.debug(ex)
 
-                if relations:
-                    logger.debug(
-                        "Пропускаем вакансию с откликом: %s",
-                        vacancy["alternate_url"],
-                    )
-                    if "got_rejection" in relations:
-                        logger.debug(
-                            "Вы получили отказ от %s",
-                            vacancy["alternate_url"],
-                        )
-                        print("⛔ Пришел отказ от", vacancy["alternate_url"])
-                    continue
+        # По факту контакты можно получить только здесь?!
+        if vacancy.get("contacts"):
+            logger.debug(
+                f"Найдены контакты в вакансии: {vacancy['alternate_url']}"
+            )
 
-                if vacancy.get("archived"):
-                    logger.debug(
-                        "Пропускаем вакансию в архиве: %s",
-                        vacancy["alternate_url"],
-                    )
-                    continue
+            try:
+                storage.buffer.save(storage.vacancy_contacts, vacancy)
+            except RepositoryError as ex:
+                logger.exception(ex)
 
-                if vacancy.get("has_test") and self.args.skip_tests:
-                    logger.debug(
-                        "Пропускаю вакансию с тестом %s",
-                        vacancy["alternate_url"],
-                    )
-                    continue
+        if relations := vacancy.get("relations", []):
+            logger.debug(
+                "Пропускаем вакансию с откликом: %s",
+                vacancy["alternate_url"],
+            )
+            if "got_rejection" in relations:
+                logger.debug(
+                    "Вы получили отказ от %s",
+                    vacancy["alternate_url"],
+                )
+                print("⛔ Пришел отказ от", vacancy["alternate_url"])
+            return None
 
-                if redirect_url := vacancy.get("response_url"):
-                    logger.debug(
-                        "Пропускаем вакансию %s с перенаправлением: %s",
-                        vacancy["alternate_url"],
-                        redirect_url,
-                    )
-                    continue
+        if self._is_vacancy_already_applied(vacancy, run.resume["id"]):
+            logger.debug(
+                "Пропускаем вакансию, на которую уже откликались: %s",
+                vacancy["alternate_url"],
+            )
+            return None
 
-                if self._is_excluded(vacancy):
-                    logger.info(
-                        "Вакансия попала под фильтр: %s",
-                        vacancy["alternate_url"],
-                    )
+        if vacancy.get("archived"):
+            logger.debug(
+                "Пропускаем вакансию в архиве: %s",
+                vacancy["alternate_url"],
+            )
+            return None
 
-                    self._save_skipped_vacancy(
-                        vacancy, "excluded_filter", resume["id"]
-                    )
+        if vacancy.get("has_test") and self.args.skip_tests:
+            logger.debug(
+                "Пропускаю вакансию с тестом %s",
+                vacancy["alternate_url"],
+            )
+            return None
 
-                    self.api_client.put(
-                        f"/vacancies/blacklisted/{vacancy['id']}"
-                    )
-                    logger.info(
-                        "Вакансия добавлена в черный список: %s",
-                        vacancy["alternate_url"],
-                    )
-                    continue
+        if redirect_url := vacancy.get("response_url"):
+            logger.debug(
+                "Пропускаем вакансию %s с перенаправлением: %s",
+                vacancy["alternate_url"],
+                redirect_url,
+            )
+            return None
 
-                # AI фильтрация вакансий
-                if self.ai_filter and self.vacancy_filter_ai:
-                    if self._is_vacancy_already_skipped(vacancy, resume["id"]):
-                        logger.debug(
-                            "Вакансия уже была отклонена ранее: %s",
-                            vacancy["alternate_url"],
-                        )
-                        print(
-                            "⏩ Вакансия уже отклонена ранее",
-                            vacancy["alternate_url"],
-                        )
-                        continue
+        if self.ai_filter and self.vacancy_filter_ai:
+            if self._is_vacancy_already_skipped(vacancy, run.resume["id"]):
+                logger.debug(
+                    "Вакансия уже была отклонена ранее: %s",
+                    vacancy["alternate_url"],
+                )
+                print(
+                    "⏩ Вакансия уже отклонена ранее",
+                    vacancy["alternate_url"],
+                )
+                return None
+
+        employer = vacancy.get("employer") or {}
+        return _ApplyTask(
+            vacancy=vacancy,
+            placeholders={
+                "vacancy_name": vacancy.get("name", ""),
+                "employer_name": employer.get("name", ""),
+                **run.placeholders,
+            },
+        )
 
-                    if self.ai_filter in ("heavy", "custom"):
-                        is_suitable = self._is_vacancy_suitable_heavy(
-                            vacancy, "(custom)" if self.ai_filter == "custom" else "(heavy)"
-                        )
-                    else:
-                        is_suitable = self._is_vacancy_suitable_light(vacancy)
+    def _enrich_vacancy(
+        self, run: _ResumeRun, task: _ApplyTask
+    ) -> _ApplyTask | None:
+        """Сетевые запросы: полный текст вакансии для фильтра."""
+        vacancy = task.vacancy
+        if excluded := self._match_exclusion(vacancy):
+            logger.info(
+                "Вакансия попала под фильтр %s (%s: %r): %s",
+                excluded.rule,
+                excluded.field,
+                excluded.text,
+                vacancy["alternate_url"],
+            )
+            task.skip_reason = "excluded_filter"
+        return task
+
+    def _visit_employer(self, run: _ResumeRun, task: _ApplyTask) -> None:
+        """Перед откликом выгружаем профиль компании. Только для вакансий,
+        прошедших фильтры: отклоненные не стоят запроса к API."""
+        vacancy = task.vacancy
+        employer_id = (vacancy.get("employer") or {}).get("id")
+        with run.lock:
+            new_employer = bool(
+                employer_id and employer_id not in run.seen_employers
+            )
+            if new_employer:
+                run.seen_employers.add(employer_id)
+        if not new_employer:
+            return
 
-                    if not is_suitable:
-                        logger.info(
-                            "Вакансия отклонена AI фильтром (%s): %s",
-                            self.ai_filter,
-                            vacancy["alternate_url"],
-                        )
-                        print(
-                            f"🧠 AI ({self.ai_filter}) посчитал неподходящей",
-                            vacancy["alternate_url"],
-                        )
+        # Свежий профиль берется из базы, за остальными идем в API
+        employer_profile = self.tool.employer_cache.get(employer_id)
+        if employer_profile is None:
+            logger.debug("Профиль работодателя недоступен: %s", employer_id)
+            return
 
-                        self._save_skipped_vacancy(
-                            vacancy, "ai_rejected", resume["id"]
-                        )
-                        continue
+        # Если есть сайт, то ищем на нем емейлы для отправки письма. Сайт
+        # обходится в фоне: письмо уйдет, если емейлы уже собраны
+        if self.args.send_email and (
+            site_url := (employer_profile.get("site_url") or "").strip()
+        ):
+            site_url = site_url if "://" in site_url else "https://" + site_url
+            if self._site_crawler.cached_emails(employer_id, site_url) is None:
+                self._site_crawler.submit(employer_id, site_url)
+
+    def _judge_vacancy(
+        self, run: _ResumeRun, task: _ApplyTask
+    ) -> _ApplyTask | None:
+        """AI фильтрация вакансий."""
+        if task.skip_reason or not (self.ai_filter and self.vacancy_filter_ai):
+            return task
+
+        vacancy = task.vacancy
+        prefiltered = self._prefilter_vacancy(run.resume["id"], vacancy)
+        if prefiltered is not None:
+            if not prefiltered:
+                self._reject_by_relevance(task)
+            return task
+
+        if self.ai_filter in ("heavy", "custom"):
+            is_suitable = self._is_vacancy_suitable_heavy(
+                vacancy, self._ai_log_suffix
+            )
+        else:
+            is_suitable = self._is_vacancy_suitable_light(vacancy)
+
+        if not is_suitable:
+            self._reject_by_ai(task)
+        return task
+
+    def _judge_vacancies(
+        self, run: _ResumeRun, tasks: list[_ApplyTask]
+    ) -> list[_ApplyTask]:
+        """AI фильтрация пачкой: один запрос на несколько вакансий."""
+        if not (self.ai_filter and self.vacancy_filter_ai):
+            return tasks
+
+        result: list[_ApplyTask] = []
+        # id вакансии -> (задача, текст для AI)
+        pending: dict[str, tuple[_ApplyTask, str]] = {}
+        system_prompt = self.vacancy_filter_ai.system_prompt or ""
+        for task in tasks:
+            if task.skip_reason:
+                result.append(task)
+                continue
+            vacancy = task.vacancy
+            prefiltered = self._prefilter_vacancy(run.resume["id"], vacancy)
+            if prefiltered is not None:
+                if not prefiltered:
+                    self._reject_by_relevance(task)
+                result.append(task)
+                continue
+            try:
+                vacancy_info = self._build_vacancy_context(
+                    vacancy, include_full=self.ai_filter != "light"
+                )
+            except ApiError as ex:
+                # Как и без пачек: ошибка API пропускает только эту вакансию
+                logger.warning(ex)
+                continue
+            result.append(task)
+            prompt = f"Вакансия: {vacancy_info}"
+            verdict = self._verdict_cache.get(
+                system_prompt, vacancy["id"], prompt
+            )
+            if verdict is None:
+                pending[str(vacancy["id"])] = (task, prompt)
+            elif not verdict:
+                self._reject_by_ai(task)
+
+        verdicts = (
+            self._ask_ai_batch(
+                {vid: prompt for vid, (_, prompt) in pending.items()}
+            )
+            if len(pending) > 1
+            else {}
+        )
+        for vid, (task, prompt) in pending.items():
+            if vid in verdicts:
+                suitable = verdicts[vid]
+            else:
+                # Вакансию, пропущенную в ответе, спрашиваем отдельно
+                suitable = self._ask_ai_cached(
+                    task.vacancy,
+                    prompt.removeprefix("Вакансия: "),
+                    self._ai_log_suffix,
+                )
+            if not suitable:
+                self._reject_by_ai(task)
+        return result
 
-                # Перед откликом выгружаем профиль компании
-                employer_id = employer.get("id")
-                if employer_id and employer_id not in seen_employers:
-                    employer_profile: datatypes.Employer = self.api_client.get(
-                        f"/employers/{employer_id}"
-                    )
+    def _prefilter_vacancy(
+        self, resume_id: str, vacancy: SearchVacancy
+    ) -> bool | None:
+        """Локальная оценка до AI.
+
+        True или False — вакансия явно подходит или нет, None — решает AI.
+        """
+        scorer = self._relevance_scorers.get(resume_id)
+        if scorer is None:
+            return None
+        # Оценка по полям поиска: полную вакансию ради нее не запрашиваем,
+        # навыки берем, только если вакансия уже есть в базе
+        detail = self.tool.vacancy_details.cached(vacancy)
+        score = scorer.score(
+            self._vacancy_text(
+                vacancy, ", ".join(detail.key_skills) if detail else ""
+            )
+        )
+        logger.debug("Близость вакансии %s к резюме: %.3f", vacancy["id"], score)
+        if (
+            self.ai_prefilter_reject is not None
+            and score < self.ai_prefilter_reject
+        ):
+            return False
+        if (
+            self.ai_prefilter_accept is not None
+            and score >= self.ai_prefilter_accept
+        ):
+            return True
+        return None
 
-                    try:
-                        storage.employers.save(employer_profile)
-                    except RepositoryError as ex:
-                        logger.exception(ex)
-
-                    # Если есть сайт, то ищем на нем емейлы для отправки письма
-                    if self.args.send_email and (
-                        site_url := (
-                            employer_profile.get("site_url") or ""
-                        ).strip()
-                    ):
-                        site_url = (
-                            site_url
-                            if "://" in site_url
-                            else "https://" + site_url
-                        )
-                        logger.debug("visit site: %s", site_url)
-
-                        try:
-                            site_info = self._parse_site(site_url)
-                            site_emails[employer_id] = site_info["emails"]
-                        except requests.RequestException as ex:
-                            site_info = None
-                            logger.error(ex)
-
-                        if site_info:
-                            logger.debug("site info: %r", site_info)
-
-                            # try:
-                            #     subdomains = self._get_subdomains(site_url)
-                            # except requests.RequestException as ex:
-                            #     subdomains = []
-                            #     logger.error(ex)
-
-                            try:
-                                storage.employer_sites.save(
-                                    {
-                                        "site_url": site_url,
-                                        "employer_id": employer_id,
-                                        "subdomains": [],
-                                        **site_info,
-                                    }
-                                )
-                            except RepositoryError as ex:
-                                logger.exception(ex)
-
-                letter = ""
-
-                if self.force_message or vacancy.get(
-                    "response_letter_required"
-                ):
-                    if self.cover_letter_ai:
-                        msg = self.message_prompt + "\n"
-                        ## добавляем переменные в контекст AI запроса ##
-                        msg += (
-                            "[ВАКАНСИЯ] "
-                            + "Название: "
-                            + message_placeholders["vacancy_name"] + ", "
-                            + "Работодатель: "
-                            + message_placeholders["employer_name"] + "; "
-                        )
-                        msg += (
-                            "[РЕЗЮМЕ] "
-                            + "Название: "
-                            + message_placeholders["resume_title"] + ", "
-                            + "Ссылка на резюме: "
-                            + message_placeholders["resume_url"] + ", "    
-                        )
-                        msg += (
-                            "Имя: "
-                            + message_placeholders["first_name"] + ", "
-                            + "Фамилия: "
-                            + message_placeholders["last_name"] + ", "
-                            + "Телефон: "
-                            + message_placeholders["phone"] + ", "
-                            + "Почта: "
-                            + message_placeholders["email"]
-                        )
-                        ## logger.debug("prompt: %s", msg) ## убираем отладку
-                        letter = self.cover_letter_ai.complete(msg)
-                    else:
-                        letter = (
-                            rand_text(self.cover_letter) % message_placeholders
-                        )
+    def _vacancy_text(self, vacancy: SearchVacancy, key_skills: str = "") -> str:
+        snippet = vacancy.get("snippet") or {}
+        return " ".join(
+            filter(
+                None,
+                [
+                    vacancy.get("name"),
+                    (vacancy.get("employer") or {}).get("name"),
+                    strip_tags(snippet.get("requirement") or ""),
+                    strip_tags(snippet.get("responsibility") or ""),
+                    key_skills,
+                ],
+            )
+        )
 
-                    logger.debug(letter)
+    def _reject_by_relevance(self, task: _ApplyTask) -> None:
+        logger.info(
+            "Вакансия отклонена по текстовой близости к резюме: %s",
+            task.vacancy["alternate_url"],
+        )
+        print("📉 Не похожа на резюме", task.vacancy["alternate_url"])
+        task.skip_reason = "low_relevance"
 
-                logger.debug(
-                    "Пробуем откликнуться на вакансию: %s",
-                    vacancy["alternate_url"],
+    @property
+    def _ai_log_suffix(self) -> str:
+        return f"({self.ai_filter})"
+
+    def _reject_by_ai(self, task: _ApplyTask) -> None:
+        logger.info(
+            "Вакансия отклонена AI фильтром (%s): %s",
+            self.ai_filter,
+            task.vacancy["alternate_url"],
+        )
+        print(
+            f"🧠 AI ({self.ai_filter}) посчитал неподходящей",
+            task.vacancy["alternate_url"],
+        )
+        task.skip_reason = "ai_rejected"
+
+    def _write_letter(
+        self, run: _ResumeRun, task: _ApplyTask
+    ) -> _ApplyTask | None:
+        if task.skip_reason:
+            return task
+        if not self._reserve_response(run, task):
+            return None
+        self._visit_employer(run, task)
+        if not (
+            self.force_message
+            or task.vacancy.get("response_letter_required")
+        ):
+            return task
+
+        message_placeholders = task.placeholders
+        if self.cover_letter_ai:
+            msg = self.message_prompt + "\n"
+            ## добавляем переменные в контекст AI запроса ##
+            msg += (
+                "[ВАКАНСИЯ] "
+                + "Название: "
+                + message_placeholders["vacancy_name"] + ", "
+                + "Работодатель: "
+                + message_placeholders["employer_name"] + "; "
+            )
+            msg += (
+                "[РЕЗЮМЕ] "
+                + "Название: "
+                + message_placeholders["resume_title"] + ", "
+                + "Ссылка на резюме: "
+                + message_placeholders["resume_url"] + ", "
+            )
+            msg += (
+                "Имя: "
+                + message_placeholders["first_name"] + ", "
+                + "Фамилия: "
+                + message_placeholders["last_name"] + ", "
+                + "Телефон: "
+                + message_placeholders["phone"] + ", "
+                + "Почта: "
+                + message_placeholders["email"]
+            )
+            ## logger.debug("prompt: %s", msg) ## убираем отладку
+            task.letter = self.cover_letter_ai.complete(msg)
+        else:
+            task.letter = rand_text(self.cover_letter) % message_placeholders
+
+        logger.debug(task.letter)
+        return task
+
+    def _reserve_response(self, run: _ResumeRun, task: _ApplyTask) -> bool:
+        """Место в бюджете --max-responses до письма и запроса профиля
+        компании: стадия письма не готовит отклики, которые все равно не
+        уйдут. Вакансия без места пропускается только в этом запуске."""
+        if run.pipeline.stopped:
+            return False
+        if not self.max_responses:
+            return True
+        with run.lock:
+            if run.applied_count + run.reserved_count >= self.max_responses:
+                return False
+            run.reserved_count += 1
+        task.reserved = True
+        return True
+
+    def _apply_reserved(
+        self, run: _ResumeRun, task: _ApplyTask
+    ) -> _ApplyTask | None:
+        try:
+            return self._send_response(run, task)
+        finally:
+            # Отклик отправлен или не удался: место переходит в
+            # applied_count или освобождается
+            if task.reserved:
+                with run.lock:
+                    run.reserved_count -= 1
+                task.reserved = False
+            # Дальше стадия письма никого не пропустит: источник не читаем
+            if (
+                self.max_responses
+                and run.applied_count >= self.max_responses
+                and not run.pipeline.stopped
+            ):
+                logger.info(
+                    "Достигнут лимит откликов --max-responses (%d). Останавливаюсь.",
+                    self.max_responses,
                 )
+                run.pipeline.stop()
 
-                test_handled = False
+    def _send_response(
+        self, run: _ResumeRun, task: _ApplyTask
+    ) -> _ApplyTask | None:
+        if task.skip_reason:
+            return task
 
-                if vacancy.get("has_test"):
-                    logger.debug(
-                        "Решаем тест: %s",
-                        vacancy["alternate_url"],
+        vacancy = task.vacancy
+        resume = run.resume
+        letter = task.letter
+        applied_before = run.applied_count
+
+        logger.debug(
+            "Пробуем откликнуться на вакансию: %s",
+            vacancy["alternate_url"],
+        )
+
+        test_handled = False
+
+        if vacancy.get("has_test"):
+            logger.debug(
+                "Решаем тест: %s",
+                vacancy["alternate_url"],
+            )
+
+            try:
+                if not self.dry_run:
+                    result = self._solve_vacancy_test(
+                        vacancy_id=vacancy["id"],
+                        resume_hash=resume["id"],
+                        letter=letter,
                     )
+                    test_handled = True
+                    if result.get("success") == "true":
+                        run.applied_count += 1
+                        print(
+                            "📨 Отправили отклик на вакансию с тестом",
+                            vacancy["alternate_url"],
+                        )
+                    else:
+                        err = (
+                            result.get("error")
+                            if isinstance(result, dict)
+                            else None
+                        )
 
-                    try:
-                        if not self.dry_run:
-                            result = self._solve_vacancy_test(
-                                vacancy_id=vacancy["id"],
-                                resume_hash=resume["id"],
-                                letter=letter,
+                        if err == "negotiations-limit-exceeded":
+                            run.limit_reached = True
+                            run.pipeline.stop()
+                            logger.warning(
+                                "Достигли лимита на отклики (отправлено в этой сессии: %d)",
+                                run.applied_count,
                             )
-                            test_handled = True
-                            if result.get("success") == "true":
-                                applied_count += 1
-                                print(
-                                    "📨 Отправили отклик на вакансию с тестом",
-                                    vacancy["alternate_url"],
-                                )
-                            else:
-                                err = (
-                                    result.get("error")
-                                    if isinstance(result, dict)
-                                    else None
-                                )
-
-                                if err == "negotiations-limit-exceeded":
-                                    do_apply = False
-                                    limit_reached = True
-                                    logger.warning(
-                                        "Достигли лимита на отклики (отправлено в этой сессии: %d)",
-                                        applied_count,
-                                    )
-                                    break
-                                else:
-                                    status = (
-                                        result.get("_http_status")
-                                        if isinstance(result, dict)
-                                        else None
-                                    )
-                                    logger.error(
-                                        "Произошла ошибка при отклике на вакансию с тестом: %s (HTTP %s), result: %s",
-                                        vacancy["alternate_url"],
-                                        status if status is not None else "?",
-                                        shorten(str(result), 300),
-                                    )
+                            return None
                         else:
-                            test_handled = True
-                    except ValueError as ex:
-                        if str(ex) == "tests not found.":
-                            logger.warning(
-                                "Не удалось получить тест (%s), пробую откликнуться как на обычную вакансию: %s",
-                                ex,
+                            status = (
+                                result.get("_http_status")
+                                if isinstance(result, dict)
+                                else None
+                            )
+                            logger.error(
+                                "Произошла ошибка при отклике на вакансию с тестом: %s (HTTP %s), result: %s",
                                 vacancy["alternate_url"],
+                                status if status is not None else "?",
+                                shorten(str(result), 300),
                             )
-                        else:
-                            logger.error(f"Произошла непредвиденная ошибка: {ex}")
-                            continue
-                    except Exception as ex:
-                        logger.error(f"Произошла непредвиденная ошибка: {ex}")
-                        continue
-
-                if not test_handled:
-                    params = {
-                        "resume_id": resume["id"],
-                        "vacancy_id": vacancy_id,
-                        "message": letter,
-                    }
-                    try:
+                else:
+                    test_handled = True
+            except ValueError as ex:
+                if str(ex) == "tests not found.":
+                    logger.warning(
+                        "Не удалось получить тест (%s), пробую откликнуться как на обычную вакансию: %s",
+                        ex,
+                        vacancy["alternate_url"],
+                    )
+                else:
+                    logger.error(f"Произошла непредвиденная ошибка: {ex}")
+                    return None
+            except Exception as ex:
+                logger.error(f"Произошла непредвиденная ошибка: {ex}")
+                return None
+
+        if not test_handled:
+            params = {
+                "resume_id": resume["id"],
+                "vacancy_id": vacancy["id"],
+                "message": letter,
+            }
+            try:
+                if not self.dry_run:
+                    res = self.api_client.post(
+                        "/negotiations",
+                        params,
+                        delay=random.uniform(1, 3),
+                    )
+                    assert res == {}
+                    run.applied_count += 1
+                    print(
+                        "📨 Отправили отклик на вакансию",
+                        vacancy["alternate_url"],
+                    )
+            except Redirect:
+                logger.warning(
+                    f"Игнорирую перенаправление на форму: {vacancy['alternate_url']}"  # noqa: E501
+                )
+                return None
+            except CaptchaRequired as ex:
+                logger.warning(f"Требуется капча: {ex.captcha_url}")
+                try:
+                    success = asyncio.run(
+                        self._solve_captcha_async(ex.captcha_url)
+                    )
+                    if success:
                         if not self.dry_run:
                             res = self.api_client.post(
                                 "/negotiations",
@@ -1136,96 +1800,71 @@ class Operation(BaseOperation):
                                 delay=random.uniform(1, 3),
                             )
                             assert res == {}
-                            applied_count += 1
+                            run.applied_count += 1
                             print(
-                                "📨 Отправили отклик на вакансию",
+                                "📨 Отправили отклик на вакансию после капчи",
                                 vacancy["alternate_url"],
                             )
-                    except Redirect:
-                        logger.warning(
-                            f"Игнорирую перенаправление на форму: {vacancy['alternate_url']}"  # noqa: E501
-                        )
-                        continue
-                    except CaptchaRequired as ex:
-                        logger.warning(f"Требуется капча: {ex.captcha_url}")
-                        try:
-                            success = asyncio.run(
-                                self._solve_captcha_async(ex.captcha_url)
-                            )
-                            if success:
-                                if not self.dry_run:
-                                    res = self.api_client.post(
-                                        "/negotiations",
-                                        params,
-                                        delay=random.uniform(1, 3),
-                                    )
-                                    assert res == {}
-                                    applied_count += 1
-                                    print(
-                                        "📨 Отправили отклик на вакансию после капчи",
-                                        vacancy["alternate_url"],
-                                    )
-                            else:
-                                logger.error("Не удалось решить капчу")
-                                raise
-                        except Exception as e:
-                            logger.error(f"Ошибка при решении капчи: {e}")
-                            raise
-
-                # Отправка письма на email
-                if self.args.send_email:
-                    # fix NoneType has no attribute get
-                    # contacts может быть null
-                    mail_to: str | list[str] | None = (
-                        vacancy.get("contacts") or {}
-                    ).get("email") or site_emails.get(employer_id)
-                    if mail_to:
-                        mail_to = (
-                            ", ".join(mail_to)
-                            if isinstance(mail_to, list)
-                            else mail_to
-                        )
-                        mail_subject = rand_text(
-                            self.tool.config.get("apply_mail_subject")
-                            or "{Отклик|Резюме} на вакансию %(vacancy_name)s"
-                        ) % message_placeholders
-                        mail_body = unescape_string(
-                            rand_text(
-                                self.tool.config.get("apply_mail_body")
-                                or "{Здравствуйте|Добрый день}, {прошу рассмотреть|пожалуйста рассмотрите} мое резюме %(resume_url)s на вакансию %(vacancy_name)s."
-                            )
-                        ) % message_placeholders
-                        try:
-                            self._send_email(mail_to, mail_subject, mail_body)
-                            print(
-                                "📧 Отправлено письмо на email по поводу вакансии",
-                                vacancy["alternate_url"],
-                            )
-                        except Exception as ex:
-                            logger.error(f"Ошибка отправки письма: {ex}")
-            except LimitExceeded:
-                do_apply = False
-                limit_reached = True
-                logger.warning(
-                    "Достигли лимита на отклики (отправлено в этой сессии: %d)",
-                    applied_count,
+                    else:
+                        logger.error("Не удалось решить капчу")
+                        raise
+                except Exception as e:
+                    logger.error(f"Ошибка при решении капчи: {e}")
+                    raise
+
+        if run.applied_count > applied_before:
+            self._applied_ids(resume["id"]).add(int(vacancy["id"]))
+        return task
+
+    def _finish_vacancy(
+        self, run: _ResumeRun, task: _ApplyTask
+    ) -> _ApplyTask | None:
+        """Побочные эффекты: база, черный список, письмо."""
+        vacancy = task.vacancy
+
+        if task.skip_reason:
+            self._save_skipped_vacancy(
+                vacancy, task.skip_reason, run.resume["id"]
+            )
+            if task.skip_reason == "excluded_filter":
+                self.api_client.put(f"/vacancies/blacklisted/{vacancy['id']}")
+                logger.info(
+                    "Вакансия добавлена в черный список: %s",
+                    vacancy["alternate_url"],
                 )
-                break
-            except ApiError as ex:
-                logger.warning(ex)
-            except (BadResponse, AIError) as ex:
-                logger.error(ex)
-
-        logger.info(
-            "Закончили рассылку откликов для резюме: %s (%s). Отправлено: %d",
-            resume["alternate_url"],
-            resume["title"],
-            applied_count,
-        )
-        print(
-            f"✅️ Закончили рассылку для резюме: {resume['title']}. Отправлено: {applied_count}"
-        )
-        return limit_reached
+            return None
+
+        # Отправка письма на email
+        if self.args.send_email:
+            employer_id = (vacancy.get("employer") or {}).get("id")
+            # fix NoneType has no attribute get
+            # contacts может быть null
+            mail_to: str | list[str] | None = (
+                vacancy.get("contacts") or {}
+            ).get("email") or self._site_crawler.emails(employer_id)
+            if mail_to:
+                mail_to = (
+                    ", ".join(mail_to) if isinstance(mail_to, list) else mail_to
+                )
+                mail_subject = rand_text(
+                    self.tool.config.get("apply_mail_subject")
+                    or "{Отклик|Резюме} на вакансию %(vacancy_name)s"
+                ) % task.placeholders
+                mail_body = unescape_string(
+                    rand_text(
+                        self.tool.config.get("apply_mail_body")
+                        or "{Здравствуйте|Добрый день}, {прошу рассмотреть|пожалуйста рассмотрите} мое резюме %(resume_url)s на вакансию %(vacancy_name)s."
+                    )
+                ) % task.placeholders
+                try:
+                    self._send_email(mail_to, mail_subject, mail_body)
+                    print(
+                        "📧 Отправлено письмо на email по поводу вакансии",
+                        vacancy["alternate_url"],
+                    )
+                except Exception as ex:
+                    logger.error(f"Ошибка отправки письма: {ex}")
+        return None
 
     def _send_email(self, to: str, subject: str, body: str) -> None:
         cfg = self.tool.config.get("smtp", {})
@@ -1236,8 +1875,6 @@ class Operation(BaseOperation):
         msg.set_content(body)
         self.tool.smtp.send_message(msg)
 
-    json_decoder = JSONDecoder()
-
     def _get_vacancy_tests(self, response_url: str) -> VacancyTestsData | None:
         """Парсит тесты"""
         res = self.tool.get_redirect_config(response_url)  
@@ -1382,45 +2019,6 @@ class Operation(BaseOperation):
 
         return data
 
-    def _parse_site(self, url: str) -> dict[str, Any]:
-        with self.tool.session.get(url, timeout=10) as r:
-            val = lambda m: html.unescape(m.group(1)) if m else ""
-
-            title = val(re.search(r"<title>(.*?)</title>", r.text, re.I | re.S))
-            description = val(
-                re.search(
-                    r'<meta name="description" content="(.*?)"', r.text, re.I
-                )
-            )
-            generator = val(
-                re.search(
-                    r'<meta name="generator" content="(.*?)"', r.text, re.I
-                )
-            )
-
-            # Поиск email
-            emails = set(
-                m.group(0)
-                # Исключение всякого мусора типа energy-software-slider-225x225@2x.png
-                for m in re.finditer(
-                    r"\b[a-z][a-z0-9_.-]+@([a-z0-9][a-z0-9-]+)(?!\.(?:png|jpe?g|bmp|gif|ico|js|css)\b)(\.[a-z0-9][a-z0-9-]+)+\b",
-                    r.text,
-                )
-            )
-
-            return {
-                "title": title,
-                "description": description,
-                "generator": generator,
-                "emails": list(emails),
-                "server_name": r.headers.get("Server"),
-                "powered_by": r.headers.get("X-Powered-By"),
-                # Не работает, если отключена проверка сертификата
-                "ip_address": r.raw._connection.sock.getpeername()[0]
-                if r.raw._connection
-                else None,
-            }
-
     # Слишком тормознутая... Толи российские айпи заблокированы
     def _get_subdomains(self, url: str) -> set[str]:
         domain = urlparse(url).netloc
@@ -1508,100 +2106,185 @@ class Operation(BaseOperation):
 
         return params
 
+    def _search(
+        self, resume_id: str | None, params: dict
+    ) -> PaginatedItems[SearchVacancy]:
+        if self.search:
+            return self.api_client.get("/vacancies", params)
+        return self.api_client.get(
+            f"/resumes/{resume_id}/similar_vacancies", params
+        )
+
     def _get_vacancies(
         self, resume_id: str | None = None
     ) -> Iterator[SearchVacancy]:
-        for page in range(self.total_pages):
+        def fetch_page(page: int) -> PaginatedItems[SearchVacancy]:
             logger.debug(f"Загружаем вакансии со страницы: {page + 1}")
-            params = self._get_search_params(page)
+            return self._search(resume_id, self._get_search_params(page))
 
-            if self.search:
-                res: PaginatedItems[SearchVacancy] = self.api_client.get(
-                    "/vacancies",
-                    params,
-                )
-            else:
-                res: PaginatedItems[SearchVacancy] = self.api_client.get(
-                    f"/resumes/{resume_id}/similar_vacancies",
-                    params,
-                )
-
-            logger.debug(f"Количество вакансий: {res['found']}")
-
-            if not res["items"]:
-                return
+        cancel_event = getattr(self, "_cancel_event", None)
+        if self.shard_search:
+            pages = self._get_sharded_pages(resume_id, cancel_event)
+        else:
+            pages = prefetch_pages(
+                fetch_page,
+                self.total_pages,
+                lookahead=self.prefetch_pages,
+                cancel_event=cancel_event,
+            )
+        # Потребитель может бросить итерацию (--max-responses, отмена), тогда
+        # closing сразу отменит страницы, загружаемые впрок
+        with closing(pages):
+            for res in pages:
+                logger.debug(f"Количество вакансий: {res['found']}")
+                if scorer := self._relevance_scorers.get(resume_id):
+                    # Частоты слов для оценки близости — по страницам поиска
+                    scorer.add_documents(map(self._vacancy_text, res["items"]))
+                yield from self._select_vacancies(res["items"])
+
+    def _get_sharded_pages(
+        self, resume_id: str | None, cancel_event: threading.Event | None
+    ) -> Iterator[PaginatedItems[SearchVacancy]]:
+        """Страницы всех подзапросов вперемешку, без повторов вакансий."""
+
+        def count(params: dict) -> int:
+            return self._search(resume_id, params | {"page": 0, "per_page": 1})[
+                "found"
+            ]
+
+        def fetch_page(params: dict, page: int) -> PaginatedItems[SearchVacancy]:
+            logger.debug(f"Загружаем подзапрос {params}, страница {page + 1}")
+            return self._search(
+                resume_id, params | {"page": page, "per_page": self.per_page}
+            )
 
-            yield from res["items"]
+        params = self._get_search_params(0)
+        area_children: dict[str, list[str]] = {}
+        if params.get("area"):
+            # Дерево регионов нужно, только если искать по регионам
+            for item in self.tool.reference.areas():
+                if item.parent_id:
+                    area_children.setdefault(item.parent_id, []).append(item.id)
+        shards = SearchShardPlanner(count, area_children).plan(params)
+        return fetch_shards(
+            fetch_page,
+            shards,
+            self.total_pages,
+            workers=self.shard_workers,
+            cancel_event=cancel_event,
+        )
 
-            if page >= res["pages"] - 1:
-                return
+    def _select_vacancies(
+        self, vacancies: list[SearchVacancy]
+    ) -> list[SearchVacancy]:
+        """Условие `--where` сразу на всю страницу: отсеянные вакансии не
+        доходят ни до загрузки деталей, ни до AI."""
+        if self._vacancy_predicate is None:
+            return vacancies
+        selected = self._vacancy_predicate.filter(vacancies)
+        if dropped := len(vacancies) - len(selected):
+            logger.debug(
+                "Не прошли условие %r: %d из %d",
+                self._vacancy_predicate.source,
+                dropped,
+                len(vacancies),
+            )
+        return selected
 
-    def _is_excluded(self, vacancy: SearchVacancy) -> bool:
-        if not self.excluded_filter:
-            return False
+    def _rank_vacancies(
+        self, resume: datatypes.Resume, vacancies: Iterator[SearchVacancy]
+    ) -> Iterator[SearchVacancy]:
+        """Вакансии с первых `rank_pages` страниц — от лучших к худшим.
 
-        snippet = vacancy.get("snippet", {})
-        vacancy_summary = " ".join(
-            filter(
-                None,
-                [
-                    vacancy.get("name"),
-                    snippet.get("requirement"),
-                    snippet.get("responsibility"),
-                ],
+        Дневной лимит откликов ограничен, так что он тратится на лучшие
+        вакансии, а не на первые в выдаче. Остальные страницы идут как есть.
+        """
+        try:
+            head = list(
+                islice(vacancies, self.rank_pages * (self.per_page or 100))
             )
+            ranker = self._make_ranker(resume, head)
+            logger.debug("Ранжируем %d вакансий", len(head))
+            yield from ranker.rank(head)
+            yield from vacancies
+        finally:
+            if close := getattr(vacancies, "close", None):
+                close()
+
+    def _make_ranker(
+        self, resume: datatypes.Resume, vacancies: list[SearchVacancy]
+    ) -> VacancyRanker:
+        scorer = self._relevance_scorers.get(resume["id"])
+        if scorer is None:
+            try:
+                resume_text = self._analyze_resume_light(resume)
+            except Exception as ex:
+                logger.warning(f"Не удалось получить полное резюме: {ex}")
+                resume_text = resume.get("title") or ""
+            scorer = RelevanceScorer(resume_text)
+            scorer.add_documents(map(self._vacancy_text, vacancies))
+        try:
+            employer_stats = self.tool.storage.negotiations.employer_stats()
+        except RepositoryError as ex:
+            logger.warning(ex)
+            employer_stats = {}
+        return VacancyRanker(
+            weights=self.rank_weights,
+            expected_salary=resume.get("salary"),
+            # Только по тексту из выдачи: ключевые навыки потребовали бы
+            # запроса на каждую вакансию
+            similarity=lambda v: scorer.score(self._vacancy_text(v)),
+            employer_stats=employer_stats,
         )
 
-        logger.debug(vacancy_summary)
+    def _is_excluded(self, vacancy: SearchVacancy) -> bool:
+        return self._match_exclusion(vacancy) is not None
 
-        excluded_pat: re.Pattern = re.compile(
-            self.excluded_filter, re.IGNORECASE
+    def _match_exclusion(self, vacancy: SearchVacancy) -> ExclusionMatch | None:
+        if not self._exclusion_filter:
+            return None
+        # Полный текст вакансии грузится, только если дешевые поля не сработали
+        return self._exclusion_filter.match(
+            vacancy,
+            lambda: self.tool.vacancy_details.get(vacancy).description,
         )
 
-        if excluded_pat.search(vacancy_summary):
-            return True
-
-        # Грузим полный текст вакансии только, если предыдущий фильтр не сработал
-        r = self.tool.session.get("https://hh.ru/vacancy/" + vacancy["id"])
-        r.raise_for_status()
-
-        # На странице вакансии поле description иногда встречается в двух
-        # вариантах верстки: `"description": "..."` и `"description":"..."`
-        # (без пробела после двоеточия) — учитываем оба.
-        description_match = re.search(r'"description":\s*(.*)', r.text)
-        if not description_match:
-            logger.warning(
-                "Не удалось найти описание вакансии на странице: %s",
-                vacancy["alternate_url"],
+    def _skipped_ids(self, resume_id: str) -> set[int]:
+        # Индекс грузится одним запросом на резюме и дальше пополняется
+        # в _save_skipped_vacancy
+        if resume_id not in self._skipped_index:
+            self._skipped_index[resume_id] = (
+                self.tool.storage.skipped_vacancies.vacancy_ids(resume_id)
             )
-            return False
+        return self._skipped_index[resume_id]
+
+    def _applied_ids(self, resume_id: str) -> set[int]:
+        # Грузится из negotiations после синхронизации и пополняется
+        # в _send_response
+        if resume_id not in self._applied_index:
+            self._applied_index[resume_id] = (
+                self.tool.storage.negotiations.vacancy_ids(resume_id)
+            )
+        return self._applied_index[resume_id]
 
-        description, _ = self.json_decoder.raw_decode(description_match.group(1))
-        description = strip_tags(description)
-        logger.debug(description[:2047])
-        return bool(excluded_pat.search(description))
+    def _is_vacancy_already_applied(
+        self, vacancy: SearchVacancy, resume_id: str
+    ) -> bool:
+        try:
+            return int(vacancy["id"]) in self._applied_ids(resume_id)
+        except Exception:
+            return False
 
     def _is_vacancy_already_skipped(
         self, vacancy: SearchVacancy, resume_id: str | None = None
     ) -> bool:
         try:
-            vacancy_id = vacancy["id"]
+            vacancy_id = int(vacancy["id"])
 
-            if resume_id:
-                if any(
-                    self.tool.storage.skipped_vacancies.find(
-                        resume_id=resume_id,
-                        vacancy_id=vacancy_id,
-                    )
-                ):
-                    return True
+            if resume_id and vacancy_id in self._skipped_ids(resume_id):
+                return True
 
-            return any(
-                self.tool.storage.skipped_vacancies.find(
-                    resume_id="",
-                    vacancy_id=vacancy_id,
-                )
-            )
+            return vacancy_id in self._skipped_ids("")
 
         except Exception:
             return False
@@ -1611,7 +2294,9 @@ class Operation(BaseOperation):
     ) -> None:
         try:
             employer = vacancy.get("employer", {})
-            self.tool.storage.skipped_vacancies.save(
+            storage = self.tool.storage
+            storage.buffer.save(
+                storage.skipped_vacancies,
                 {
                     "resume_id": resume_id or "",
                     "vacancy_id": vacancy["id"],
@@ -1620,7 +2305,8 @@ class Operation(BaseOperation):
                     "name": vacancy.get("name"),
                     "employer_name": employer.get("name"),
                     "created_at": datetime.now(),
-                }
+                },
             )
+            self._skipped_ids(resume_id or "").add(int(vacancy["id"]))
         except Exception as ex:
             logger.warning(f"Не удалось сохранить пропущенную вакансию: {ex}")
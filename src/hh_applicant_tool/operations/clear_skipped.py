@@ -35,29 +35,21 @@ class Operation(BaseOperation):
             help="Только показать количество записей без удаления",
         )
 
-    def run(self, tool: HHApplicantTool) -> None:
-        args = tool.args
+    def run(self, tool: HHApplicantTool, args: Namespace) -> None:
         repo = tool.storage.skipped_vacancies
 
         if args.reason:
-            count = sum(1 for _ in repo.find(reason=args.reason))
             if args.dry_run:
+                count = repo.count(reason=args.reason)
                 print(f"📋 Найдено {count} записей с причиной '{args.reason}'")
+            elif count := repo.delete_where(reason=args.reason):
+                print(f"✂️  Удалено {count} записей с причиной '{args.reason}'")
             else:
-                if count > 0:
-                    for item in repo.find(reason=args.reason):
-                        repo.delete(item.id, commit=False)
-                    repo.commit()
-                    print(f"✂️  Удалено {count} записей с причиной '{args.reason}'")
-                else:
-                    print(f"❌ Нет записей с причиной '{args.reason}'")
+                print(f"❌ Нет записей с причиной '{args.reason}'")
         else:
-            total = repo.count_total()
             if args.dry_run:
-                print(f"📋 Всего записей в базе: {total}")
+                print(f"📋 Всего записей в базе: {repo.count()}")
+            elif total := repo.delete_where():
+                print(f"✂️  Очищено {total} записей из базы пропущенных вакансий")
             else:
-                if total > 0:
-                    repo.clear()
-                    print(f"✂️  Очищено {total} записей из базы пропущенных вакансий")
-                else:
-                    print("📋 База пропущенных вакансий уже пуста")
+                print("📋 База пропущенных вакансий уже пуста")
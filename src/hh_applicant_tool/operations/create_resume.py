@@ -6,7 +6,7 @@ import tomllib
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from ..api import ApiError
+from ..api import ApiError, ReferenceCache
 from ..main import BaseNamespace, BaseOperation
 from ..utils import json
 from ..utils.resume_md import parse_resume_md
@@ -66,8 +66,8 @@ def _resolve_suggests(api_client: Any, obj: Any) -> None:
             _resolve_suggests(api_client, item)
 
 
-def _resolve_industries(api_client: Any, experience: list[dict]) -> None:
-    """Разрешает названия отраслей в ID через GET /industries."""
+def _resolve_industries(reference: ReferenceCache, experience: list[dict]) -> None:
+    """Разрешает названия отраслей в ID по справочнику /industries."""
     needs_resolve = any(
         not ind.get("id")
         for exp in experience
@@ -76,17 +76,11 @@ def _resolve_industries(api_client: Any, experience: list[dict]) -> None:
     if not needs_resolve:
         return
     try:
-        tree = api_client.get("/industries")
+        flat = reference.industry_ids_by_name()
     except ApiError as ex:
         logger.warning("Не удалось загрузить справочник отраслей: %s", ex)
         return
 
-    flat: dict[str, str] = {}
-    for industry in tree:
-        flat[industry["name"].lower()] = industry["id"]
-        for sub in industry.get("industries", []):
-            flat[sub["name"].lower()] = sub["id"]
-
     for exp in experience:
         for ind in exp.get("industries", []):
             if ind.get("id"):
@@ -145,7 +139,7 @@ class Operation(BaseOperation):
 
         _resolve_suggests(api_client, data)
         if experience := data.get("experience"):
-            _resolve_industries(api_client, experience)
+            _resolve_industries(tool.reference, experience)
 
         payload = _drop_nulls(data)
 
@@ -27,10 +27,14 @@ class Operation(BaseOperation):
 
     def run(self, tool: HHApplicantTool, args: BaseNamespace) -> None:
         if tool.api_client.is_access_expired:
+            stale_token = tool.api_client.access_token
+            # Если токен уже обновил другой процесс, запроса не будет: новый
+            # токен подхватится из config.json
             tool.api_client.refresh_access_token()
-            if not tool.save_token():
+            if tool.api_client.access_token == stale_token:
                 print("⚠️ Токен не был обновлен!")
                 return 1
+            tool.save_token()
             print("✅ Токен успешно обновлен.")
         else:
             # logger.debug("Токен валиден, игнорируем обновление.")
@@ -1,8 +1,14 @@
+from .connection import ConnectionManager, LocalConnection, transaction
 from .facade import StorageFacade
 from .utils import apply_migration, list_migrations
+from .write_buffer import WriteBuffer
 
 __all__ = [
+    "ConnectionManager",
+    "LocalConnection",
     "StorageFacade",
+    "WriteBuffer",
     "apply_migration",
     "list_migrations",
+    "transaction",
 ]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+__all__ = (
+    "DEFAULT_PRAGMAS",
+    "ConnectionManager",
+    "LocalConnection",
+    "transaction",
+)
+
+# Применяются к каждому соединению. WAL позволяет читать, пока кто-то
+# пишет, в том числе из другого процесса (cron), а busy_timeout — ждать
+# блокировку вместо `database is locked`
+DEFAULT_PRAGMAS: dict[str, Any] = {
+    "journal_mode": "WAL",
+    # В WAL этого достаточно: при сбое питания теряется только последняя
+    # транзакция, но база не портится
+    "synchronous": "NORMAL",
+    "busy_timeout": 10_000,
+    "mmap_size": 256 * 1024 * 1024,
+    # Отрицательное значение — в килобайтах
+    "cache_size": -16_000,
+    "temp_store": "MEMORY",
+}
+
+logger = logging.getLogger(__package__)
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """BEGIN IMMEDIATE ... COMMIT, при исключении — откат.
+
+    BEGIN IMMEDIATE сразу берет блокировку на запись, так что транзакция
+    не упадет посередине из-за другого процесса. Вложенный вызов —
+    часть внешней транзакции: ею управляет внешний.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class ConnectionManager:
+    """Соединения с базой профиля: у каждого потока свое плюс одно
+    выделенное для записи пачками.
+
+    Соединения создаются при первом обращении из потока и закрываются,
+    когда поток завершился. База в памяти так не работает (у каждого
+    соединения была бы своя), поэтому для `:memory:` соединение одно.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        pragmas: Mapping[str, Any] | None = None,
+    ) -> None:
+        self.path = path
+        self.pragmas = DEFAULT_PRAGMAS | dict(pragmas or {})
+        self.shared = str(path) == ":memory:"
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._connections: dict[threading.Thread, sqlite3.Connection] = {}
+        self._writer: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Новое соединение с настроенными прагмами."""
+        conn = sqlite3.connect(
+            self.path,
+            # Соединение закрывается из другого потока
+            check_same_thread=False,
+            timeout=self.pragmas.get("busy_timeout", 0) / 1000,
+        )
+        for name, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error as ex:
+                logger.warning("PRAGMA %s = %s: %s", name, value, ex)
+        return conn
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Соединение текущего потока."""
+        thread = (
+            threading.main_thread() if self.shared else threading.current_thread()
+        )
+        with self._lock:
+            conn = self._connections.get(thread)
+            if conn is None:
+                self._close_finished()
+                conn = self._connections[thread] = self.connect()
+            return conn
+
+    @property
+    def local(self) -> LocalConnection:
+        """Объект-соединение, которое в каждом потоке свое."""
+        return LocalConnection(self)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Выделенное соединение для записи в одной транзакции.
+
+        Писатели внутри процесса ждут друг друга на блокировке, а не в
+        busy_timeout (см. `transaction`).
+        """
+        with self._write_lock:
+            if self.shared:
+                conn = self.connection
+            else:
+                if self._writer is None:
+                    self._writer = self.connect()
+                conn = self._writer
+            with transaction(conn):
+                yield conn
+
+    def close(self) -> None:
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        with self._write_lock:
+            if self._writer is not None:
+                connections.append(self._writer)
+                self._writer = None
+        for conn in connections:
+            conn.close()
+
+    def _close_finished(self) -> None:
+        for thread in [t for t in self._connections if not t.is_alive()]:
+            conn = self._connections.pop(thread)
+            if conn.in_transaction:
+                logger.warning(
+                    "Откатываем незавершенную транзакцию потока %s", thread.name
+                )
+            conn.close()
+
+
+class LocalConnection:
+    """Ведет себя как sqlite3.Connection, но в каждом потоке обращается к
+    его собственному соединению."""
+
+    def __init__(self, manager: ConnectionManager) -> None:
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._manager.connection, name)
+
+    def close(self) -> None:
+        self._manager.close()
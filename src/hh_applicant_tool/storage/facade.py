@@ -1,28 +1,65 @@
 from __future__ import annotations
 
 import sqlite3
+from contextlib import AbstractContextManager
+from functools import partial
+from typing import Callable
 
+from .connection import transaction
+
+from .repositories.ai_verdicts import AIVerdictsRepository
 from .repositories.contacts import VacancyContactsRepository
 from .repositories.employer_sites import EmployerSitesRepository
 from .repositories.employers import EmployersRepository
+from .repositories.hidden_employers import HiddenEmployersRepository
 from .repositories.negotiations import NegotiationRepository
+from .repositories.references import ReferencesRepository
+from .repositories.resume_analyses import ResumeAnalysesRepository
 from .repositories.resumes import ResumesRepository
 from .repositories.settings import SettingsRepository
 from .repositories.skipped_vacancies import SkippedVacanciesRepository
 from .repositories.vacancies import VacanciesRepository
+from .repositories.vacancy_details import VacancyDetailsRepository
 from .utils import init_db
+from .write_buffer import (
+    DEFAULT_BUFFER_DELAY,
+    DEFAULT_BUFFER_ROWS,
+    WriteBuffer,
+)
 
 
 class StorageFacade:
     """Единая точка доступа к persistence-слою."""
 
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        buffer_rows: int = DEFAULT_BUFFER_ROWS,
+        buffer_delay: float = DEFAULT_BUFFER_DELAY,
+        writer: Callable[[], AbstractContextManager[sqlite3.Connection]]
+        | None = None,
+    ):
         init_db(conn)
+        # Транзакция на выделенном для записи соединении
+        self.writer = writer or partial(transaction, conn)
+        # Отложенная запись для частых сохранений в цикле откликов
+        self.buffer = WriteBuffer(
+            conn, buffer_rows, buffer_delay, writer=self.writer
+        )
+        self.ai_verdicts = AIVerdictsRepository(conn)
         self.employer_sites = EmployerSitesRepository(conn)
         self.employers = EmployersRepository(conn)
+        self.hidden_employers = HiddenEmployersRepository(conn)
         self.negotiations = NegotiationRepository(conn)
+        self.references = ReferencesRepository(conn)
+        self.resume_analyses = ResumeAnalysesRepository(conn)
         self.resumes = ResumesRepository(conn)
         self.settings = SettingsRepository(conn)
         self.skipped_vacancies = SkippedVacanciesRepository(conn)
         self.vacancies = VacanciesRepository(conn)
         self.vacancy_contacts = VacancyContactsRepository(conn)
+        self.vacancy_details = VacancyDetailsRepository(conn)
+
+    def flush(self) -> int:
+        return self.buffer.flush()
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from .base import BaseModel
+
+
+class AIVerdictModel(BaseModel):
+    id: int | None = None
+    # sha256 системного промпта: другой промпт — другие ответы
+    prompt_hash: str
+    vacancy_id: int
+    # sha256 текста вакансии, отправленного в AI
+    context_hash: str
+    suitable: bool
+    model: str | None = None
+    latency: float | None = None
+    created_at: datetime | None = None
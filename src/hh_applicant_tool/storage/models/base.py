@@ -1,8 +1,18 @@
 import builtins
-from dataclasses import Field, asdict, dataclass, field, fields
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime
 from logging import getLogger
-from typing import Any, Callable, Mapping, Self, dataclass_transform, get_origin
+from types import UnionType
+from typing import (
+    Any,
+    Callable,
+    Mapping,
+    Self,
+    Union,
+    dataclass_transform,
+    get_args,
+    get_origin,
+)
 
 from hh_applicant_tool.utils import json
 from hh_applicant_tool.utils.date import try_parse_datetime
@@ -28,107 +38,173 @@ def mapped(
     return field(metadata=metadata, **kwargs)
 
 
-@dataclass_transform(field_specifiers=(field, mapped))
-class BaseModel:
-    def __init_subclass__(cls, /, **kwargs: Any):
-        super().__init_subclass__()
-        dataclass(cls, kw_only=True, **kwargs)
+# Типы, к которым приводятся значения. Аннотации-строки (с
+# `from __future__ import annotations`) сравниваются по имени
+_COERCE_TYPES: dict[str, type] = {
+    name: getattr(builtins, name) for name in ("bool", "str", "int", "float")
+}
 
-    @classmethod
-    def from_db(cls, data: Mapping[str, Any]) -> Self:
-        return cls._from_mapping(data)
 
-    @classmethod
-    def from_api(cls, data: Mapping[str, Any]) -> Self:
-        return cls._from_mapping(data, from_source=True)
+def _coerce_datetime(value: Any) -> Any:
+    return value if isinstance(value, datetime) else try_parse_datetime(value)
 
-    def to_db(self) -> dict[str, Any]:
-        data = self.to_dict()
-        for f in fields(self):
-            # Если какого-то значения нет в словаре, то не ставим его или
-            # ломается установка дефолтных значений.
-            value = data.get(f.name, MISSING)
-            if value is MISSING:
-                continue
-            if f.metadata.get("store_json"):
-                value = json.dumps(value)
-            # Точно не нужно типы приводить перед сохранением
-            # else:
-            #     value = self._coerce_type(value, f)
-            data[f.name] = value
-        return data
 
-    @classmethod
-    def _coerce_type(cls, value: Any, f: Field) -> Any:
-        # Лишь создатель знает, что с тобой делать
-        if get_origin(f.type):
+def _unwrap_optional(tp: Any) -> Any:
+    """`X | None` -> `X`; None и так не приводится."""
+    if isinstance(tp, str):
+        parts = [p.strip() for p in tp.split("|")]
+        rest = [p for p in parts if p != "None"]
+        return rest[0] if len(parts) == 2 and len(rest) == 1 else tp
+    if get_origin(tp) in (Union, UnionType):
+        rest = [a for a in get_args(tp) if a is not type(None)]
+        return rest[0] if len(rest) == 1 else tp
+    return tp
+
+
+def _make_coercer(tp: Any) -> Callable[[Any], Any] | None:
+    tp = _unwrap_optional(tp)
+    # Лишь создатель знает, что с тобой делать
+    if get_origin(tp):
+        return None
+    type_name = tp if isinstance(tp, str) else getattr(tp, "__name__", None)
+    if type_name == "datetime":
+        return _coerce_datetime
+    if (t := _COERCE_TYPES.get(type_name)) is None:
+        return None
+
+    def coerce(value: Any) -> Any:
+        if isinstance(value, t):
             return value
+        try:
+            return t(value)
+        except (TypeError, ValueError):
+            return value
+
+    return coerce
 
-        type_name = f.type if isinstance(f.type, str) else f.type.__name__
-        if value is not None and type_name in (
-            "bool",
-            "str",
-            "int",
-            "float",
-            "datetime",
-        ):
-            if type_name == "datetime":
-                return try_parse_datetime(value)
-            try:
-                t = getattr(builtins, type_name)
-                if not isinstance(value, t):
-                    value = t(value)
-            except (TypeError, ValueError):
-                pass
-        return value
+
+def _is_mapping(value: Any) -> bool:
+    return type(value) is dict or isinstance(value, Mapping)
+
+
+def _compile(cls: type, name: str, args: str, body: list[str], env: dict):
+    """Собирает функцию из строк тела."""
+    source = f"def {name}({args}):\n" + "".join(
+        f"    {line}\n" for line in body
+    )
+    namespace: dict[str, Any] = {}
+    exec(compile(source, f"<{cls.__qualname__}.{name}>", "exec"), env, namespace)
+    return namespace[name]
+
+
+def _compile_converters(cls: type) -> None:
+    """Разворачивает поля модели в код from_db, from_api и to_db.
+
+    Метаданные полей, пути и приведения типов разбираются один раз на
+    класс, а не на каждую строку.
+    """
+    env: dict[str, Any] = {
+        "MISSING": MISSING,
+        "is_mapping": _is_mapping,
+        "json_loads": json.loads,
+        "json_dumps": json.dumps,
+    }
+    from_db = ["kwargs = {}", "get = data.get"]
+    from_api = ["kwargs = {}", "get = data.get"]
+    to_db = []
+    for n, f in enumerate(fields(cls)):
+        name = f.name
+        coerce = _make_coercer(f.type)
+        if coerce:
+            env[f"coerce_{n}"] = coerce
+        store_json = f.metadata.get("store_json")
+
+        # from_db: колонка -> поле
+        from_db += [f"v = get({name!r}, MISSING)", "if v is not MISSING:"]
+        if store_json:
+            from_db.append(f"    kwargs[{name!r}] = json_loads(v)")
+        elif coerce:
+            from_db.append("    if v is not None:")
+            from_db.append(f"        v = coerce_{n}(v)")
+            from_db.append(f"    kwargs[{name!r}] = v")
+        else:
+            from_db.append(f"    kwargs[{name!r}] = v")
+
+        # from_api: путь в ответе API -> поле
+        indent = ""
+        if f.metadata.get("skip_src"):
+            from_api.append(f"if {name!r} not in data:")
+            indent = "    "
+        if path := f.metadata.get("path"):
+            keys = path.split(".")
+            # Отсутствующий последний ключ дает None, а отсутствующий
+            # промежуточный — пропуск поля
+            from_api.append(f"{indent}v = get({keys[0]!r})")
+            for key in keys[1:]:
+                from_api.append(f"{indent}if is_mapping(v):")
+                indent += "    "
+                from_api.append(f"{indent}v = v.get({key!r})")
+        else:
+            from_api.append(f"{indent}v = get({name!r}, MISSING)")
+            from_api.append(f"{indent}if v is not MISSING:")
+            indent += "    "
+        if transform := f.metadata.get("transform"):
+            if isinstance(transform, str):
+                transform = getattr(cls, transform)
+            env[f"transform_{n}"] = transform
+            from_api.append(f"{indent}if v is not None:")
+            from_api.append(f"{indent}    v = transform_{n}(v)")
+        if coerce:
+            from_api.append(f"{indent}if v is not None:")
+            from_api.append(f"{indent}    v = coerce_{n}(v)")
+        from_api.append(f"{indent}kwargs[{name!r}] = v")
+
+        # to_db: поле -> колонка
+        value = f"self.{name}"
+        to_db.append(
+            f"{name!r}: json_dumps({value}),"
+            if store_json
+            else f"{name!r}: {value},"
+        )
+
+    from_db.append("return cls(**kwargs)")
+    from_api.append("return cls(**kwargs)")
+    cls._from_db = _compile(cls, "from_db", "cls, data", from_db, env)
+    cls._from_api = _compile(cls, "from_api", "cls, data", from_api, env)
+    cls._to_db = _compile(
+        cls, "to_db", "self", ["return {", *to_db, "}"], env
+    )
+
+
+@dataclass_transform(kw_only_default=True, field_specifiers=(field, mapped))
+class _ModelMeta(type):
+    """Делает из наследников BaseModel dataclass со `__slots__` и
+    компилирует для них преобразования."""
+
+    def __new__(mcls, name, bases, namespace, /, **kwargs: Any):
+        cls = super().__new__(mcls, name, bases, namespace)
+        # BaseModel или класс, который пересобирает dataclass(slots=True)
+        if not bases or "__slots__" in namespace:
+            return cls
+        cls = dataclass(cls, kw_only=True, slots=True, **kwargs)
+        _compile_converters(cls)
+        return cls
+
+
+class BaseModel(metaclass=_ModelMeta):
+    __slots__ = ()
 
     @classmethod
-    def _from_mapping(
-        cls,
-        data: Mapping[str, Any],
-        /,
-        from_source: bool = False,
-    ) -> Self:
-        kwargs = {}
-        for f in fields(cls):
-            if from_source:
-                if f.metadata.get("skip_src") and f.name in data:
-                    continue
-                if path := f.metadata.get("path"):
-                    found = True
-                    v = data
-                    for key in path.split("."):
-                        if isinstance(v, Mapping):
-                            v = v.get(key)
-                        else:
-                            found = False
-                            break
-                    if not found:
-                        continue
-                    value = v
-                else:
-                    value = data.get(f.name, MISSING)
-                    if value is MISSING:
-                        continue
-
-                if value is not None and (t := f.metadata.get("transform")):
-                    if isinstance(t, str):
-                        t = getattr(cls, t)
-                    value = t(value)
-
-                value = cls._coerce_type(value, f)
-            else:
-                value = data.get(f.name, MISSING)
-                if value is MISSING:
-                    continue
-
-                if f.metadata.get("store_json"):
-                    value = json.loads(value)
-                else:
-                    value = cls._coerce_type(value, f)
-
-            kwargs[f.name] = value
-        return cls(**kwargs)
+    def from_db(cls, data: Mapping[str, Any]) -> Self:
+        return cls._from_db(cls, data)
+
+    @classmethod
+    def from_api(cls, data: Mapping[str, Any]) -> Self:
+        return cls._from_api(cls, data)
+
+    def to_db(self) -> dict[str, Any]:
+        # Без asdict: глубокая копия здесь не нужна
+        return self._to_db()
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)  # pyright: ignore[reportArgumentType]
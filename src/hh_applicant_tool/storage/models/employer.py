@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from .base import BaseModel, mapped
 
 
@@ -10,3 +12,5 @@ class EmployerModel(BaseModel):
     alternate_url: str | None = None
     area_id: int = mapped(path="area.id", default=None)
     area_name: str = mapped(path="area.name", default=None)
+    # Метка свежести профиля, в UTC как CURRENT_TIMESTAMP
+    updated_at: datetime | None = mapped(skip_src=True, default=None)
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from .base import BaseModel
+
+
+class HiddenEmployerModel(BaseModel):
+    id: int
+    # Код ответа API: 404 — профиль скрыт, 403 — недоступен
+    status_code: int | None = None
+    checked_at: datetime | None = None
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from .base import BaseModel, mapped
+
+
+class ReferenceModel(BaseModel):
+    endpoint: str
+    etag: str | None = None
+    last_modified: str | None = None
+    # Справочник уже в виде, удобном для выборки (см. api.reference)
+    data: Any = mapped(store_json=True, default=None)
+    fetched_at: datetime | None = None
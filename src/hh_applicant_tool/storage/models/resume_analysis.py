@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from .base import BaseModel
+
+
+class ResumeAnalysisModel(BaseModel):
+    id: int | None = None
+    resume_id: str
+    # heavy или light
+    mode: str
+    # sha256 от updated_at резюме (или от его содержимого)
+    resume_hash: str
+    analysis: str
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from .base import BaseModel, mapped
+
+
+class VacancyDetailModel(BaseModel):
+    id: int
+    # Описание без HTML
+    description: str = ""
+    key_skills: list[str] = mapped(store_json=True, default_factory=list)
+    # Как пришло из API: по нему видно, что вакансию переопубликовали
+    published_at: str | None = None
+    fetched_at: datetime | None = None
@@ -92,6 +92,7 @@ CREATE TABLE IF NOT EXISTS resumes (
 CREATE INDEX IF NOT EXISTS idx_vac_upd ON vacancies(updated_at);
 CREATE INDEX IF NOT EXISTS idx_emp_upd ON employers(updated_at);
 CREATE INDEX IF NOT EXISTS idx_neg_upd ON negotiations(updated_at);
+CREATE INDEX IF NOT EXISTS idx_neg_resume_vacancy ON negotiations(resume_id, vacancy_id);
 /* ===================== ТРИГГЕРЫ (Всегда обновляют дату) ===================== */
 -- Убрал условие WHEN. Теперь при любом UPDATE дата актуализируется принудительно.
 CREATE TRIGGER IF NOT EXISTS trg_resumes_updated
@@ -160,6 +161,58 @@ CREATE TABLE IF NOT EXISTS skipped_vacancies (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     UNIQUE (resume_id, vacancy_id)
 );
+/* ===================== reference_cache ===================== */
+-- Справочники API (/areas, /industries и т.п.) с данными для ревалидации
+CREATE TABLE IF NOT EXISTS reference_cache (
+    endpoint TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    data TEXT,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+/* ===================== vacancy_details ===================== */
+-- Полный текст и навыки вакансии, чтобы не запрашивать их при каждом запуске
+CREATE TABLE IF NOT EXISTS vacancy_details (
+    id INTEGER PRIMARY KEY,
+    description TEXT NOT NULL DEFAULT '',
+    key_skills TEXT,
+    published_at TEXT,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+/* ===================== hidden_employers ===================== */
+-- Работодатели, чей профиль API не отдает: не запрашиваем их каждый запуск
+CREATE TABLE IF NOT EXISTS hidden_employers (
+    id INTEGER PRIMARY KEY,
+    status_code INTEGER,
+    checked_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+/* ===================== resume_analyses ===================== */
+-- Текст резюме для AI-фильтра: пересобирается, только когда резюме изменилось
+CREATE TABLE IF NOT EXISTS resume_analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_id TEXT NOT NULL,
+    -- heavy или light
+    mode TEXT NOT NULL,
+    resume_hash TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (resume_id, mode)
+);
+/* ===================== ai_verdicts ===================== */
+-- Ответы AI-фильтра: вакансия с тем же текстом при том же системном промпте
+-- повторно не отправляется
+CREATE TABLE IF NOT EXISTS ai_verdicts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prompt_hash TEXT NOT NULL,
+    vacancy_id INTEGER NOT NULL,
+    context_hash TEXT NOT NULL,
+    suitable BOOLEAN NOT NULL,
+    model TEXT,
+    -- Секунды на запрос вместе с повторами
+    latency REAL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (prompt_hash, vacancy_id, context_hash)
+);
 /* ===================== ИНДЕКСЫ ===================== */
 CREATE INDEX IF NOT EXISTS idx_emp_site_upd ON employer_sites(updated_at);
 CREATE INDEX IF NOT EXISTS idx_skipped_vac_resume ON skipped_vacancies(resume_id, vacancy_id);
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from ..models.ai_verdict import AIVerdictModel
+from .base import BaseRepository
+from .errors import wrap_db_errors
+
+
+class AIVerdictsRepository(BaseRepository):
+    __table__ = "ai_verdicts"
+    model = AIVerdictModel
+    conflict_columns = ("prompt_hash", "vacancy_id", "context_hash")
+
+    @wrap_db_errors
+    def get_verdict(
+        self, prompt_hash: str, vacancy_id: int, context_hash: str
+    ) -> bool | None:
+        cur = self.conn.execute(
+            f"SELECT suitable FROM {self.table_name}"
+            " WHERE prompt_hash = ? AND vacancy_id = ? AND context_hash = ?",
+            (prompt_hash, vacancy_id, context_hash),
+        )
+        row = cur.fetchone()
+        return bool(row[0]) if row else None
@@ -3,11 +3,12 @@ from __future__ import annotations
 import logging
 import sqlite3
 from collections.abc import Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Any, ClassVar, Iterator, Mapping, Self, Type
 
 from ..models.base import BaseModel
 from .errors import wrap_db_errors
+from .query import Query
 
 DEFAULT_PRIMARY_KEY = "id"
 
@@ -29,6 +30,10 @@ class BaseRepository:
     def table_name(self) -> str:
         return self.__table__ or self.model.__name__
 
+    def bind(self, conn: sqlite3.Connection) -> Self:
+        """Тот же репозиторий поверх другого соединения."""
+        return replace(self, conn=conn)
+
     @wrap_db_errors
     def commit(self):
         if self.conn.in_transaction:
@@ -53,68 +58,42 @@ class BaseRepository:
         if commit if commit is not None else self.auto_commit:
             self.commit()
 
-    def _row_to_model(self, cursor: sqlite3.Cursor, row: tuple) -> BaseModel:
-        data = {col[0]: value for col, value in zip(cursor.description, row)}  # noqa: B905
-        return self.model.from_db(data)
+    def query(self) -> Query:
+        return Query(self)
 
-    @wrap_db_errors
-    def find(self, **kwargs: Any) -> Iterator[BaseModel]:
-        # logger.debug(kwargs)
-        operators = {
-            "lt": "<",
-            "le": "<=",
-            "gt": ">",
-            "ge": ">=",
-            "ne": "!=",
-            "eq": "=",
-            "like": "LIKE",
-            "is": "IS",
-            "is_not": "IS NOT",
-            "in": "IN",
-            "not_in": "NOT IN",
-        }
-        conditions = []
-        sql_params = {}
-        for key, value in kwargs.items():
-            try:
-                key, op = key.rsplit("__", 1)
-            except ValueError:
-                op = "eq"
-            if op in ("in", "not_in"):
-                if not isinstance(value, (list, tuple)):
-                    value = [value]
-                in_placeholders = []
-                for i, v in enumerate(value, 1):
-                    p_name = f"{key}_{i}"
-                    in_placeholders.append(f":{p_name}")
-                    sql_params[p_name] = v
-                conditions.append(
-                    f"{key} {operators[op]} ({', '.join(in_placeholders)})"
-                )
-            else:
-                placeholder = f":{key}"
-                sql_params[key] = value
-                conditions.append(f"{key} {operators[op]} {placeholder}")
-        sql = f"SELECT * FROM {self.table_name}"
-        if conditions:
-            sql += f" WHERE {' AND '.join(conditions)}"
-        sql += " ORDER BY rowid DESC;"
-        try:
-            cur = self.conn.execute(sql, sql_params)
-        except sqlite3.Error:
-            logger.warning("SQL ERROR: %s", sql)
-            raise
+    def where(self, **filters: Any) -> Query:
+        return self.query().where(**filters)
 
-        yield from (self._row_to_model(cur, row) for row in cur.fetchall())
+    def only(self, *columns: str) -> Query:
+        return self.query().only(*columns)
+
+    def find(self, **kwargs: Any) -> Iterator[BaseModel]:
+        return iter(self.where(**kwargs))
 
     @wrap_db_errors
     def get(self, pk: Any) -> BaseModel | None:
-        return next(self.find(**{f"{self.pkey}": pk}), None)
+        return self.where(**{f"{self.pkey}": pk}).first()
+
+    def count(self, **filters: Any) -> int:
+        return self.where(**filters).count()
+
+    def exists(self, **filters: Any) -> bool:
+        return self.where(**filters).exists()
 
-    @wrap_db_errors
     def count_total(self) -> int:
-        cur = self.conn.execute(f"SELECT count(*) FROM {self.table_name};")
-        return cur.fetchone()[0]
+        return self.count()
+
+    def delete_where(self, commit: bool | None = None, **filters: Any) -> int:
+        return self.where(**filters).delete(commit=commit)
+
+    def update_where(
+        self,
+        values: Mapping[str, Any],
+        /,
+        commit: bool | None = None,
+        **filters: Any,
+    ) -> int:
+        return self.where(**filters).update(values, commit=commit)
 
     @wrap_db_errors
     def delete(self, obj_or_pkey: Any, /, commit: bool | None = None) -> None:
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from ..models.hidden_employer import HiddenEmployerModel
+from .base import BaseRepository
+
+
+class HiddenEmployersRepository(BaseRepository):
+    __table__ = "hidden_employers"
+    model = HiddenEmployerModel
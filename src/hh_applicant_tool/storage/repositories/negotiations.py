@@ -4,6 +4,7 @@ from logging import getLogger
 
 from ..models.negotiation import NegotiationModel
 from .base import BaseRepository
+from .errors import wrap_db_errors
 
 logger = getLogger(__package__)
 
@@ -11,3 +12,23 @@ logger = getLogger(__package__)
 class NegotiationRepository(BaseRepository):
     __table__ = "negotiations"
     model = NegotiationModel
+
+    @wrap_db_errors
+    def vacancy_ids(self, resume_id: str) -> set[int]:
+        """id вакансий, на которые резюме уже откликалось."""
+        cur = self.conn.execute(
+            f"SELECT vacancy_id FROM {self.table_name} WHERE resume_id = ?",
+            (resume_id,),
+        )
+        return {row[0] for row in cur}
+
+    @wrap_db_errors
+    def employer_stats(self) -> dict[str, tuple[int, int]]:
+        """id работодателя -> (откликов, приглашений и дальше)."""
+        cur = self.conn.execute(
+            "SELECT employer_id, COUNT(*),"
+            " SUM(state IN ('invitation', 'interview', 'hired'))"
+            f" FROM {self.table_name}"
+            " WHERE employer_id IS NOT NULL GROUP BY employer_id"
+        )
+        return {str(row[0]): (row[1], row[2]) for row in cur}
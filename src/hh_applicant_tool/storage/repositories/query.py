@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Iterator, Mapping
+
+from .errors import RepositoryError, wrap_db_errors
+
+if TYPE_CHECKING:
+    from ..models.base import BaseModel
+    from .base import BaseRepository
+
+__all__ = ("Query",)
+
+# Сколько строк за раз забирать из курсора
+DEFAULT_BATCH_SIZE = 500
+
+OPERATORS = {
+    "lt": "<",
+    "le": "<=",
+    "gt": ">",
+    "ge": ">=",
+    "ne": "!=",
+    "eq": "=",
+    "like": "LIKE",
+    "is": "IS",
+    "is_not": "IS NOT",
+    "in": "IN",
+    "not_in": "NOT IN",
+}
+
+# Имена колонок подставляются в SQL как есть
+_COLUMN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+logger = logging.getLogger(__package__)
+
+
+def _column(name: str) -> str:
+    if not _COLUMN_RE.fullmatch(name):
+        raise ValueError(f"Недопустимое имя колонки: {name!r}")
+    return name
+
+
+def build_conditions(
+    filters: Mapping[str, Any],
+) -> tuple[list[str], list[Any]]:
+    """Условия вида `column__op=value` в SQL с позиционными параметрами."""
+    conditions = []
+    params = []
+    for key, value in filters.items():
+        column, _, op = key.partition("__")
+        op = op or "eq"
+        if op not in OPERATORS:
+            raise ValueError(f"Неизвестный оператор: {op!r}")
+        column = _column(column)
+        if op in ("in", "not_in"):
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                value = [value]
+            value = list(value)
+            conditions.append(
+                f"{column} {OPERATORS[op]} ({', '.join('?' * len(value))})"
+            )
+            params.extend(value)
+        else:
+            conditions.append(f"{column} {OPERATORS[op]} ?")
+            params.append(value)
+    return conditions, params
+
+
+@dataclass(frozen=True)
+class Query:
+    """Запрос к таблице репозитория.
+
+    Каждый метод-построитель возвращает новый запрос, так что частично
+    собранный можно переиспользовать. Строки идут от новых к старым (по
+    rowid) и читаются из курсора пачками по `batch_size`, а не все сразу.
+    `count()`, `exists()`, `delete()` и `update()` выполняются целиком в
+    SQLite без чтения строк.
+    """
+
+    repository: BaseRepository
+    conditions: tuple[str, ...] = ()
+    params: tuple[Any, ...] = ()
+    columns: tuple[str, ...] | None = None
+    max_rows: int | None = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.repository.conn
+
+    @property
+    def table_name(self) -> str:
+        return self.repository.table_name
+
+    def where(self, **filters: Any) -> Query:
+        conditions, params = build_conditions(filters)
+        return replace(
+            self,
+            conditions=self.conditions + tuple(conditions),
+            params=self.params + tuple(params),
+        )
+
+    def only(self, *columns: str) -> Query:
+        """Выбирать только эти колонки; строки будут словарями, а не
+        моделями."""
+        return replace(self, columns=tuple(map(_column, columns)) or None)
+
+    def limit(self, n: int | None) -> Query:
+        return replace(self, max_rows=n)
+
+    def after(self, rowid: int | None) -> Query:
+        """Строки старше `rowid`: следующая страница при листании по ключу."""
+        if rowid is None:
+            return self
+        return replace(
+            self,
+            conditions=self.conditions + ("rowid < ?",),
+            params=self.params + (rowid,),
+        )
+
+    def _where_sql(self) -> str:
+        if not self.conditions:
+            return ""
+        return f" WHERE {' AND '.join(self.conditions)}"
+
+    def _select_sql(self, columns: str) -> str:
+        sql = (
+            f"SELECT {columns} FROM {self.table_name}{self._where_sql()}"
+            " ORDER BY rowid DESC"
+        )
+        if self.max_rows is not None:
+            sql += f" LIMIT {int(self.max_rows)}"
+        return sql
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        try:
+            return self.conn.execute(sql, self.params + params)
+        except sqlite3.Error:
+            logger.warning("SQL ERROR: %s", sql)
+            raise
+
+    def _rows(self) -> Iterator[tuple[int, dict[str, Any]]]:
+        # Декоратор на генератор не действует: ошибки всплывают при чтении
+        try:
+            # rowid нужен для листания по ключу и не попадает в модель
+            cur = self._execute(
+                self._select_sql(f"rowid, {', '.join(self.columns or '*')}")
+            )
+            names = [col[0] for col in cur.description[1:]]
+            while rows := cur.fetchmany(self.batch_size):
+                for row in rows:
+                    yield row[0], dict(zip(names, row[1:]))  # noqa: B905
+        except sqlite3.Error as ex:
+            raise RepositoryError(f"Database error in query: {ex}") from ex
+
+    def _convert(self, data: dict[str, Any]) -> BaseModel | dict[str, Any]:
+        return data if self.columns else self.repository.model.from_db(data)
+
+    def __iter__(self) -> Iterator[BaseModel | dict[str, Any]]:
+        for _, data in self._rows():
+            yield self._convert(data)
+
+    def pages(
+        self, size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[list[BaseModel | dict[str, Any]]]:
+        """Страницы по `size` строк, каждая отдельным запросом от места,
+        где закончилась предыдущая: между страницами курсор не держится,
+        так что писать в таблицу можно."""
+        query, left = self, self.max_rows
+        while left is None or left > 0:
+            batch = min(size, left) if left is not None else size
+            rows = list(query.limit(batch)._rows())
+            if not rows:
+                return
+            yield [self._convert(data) for _, data in rows]
+            if len(rows) < batch:
+                return
+            if left is not None:
+                left -= len(rows)
+            query = query.after(rows[-1][0])
+
+    def first(self) -> BaseModel | dict[str, Any] | None:
+        return next(iter(self.limit(1)), None)
+
+    @wrap_db_errors
+    def count(self) -> int:
+        if self.max_rows is None:
+            sql = f"SELECT count(*) FROM {self.table_name}{self._where_sql()}"
+        else:
+            sql = f"SELECT count(*) FROM ({self._select_sql('1')})"
+        return self._execute(sql).fetchone()[0]
+
+    @wrap_db_errors
+    def exists(self) -> bool:
+        if self.max_rows is None:
+            sql = f"SELECT 1 FROM {self.table_name}{self._where_sql()}"
+        else:
+            sql = self._select_sql("1")
+        sql = f"SELECT EXISTS ({sql})"
+        return bool(self._execute(sql).fetchone()[0])
+
+    def _target_sql(self) -> str:
+        if self.max_rows is None:
+            return self._where_sql()
+        # DELETE/UPDATE ... LIMIT есть не во всех сборках SQLite
+        return f" WHERE rowid IN ({self._select_sql('rowid')})"
+
+    @wrap_db_errors
+    def delete(self, commit: bool | None = None) -> int:
+        """Удаляет подходящие строки и возвращает их число."""
+        cur = self._execute(f"DELETE FROM {self.table_name}{self._target_sql()}")
+        self.repository.maybe_commit(commit)
+        return cur.rowcount
+
+    @wrap_db_errors
+    def update(
+        self, values: Mapping[str, Any], /, commit: bool | None = None
+    ) -> int:
+        """Обновляет подходящие строки и возвращает их число. Значения
+        пишутся как есть, без преобразований модели."""
+        if not values:
+            return 0
+        assignments = ", ".join(f"{_column(c)} = ?" for c in values)
+        sql = f"UPDATE {self.table_name} SET {assignments}{self._target_sql()}"
+        try:
+            cur = self.conn.execute(sql, (*values.values(), *self.params))
+        except sqlite3.Error:
+            logger.warning("SQL ERROR: %s", sql)
+            raise
+        self.repository.maybe_commit(commit)
+        return cur.rowcount
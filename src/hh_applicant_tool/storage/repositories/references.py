@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from ..models.reference import ReferenceModel
+from .base import BaseRepository
+
+
+class ReferencesRepository(BaseRepository):
+    __table__ = "reference_cache"
+    pkey: str = "endpoint"
+    model = ReferenceModel
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from ..models.resume_analysis import ResumeAnalysisModel
+from .base import BaseRepository
+from .errors import wrap_db_errors
+
+
+class ResumeAnalysesRepository(BaseRepository):
+    __table__ = "resume_analyses"
+    model = ResumeAnalysisModel
+    conflict_columns = ("resume_id", "mode")
+
+    @wrap_db_errors
+    def get_analysis(
+        self, resume_id: str, mode: str, resume_hash: str
+    ) -> str | None:
+        """Сохраненный текст, если резюме с тех пор не менялось."""
+        cur = self.conn.execute(
+            f"SELECT analysis FROM {self.table_name}"
+            " WHERE resume_id = ? AND mode = ? AND resume_hash = ?",
+            (resume_id, mode, resume_hash),
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
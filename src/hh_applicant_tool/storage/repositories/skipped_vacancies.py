@@ -1,10 +1,24 @@
 from __future__ import annotations
 
+from typing import ClassVar
+
 from ..models.skipped_vacancy import SkippedVacancyModel
 from .base import BaseRepository
+from .errors import wrap_db_errors
 
 
-class SkippedVacanciesRepository(BaseRepository):   
+class SkippedVacanciesRepository(BaseRepository):
     __table__ = "skipped_vacancies"
     model = SkippedVacancyModel
     conflict_columns = ("resume_id", "vacancy_id")
+    # Оценки, которые зависят от порядка загрузки и настраиваемых порогов:
+    # пишутся для истории, но в следующих запусках вакансию не исключают
+    transient_reasons: ClassVar[tuple[str, ...]] = ("low_relevance",)
+
+    @wrap_db_errors
+    def vacancy_ids(self, resume_id: str = "") -> set[int]:
+        """id пропущенных вакансий резюме (`""` — пропущенные для всех)."""
+        query = self.where(
+            resume_id=resume_id, reason__not_in=self.transient_reasons
+        ).only("vacancy_id")
+        return {row["vacancy_id"] for row in query}
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from ..models.vacancy_detail import VacancyDetailModel
+from .base import BaseRepository
+
+
+class VacancyDetailsRepository(BaseRepository):
+    __table__ = "vacancy_details"
+    model = VacancyDetailModel
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import AbstractContextManager
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+
+from .connection import transaction
+from .repositories.errors import wrap_db_errors
+
+if TYPE_CHECKING:
+    from .models.base import BaseModel
+    from .repositories.base import BaseRepository
+
+__all__ = ("WriteBuffer",)
+
+DEFAULT_BUFFER_ROWS = 200
+# Секунд: дольше строки в буфере не лежат, если сохранения продолжаются
+DEFAULT_BUFFER_DELAY = 5.0
+
+# Ошибки из-за данных конкретной строки: остальные строки пачки можно
+# записать по одной. Прочие (база занята, нет места и т.п.) построчно
+# повторятся, поэтому строки остаются ждать следующего сброса
+_ROW_ERRORS = (
+    sqlite3.IntegrityError,
+    sqlite3.DataError,
+    sqlite3.InterfaceError,
+    sqlite3.ProgrammingError,
+)
+
+logger = logging.getLogger(__package__)
+
+
+# Thread-safe
+class WriteBuffer:
+    """Отложенная запись строк пачками в одной транзакции.
+
+    `save()` только запоминает строку. Когда строк набралось `max_rows`
+    или с первой прошло `max_delay` секунд (по таймеру, даже если новых
+    сохранений нет), все сбрасывается через
+    executemany в одной транзакции: один fsync на пачку вместо одного на
+    строку. Таблицы пишутся в порядке первого сохранения, строки — в
+    порядке сохранения, пачки друг с другом не перемешиваются; при сбое
+    транзакция откатывается целиком. Если база занята, строки остаются в
+    буфере до следующего сброса, а `flush()` поднимает ошибку. Читать
+    только что сохраненное можно после `flush()`.
+
+    Пишет через `writer` — выделенное соединение для записи (см.
+    `ConnectionManager.writer`), без него — через `conn`.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        max_rows: int = DEFAULT_BUFFER_ROWS,
+        max_delay: float = DEFAULT_BUFFER_DELAY,
+        writer: Callable[[], AbstractContextManager[sqlite3.Connection]]
+        | None = None,
+    ) -> None:
+        self.conn = conn
+        self.writer = writer or partial(transaction, conn)
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        # (таблица, колонки) -> репозиторий и строки: для executemany
+        # колонки должны совпадать
+        self._pending: dict[
+            tuple[str, tuple[str, ...]], tuple[BaseRepository, list]
+        ] = {}
+        self._rows = 0
+        self._first_at: float | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def save(
+        self,
+        repository: BaseRepository,
+        obj: BaseModel | Mapping[str, Any],
+    ) -> None:
+        if isinstance(obj, Mapping):
+            obj = repository.model.from_api(obj)
+        row = obj.to_db()
+        with self._lock:
+            key = (repository.table_name, tuple(row))
+            self._pending.setdefault(key, (repository, []))[1].append(row)
+            self._rows += 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+                self._start_timer()
+            if (
+                self._rows >= self.max_rows
+                or time.monotonic() - self._first_at >= self.max_delay
+            ):
+                self.flush()
+
+    @wrap_db_errors
+    def flush(self) -> int:
+        """Записывает все накопленное и возвращает число строк."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, rows = self._pending, self._rows
+            self._pending, self._rows, self._first_at = {}, 0, None
+            if not pending:
+                return 0
+            try:
+                self._write(pending)
+            except _ROW_ERRORS as ex:
+                logger.warning("Не удалось записать пачку из %d: %s", rows, ex)
+                # Одна кривая строка не должна терять остальные
+                self._write_one_by_one(pending)
+            except sqlite3.Error:
+                self._requeue(self._items(pending))
+                raise
+            logger.debug("write buffer: %d rows", rows)
+            return rows
+
+    def _start_timer(self) -> None:
+        # Конвейер может надолго встать (AI, капча, пауза по лимиту), а
+        # строки не должны лежать в памяти дольше max_delay
+        timer = threading.Timer(self.max_delay, self._flush_by_timer)
+        timer.args = (timer,)
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def _flush_by_timer(self, timer: threading.Timer) -> None:
+        with self._lock:
+            # Пачку уже записали, а таймер стоит на следующую
+            if self._timer is not timer:
+                return
+            try:
+                self.flush()
+            except sqlite3.Error as ex:
+                logger.warning("Не удалось записать отложенные строки: %s", ex)
+
+    def _write(self, pending: dict) -> None:
+        with self.writer() as conn:
+            for repository, rows in pending.values():
+                repository.bind(conn)._insert(rows, batch=True, commit=False)
+
+    def _write_one_by_one(self, pending: dict) -> None:
+        items = list(self._items(pending))
+        for n, (repository, row) in enumerate(items):
+            try:
+                # Каждая строка в своей транзакции: при ошибке
+                # откатывается только она
+                with self.writer() as conn:
+                    repository.bind(conn)._insert(row, commit=False)
+            except _ROW_ERRORS as ex:
+                logger.warning(
+                    "Не удалось сохранить в %s: %s",
+                    repository.table_name,
+                    ex,
+                )
+            except sqlite3.Error:
+                self._requeue(items[n:])
+                raise
+
+    @staticmethod
+    def _items(pending: dict) -> Iterator[tuple[BaseRepository, dict]]:
+        for repository, rows in pending.values():
+            for row in rows:
+                yield repository, row
+
+    def _requeue(self, items: Iterable[tuple[BaseRepository, dict]]) -> None:
+        # Вызывается под блокировкой из flush(): буфер сейчас пуст, так что
+        # порядок строк сохраняется
+        for repository, row in items:
+            key = (repository.table_name, tuple(row))
+            self._pending.setdefault(key, (repository, []))[1].append(row)
+            self._rows += 1
+        if self._rows and self._first_at is None:
+            self._first_at = time.monotonic()
+            self._start_timer()
@@ -295,10 +295,7 @@ class Api:
 
     def refresh_negotiations(self, status: str = "active") -> dict:
         try:
-            count = 0
-            for item in self._tool.get_negotiations(status):
-                self._tool.storage.negotiations.save(item)
-                count += 1
+            count = self._tool.negotiations_sync.sync(status)
             return {"status": "ok", "count": count}
         except Exception as e:
             logger.error("refresh_negotiations error: %s", e)
@@ -380,9 +377,9 @@ class Api:
             api_delay = params.pop("api_delay", None)
             if api_delay is not None:
                 try:
-                    self._tool.api_client.delay = float(api_delay)
-                except (ValueError, TypeError):
-                    pass
+                    self._tool.api_client.set_delay(float(api_delay))
+                except (ValueError, TypeError) as e:
+                    logger.warning("api_delay ignored: %s", e)
 
             argv = self._params_to_argv(params)
             op = Operation()
@@ -446,44 +443,32 @@ class Api:
 
     def get_areas(self) -> list[dict]:
         try:
-            def flatten(nodes: list, result: list, depth: int = 0) -> None:
-                for node in nodes:
-                    result.append({
-                        "id": node["id"],
-                        "name": ("  " * depth) + node["name"],
-                    })
-                    if node.get("areas"):
-                        flatten(node["areas"], result, depth + 1)
-
-            data = self._tool.api_client.get("/areas")
-            result: list[dict] = []
-            flatten(data, result)
-            return result
+            return [
+                {"id": area.id, "name": ("  " * area.depth) + area.name}
+                for area in self._tool.reference.areas()
+            ]
         except Exception as e:
             logger.error("get_areas error: %s", e)
             return []
 
     def get_professional_roles(self) -> list[dict]:
         try:
-            data = self._tool.api_client.get("/professional_roles")
-            result = []
-            for cat in data.get("categories", []):
-                for role in cat.get("roles", []):
-                    result.append({"id": role["id"], "name": role["name"]})
-            return result
+            return [
+                {"id": role.id, "name": role.name}
+                for role in self._tool.reference.professional_roles()
+                # Нулевой уровень — категории
+                if role.depth == 1
+            ]
         except Exception as e:
             logger.error("get_professional_roles error: %s", e)
             return []
 
     def get_industries(self) -> list[dict]:
         try:
-            data = self._tool.api_client.get("/industries")
-            result = []
-            for item in data:
-                result.append({"id": item["id"], "name": item["name"]})
-                for sub in item.get("industries", []):
-                    result.append({"id": sub["id"], "name": "  " + sub["name"]})
-            return result
+            return [
+                {"id": item.id, "name": ("  " * item.depth) + item.name}
+                for item in self._tool.reference.industries()
+            ]
         except Exception as e:
             logger.error("get_industries error: %s", e)
             return []
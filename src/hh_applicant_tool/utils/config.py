@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import os
 import platform
+import tempfile
 from functools import cache
 from os import getenv
 from pathlib import Path
@@ -27,27 +29,54 @@ class Config(dict):
         self._lock = Lock()
         self.load()
 
+    def _read(self) -> dict[str, Any]:
+        if not self._config_path.exists():
+            return {}
+        with self._lock:
+            with self._config_path.open(
+                "r", encoding="utf-8", errors="replace"
+            ) as f:
+                return json.load(f)
+
     def load(self) -> None:
-        if self._config_path.exists():
-            with self._lock:
-                with self._config_path.open(
-                    "r", encoding="utf-8", errors="replace"
-                ) as f:
-                    self.update(json.load(f))
+        self.update(self._read())
+
+    def reload(self, *keys: str) -> None:
+        """Перечитывает из файла только эти ключи."""
+        data = self._read()
+        for key in keys:
+            if key in data:
+                self[key] = data[key]
+            else:
+                self.pop(key, None)
 
     def save(self, *args: Any, **kwargs: Any) -> None:
         self.update(*args, **kwargs)
         self._config_path.parent.mkdir(exist_ok=True, parents=True)
         with self._lock:
-            with self._config_path.open(
-                "w+", encoding="utf-8", errors="replace"
-            ) as fp:
-                json.dump(
-                    self,
-                    fp,
-                    indent=2,
-                    sort_keys=True,
-                )
+            # Файл читают другие процессы: пишем во временный и подменяем,
+            # чтобы никто не увидел его наполовину записанным
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self._config_path.parent,
+                prefix=f".{self._config_path.name}.",
+            )
+            try:
+                if self._config_path.exists():
+                    # mkstemp создает файл только для владельца
+                    os.chmod(tmp_path, self._config_path.stat().st_mode)
+                with open(
+                    fd, "w", encoding="utf-8", errors="replace"
+                ) as fp:
+                    json.dump(
+                        self,
+                        fp,
+                        indent=2,
+                        sort_keys=True,
+                    )
+                os.replace(tmp_path, self._config_path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
 
     __getitem__ = dict.get
 
@@ -11,6 +11,9 @@ def parse_api_datetime(dt: str) -> datetime:
 
 
 def try_parse_datetime(dt: Any) -> datetime | Any:
+    # Остальное все равно не разобрать, а исключения недешевые
+    if not isinstance(dt, str):
+        return dt
     for parse in (datetime.fromisoformat, parse_api_datetime):
         try:
             return parse(dt)
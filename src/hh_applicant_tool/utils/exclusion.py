@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, NamedTuple
+
+from .string import strip_tags
+
+__all__ = (
+    "EXCLUSION_FIELDS",
+    "ExclusionRule",
+    "ExclusionMatch",
+    "ExclusionFilter",
+    "normalize_text",
+)
+
+# Поля в порядке проверки: описание — последним, оно требует запроса
+EXCLUSION_FIELDS = ("name", "snippet", "employer", "description")
+DEFAULT_RULE_FIELDS = EXCLUSION_FIELDS
+# Префикс групп правил в объединенном выражении
+_GROUP = "__rule"
+# Такие выражения в группу не обернуть: глобальные флаги допустимы только
+# в начале, а номера групп после обертки сдвигаются
+_UNMERGEABLE_RE = re.compile(r"^\(\?[aiLmsux]+\)|\\[1-9]|\(\?\(\d")
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _SPACES_RE.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+@dataclass(frozen=True)
+class ExclusionRule:
+    # Регулярное выражение без учета регистра; «ё» можно не учитывать
+    pattern: str
+    fields: tuple[str, ...] = DEFAULT_RULE_FIELDS
+    name: str = ""
+
+    @classmethod
+    def from_config(cls, conf: Mapping[str, Any], n: int) -> ExclusionRule:
+        """`{"pattern": ..., "fields": [...], "name": ...}` или `keywords`
+        вместо `pattern` — список слов, совпадающих буквально."""
+        if keywords := conf.get("keywords"):
+            pattern = "|".join(re.escape(normalize_text(k)) for k in keywords)
+        else:
+            pattern = conf["pattern"]
+        fields = tuple(conf.get("fields") or DEFAULT_RULE_FIELDS)
+        if unknown := set(fields) - set(EXCLUSION_FIELDS):
+            raise ValueError(
+                f"Неизвестные поля в правиле исключения: {', '.join(unknown)}"
+            )
+        rule = cls(pattern, fields, conf.get("name") or f"rule{n}")
+        rule.compile()
+        return rule
+
+    @property
+    def normalized_pattern(self) -> str:
+        # Регистр выражения не трогаем: \W и \w значат разное
+        return self.pattern.replace("ё", "е").replace("Ё", "Е")
+
+    def compile(self) -> re.Pattern:
+        """Выражение правила само по себе; ValueError, если оно неверное."""
+        try:
+            return re.compile(self.normalized_pattern, re.IGNORECASE)
+        except re.error as ex:
+            raise ValueError(
+                f"Неверное выражение в правиле исключения"
+                f" {self.name or self.pattern!r}: {ex}"
+            ) from ex
+
+
+class ExclusionMatch(NamedTuple):
+    rule: str
+    field: str
+    # Совпавший фрагмент
+    text: str
+
+
+class ExclusionFilter:
+    """Правила исключения вакансий, скомпилированные один раз на запуск.
+
+    Правила одного поля объединяются в одно регулярное выражение с
+    именованными группами: текст поля просматривается один раз, а по имени
+    группы видно, какое правило сработало. Правила с глобальными флагами,
+    нумерованными обратными ссылками или совпадающими именами групп
+    компилируются отдельно. Текст приводится к нижнему регистру, «ё»
+    заменяется на «е», пробелы схлопываются.
+    """
+
+    def __init__(self, rules: Iterable[ExclusionRule]) -> None:
+        self.rules = list(rules)
+        merged: dict[str, list[tuple[str, str]]] = {}
+        group_names: dict[str, set[str]] = {}
+        # Поле -> выражения и номер правила (None — объединенное)
+        self._patterns: dict[str, list[tuple[re.Pattern, int | None]]] = {}
+        for n, rule in enumerate(self.rules):
+            # Неверное правило — ошибка сразу, а не посреди запуска
+            compiled = rule.compile()
+            names = set(compiled.groupindex)
+            mergeable = not _UNMERGEABLE_RE.search(rule.normalized_pattern)
+            for field in rule.fields:
+                patterns = self._patterns.setdefault(field, [])
+                used = group_names.setdefault(field, set())
+                if mergeable and not names & used:
+                    if field not in merged:
+                        # Место в порядке проверки — по первому правилу
+                        patterns.append((None, None))
+                        merged[field] = []
+                    merged[field].append(
+                        (f"{_GROUP}{n}", rule.normalized_pattern)
+                    )
+                    used |= names
+                else:
+                    patterns.append((compiled, n))
+        for field, parts in merged.items():
+            patterns = self._patterns[field]
+            patterns[patterns.index((None, None))] = (
+                re.compile(
+                    "|".join(f"(?P<{group}>{p})" for group, p in parts),
+                    re.IGNORECASE,
+                ),
+                None,
+            )
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    @property
+    def needs_description(self) -> bool:
+        return "description" in self._patterns
+
+    def match(
+        self,
+        vacancy: Mapping[str, Any],
+        description: Callable[[], str] | None = None,
+    ) -> ExclusionMatch | None:
+        """Первое сработавшее правило. `description` вызывается, только
+        если дешевые поля не сработали."""
+        for field in EXCLUSION_FIELDS:
+            if field not in self._patterns:
+                continue
+            if field == "description":
+                if description is None:
+                    continue
+                text = description()
+            else:
+                text = self._field_text(vacancy, field)
+            text = normalize_text(text)
+            for pattern, n in self._patterns[field]:
+                if not (m := pattern.search(text)):
+                    continue
+                if n is None:
+                    # В самом правиле тоже могут быть группы, поэтому не
+                    # lastgroup
+                    n = next(
+                        int(group.removeprefix(_GROUP))
+                        for group, value in m.groupdict().items()
+                        if group.startswith(_GROUP) and value is not None
+                    )
+                return ExclusionMatch(self.rules[n].name, field, m.group())
+        return None
+
+    @staticmethod
+    def _field_text(vacancy: Mapping[str, Any], field: str) -> str:
+        if field == "name":
+            return vacancy.get("name") or ""
+        if field == "employer":
+            return (vacancy.get("employer") or {}).get("name") or ""
+        snippet = vacancy.get("snippet") or {}
+        # В сниппете поиска совпадения подсвечены тегами
+        return strip_tags(
+            " ".join(
+                filter(
+                    None,
+                    [snippet.get("requirement"), snippet.get("responsibility")],
+                )
+            )
+        )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import IO
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+__all__ = ("FileLock",)
+
+
+class FileLock:
+    """Эксклюзивная блокировка файла, общая для всех процессов.
+
+    Блокировка снимается ОС вместе с процессом, поэтому упавший процесс не
+    оставляет ее висеть.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._fp: IO[bytes] | None = None
+
+    def acquire(self) -> None:
+        assert self._fp is None, "lock already acquired"
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        fp = self.path.open("a+b")
+        try:
+            if os.name == "nt":
+                fp.seek(0)
+                while True:
+                    try:
+                        # Ждет до 10 секунд и бросает OSError
+                        msvcrt.locking(fp.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.1)
+            else:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            fp.close()
+            raise
+        self._fp = fp
+
+    def release(self) -> None:
+        if self._fp is None:
+            return
+        try:
+            if os.name == "nt":
+                self._fp.seek(0)
+                msvcrt.locking(self._fp.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fp.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._fp.close()
+            self._fp = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Mapping
+from weakref import WeakKeyDictionary
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.util import Retry
+
+logger = logging.getLogger(__package__)
+
+# Через сколько секунд простоя закрывать соединения. ddos-guard рвет
+# keep-alive примерно через минуту, и переиспользовать такие соединения
+# бессмысленно
+DEFAULT_IDLE_TIMEOUT = 50.0
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    reaped_pools: int = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return max(self.requests - self.new_connections, 0)
+
+    def __str__(self) -> str:
+        return (
+            f"requests={self.requests}"
+            f" reused={self.reused_connections}"
+            f" new={self.new_connections}"
+            f" tls_handshakes={self.tls_handshakes}"
+            f" reaped_pools={self.reaped_pools}"
+        )
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter со счетчиками соединений и закрытием простаивающих пулов."""
+
+    def __init__(
+        self,
+        *,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        **kwargs: Any,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+        self._stats_lock = Lock()
+        # Пул -> [учтено соединений, учтено запросов, время последнего запроса]
+        self._pools: WeakKeyDictionary[HTTPConnectionPool, list] = (
+            WeakKeyDictionary()
+        )
+        self._next_reap = 0.0
+        super().__init__(**kwargs)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        # Счетчики и ссылки на пулы не сериализуются
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.stats = PoolStats()
+        self._stats_lock = Lock()
+        self._pools = WeakKeyDictionary()
+        self._next_reap = 0.0
+        super().__setstate__(state)
+
+    def get_connection_with_tls_context(self, *args: Any, **kwargs: Any):
+        pool = super().get_connection_with_tls_context(*args, **kwargs)
+        with self._stats_lock:
+            self._pools.setdefault(
+                pool,
+                [pool.num_connections, pool.num_requests, time.monotonic()],
+            )
+        return pool
+
+    def send(
+        self, request: requests.PreparedRequest, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        self.reap_idle()
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            self._update_stats()
+
+    def _update_stats(self) -> None:
+        # Запрос мог уйти через любой из пулов, поэтому сверяем счетчики
+        # всех: urllib3 сам считает созданные соединения и запросы
+        now = time.monotonic()
+        with self._stats_lock:
+            self.stats.requests += 1
+            for pool, state in self._pools.items():
+                seen_connections, seen_requests, _ = state
+                if (new := pool.num_connections - seen_connections) > 0:
+                    self.stats.new_connections += new
+                    if pool.scheme == "https":
+                        self.stats.tls_handshakes += new
+                if pool.num_requests != seen_requests:
+                    state[:] = [pool.num_connections, pool.num_requests, now]
+
+    def _managers(self) -> list:
+        return [self.poolmanager, *self.proxy_manager.values()]
+
+    def reap_idle(self, force: bool = False) -> int:
+        """Закрывает пулы, которыми не пользовались дольше `idle_timeout`."""
+        now = time.monotonic()
+        if not force and now < self._next_reap:
+            return 0
+        self._next_reap = now + self.idle_timeout / 2
+        reaped = 0
+        with self._stats_lock:
+            for manager in self._managers():
+                for key in list(manager.pools.keys()):
+                    pool = manager.pools.get(key)
+                    state = self._pools.get(pool) if pool else None
+                    if state and now - state[2] >= self.idle_timeout:
+                        logger.debug(
+                            "close idle connections to %s://%s",
+                            pool.scheme,
+                            pool.host,
+                        )
+                        # RecentlyUsedContainer закрывает пул при удалении
+                        del manager.pools[key]
+                        self._pools.pop(pool, None)
+                        reaped += 1
+            self.stats.reaped_pools += reaped
+        return reaped
+
+
+@dataclass
+class PoolConfig:
+    # Сколько хостов держать в пуле адаптера
+    pool_connections: int = 10
+    # Сколько соединений держать к одному хосту
+    pool_maxsize: int = 10
+    # Повторы только при ошибках соединения и только для идемпотентных
+    # запросов: POST отклика повторять нельзя
+    max_retries: int = 2
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+
+    @classmethod
+    def from_config(
+        cls, conf: Mapping[str, Any] | None, **defaults: Any
+    ) -> PoolConfig:
+        values = defaults | {
+            k: v
+            for k, v in (conf or {}).items()
+            if k in cls.__dataclass_fields__
+        }
+        return cls(**values)
+
+    def create_adapter(self) -> PooledHTTPAdapter:
+        return PooledHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=Retry(
+                total=self.max_retries,
+                connect=self.max_retries,
+                read=0,
+                status=0,
+                backoff_factor=0.5,
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS - {"POST"},
+                raise_on_status=False,
+            ),
+            idle_timeout=self.idle_timeout,
+        )
+
+
+# Префиксы адаптеров: у каждого свой пул, поэтому соединения с сайтами
+# работодателей не вытесняют keep-alive до api.hh.ru
+HH_POOL_PREFIXES: dict[str, str] = {
+    "api": "https://api.hh.ru/",
+    "web": "https://hh.ru/",
+}
+
+
+@dataclass
+class PooledSession:
+    """Настраивает адаптеры сессии и собирает по ним статистику."""
+
+    session: requests.Session
+    adapters: dict[str, PooledHTTPAdapter] = field(default_factory=dict)
+
+    def mount(self, name: str, prefixes: list[str], conf: PoolConfig) -> None:
+        adapter = conf.create_adapter()
+        for prefix in prefixes:
+            self.session.mount(prefix, adapter)
+        self.adapters[name] = adapter
+
+    def log_stats(self, level: int = logging.DEBUG) -> None:
+        for name, adapter in self.adapters.items():
+            logger.log(level, "HTTP pool %s: %s", name, adapter.stats)
+
+
+def setup_session_pools(
+    session: requests.Session,
+    conf: Mapping[str, Any] | None = None,
+    prefixes: Mapping[str, str] | None = None,
+) -> PooledSession:
+    """Монтирует отдельные адаптеры на хосты `prefixes` и общий для прочих.
+
+    `conf` — секция конфига вида `{"pool_maxsize": 10, "api": {...}}`:
+    общие значения переопределяются значениями для конкретного адаптера.
+    """
+    conf = dict(conf or {})
+    common = {k: v for k, v in conf.items() if not isinstance(v, Mapping)}
+    pooled = PooledSession(session)
+    for name, prefix in (prefixes or {}).items():
+        pooled.mount(
+            name, [prefix], PoolConfig.from_config(common | conf.get(name, {}))
+        )
+    # Сторонние сайты: хостов много, а соединений к каждому нужно мало
+    pooled.mount(
+        "default",
+        ["https://", "http://"],
+        PoolConfig.from_config(
+            common | conf.get("default", {}),
+            pool_connections=20,
+            pool_maxsize=2,
+            max_retries=1,
+        ),
+    )
+    return pooled
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from queue import Empty, Queue
+from typing import Any, Callable, Iterable, Sequence
+
+__all__ = ("Stage", "Pipeline")
+
+DEFAULT_QUEUE_SIZE = 8
+
+# Маркер конца потока: каждый воркер стадии получает свой
+_DONE = object()
+
+logger = logging.getLogger(__package__)
+
+
+@dataclass
+class Stage:
+    name: str
+    # Возвращает элемент для следующей стадии или None, чтобы его отбросить
+    func: Callable[[Any], Any]
+    workers: int = 1
+    # Стадия дорабатывает элементы и после остановки конвейера. Нужна для
+    # побочных эффектов уже сделанной работы: сохранения в базу и т.п.
+    drain: bool = False
+    # После остановки элементы, для которых вернула True, передаются
+    # дальше без обработки: так уже принятые решения доходят до стадий
+    # с `drain`, а не теряются вместе с остальной очередью
+    passthrough: Callable[[Any], bool] | None = None
+    # Если больше 1, func получает список до `batch` элементов, уже ждущих
+    # в очереди, и возвращает список результатов
+    batch: int = 1
+
+
+class Pipeline:
+    """Стадии в своих потоках, связанные ограниченными очередями.
+
+    Источник читается в отдельном потоке, каждая стадия обрабатывает
+    элементы своими воркерами. Ограниченные очереди не дают быстрым
+    стадиям убегать далеко вперед медленных. После `stop()` (или
+    `cancel_event`) источник больше не читается, а стадии отбрасывают
+    элементы, кроме стадий с `drain` и элементов, пропущенных дальше
+    через `passthrough`. Первое исключение останавливает конвейер и
+    поднимается из `run()`.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: Sequence[Stage],
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        assert stages, "at least one stage required"
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.cancel_event = cancel_event
+        self._stop_event = threading.Event()
+        self._errors: list[BaseException] = []
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set() or bool(
+            self.cancel_event and self.cancel_event.is_set()
+        )
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _fail(self, ex: BaseException) -> None:
+        self._errors.append(ex)
+        self.stop()
+
+    def _feed(self, out: Queue, consumers: int) -> None:
+        it = iter(self.source)
+        try:
+            # Проверяем остановку до запроса следующего элемента: источник
+            # может быть ленивым и дорогим
+            while not self.stopped:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                out.put(item)
+        except BaseException as ex:
+            self._fail(ex)
+        finally:
+            if close := getattr(it, "close", None):
+                try:
+                    close()
+                except Exception as ex:
+                    logger.debug("source close error: %s", ex)
+            for _ in range(consumers):
+                out.put(_DONE)
+
+    def _work(
+        self,
+        stage: Stage,
+        inbox: Queue,
+        out: Queue | None,
+        consumers: int,
+        alive: list[int],
+        lock: threading.Lock,
+    ) -> None:
+        done = False
+        while not done and (item := inbox.get()) is not _DONE:
+            if stage.batch > 1:
+                item, done = self._take_batch(item, stage.batch, inbox)
+            # Очередь вычерпывается и после остановки, иначе стадия выше
+            # зависнет на put()
+            if self.stopped and not stage.drain:
+                if out is not None and stage.passthrough is not None:
+                    for r in item if stage.batch > 1 else (item,):
+                        if stage.passthrough(r):
+                            out.put(r)
+                continue
+            try:
+                result = stage.func(item)
+            except BaseException as ex:
+                logger.debug("stage %s failed: %r", stage.name, ex)
+                self._fail(ex)
+                continue
+            if out is None:
+                continue
+            for r in (result or ()) if stage.batch > 1 else (result,):
+                if r is not None:
+                    out.put(r)
+        with lock:
+            alive[0] -= 1
+            last = alive[0] == 0
+        # Последний завершившийся воркер передает конец потока дальше
+        if last and out is not None:
+            for _ in range(consumers):
+                out.put(_DONE)
+
+    @staticmethod
+    def _take_batch(
+        first: Any, size: int, inbox: Queue
+    ) -> tuple[list[Any], bool]:
+        # Пачку не ждем: добираем только то, что уже лежит в очереди.
+        # Второе значение — воркеру достался конец потока
+        batch = [first]
+        while len(batch) < size:
+            try:
+                item = inbox.get_nowait()
+            except Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def run(self) -> None:
+        queues = [Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = [
+            threading.Thread(
+                target=self._feed,
+                args=(queues[0], max(self.stages[0].workers, 1)),
+                name="pipeline-source",
+                daemon=True,
+            )
+        ]
+        for n, stage in enumerate(self.stages):
+            workers = max(stage.workers, 1)
+            has_next = n + 1 < len(self.stages)
+            out = queues[n + 1] if has_next else None
+            consumers = max(self.stages[n + 1].workers, 1) if has_next else 0
+            alive, lock = [workers], threading.Lock()
+            threads.extend(
+                threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[n], out, consumers, alive, lock),
+                    name=f"pipeline-{stage.name}-{i}",
+                    daemon=True,
+                )
+                for i in range(workers)
+            )
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self._errors:
+            raise self._errors[0]
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import operator
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Mapping
+
+from .date import try_parse_datetime
+
+__all__ = (
+    "PredicateError",
+    "PredicateContext",
+    "VacancyPredicate",
+    "compile_predicate",
+)
+
+Vacancy = Mapping[str, Any]
+Predicate = Callable[[Vacancy], bool]
+
+
+class PredicateError(ValueError):
+    pass
+
+
+@dataclass
+class PredicateContext:
+    # Код валюты -> сколько ее за рубль, как в /dictionaries
+    currency_rates: Mapping[str, float] = field(
+        default_factory=lambda: {"RUR": 1.0}
+    )
+    # id региона -> id родителя: `area in (1)` захватывает и вложенные
+    area_parents: Mapping[str, str | None] = field(default_factory=dict)
+    now: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def to_rub(self, amount: float | None, currency: str | None) -> float | None:
+        rate = self.currency_rates.get(currency or "RUR")
+        if amount is None or not rate:
+            return None
+        return amount / rate
+
+
+def _salary(bound: str | None) -> Callable[[Vacancy, PredicateContext], Any]:
+    def get(v: Vacancy, ctx: PredicateContext) -> float | None:
+        salary = v.get("salary") or {}
+        amount = (
+            salary.get(bound)
+            if bound
+            # Верхняя известная граница
+            else salary.get("to") or salary.get("from")
+        )
+        return ctx.to_rub(amount, salary.get("currency"))
+
+    return get
+
+
+def _age(v: Vacancy, ctx: PredicateContext) -> float | None:
+    published = try_parse_datetime(v.get("published_at"))
+    if not isinstance(published, datetime) or not published.tzinfo:
+        return None
+    return (ctx.now - published).total_seconds() / 86400
+
+
+def _id(*path: str) -> Callable[[Vacancy, PredicateContext], Any]:
+    def get(v: Vacancy, ctx: PredicateContext) -> str | None:
+        value: Any = v
+        for key in path:
+            value = (value or {}).get(key)
+        return None if value is None else str(value)
+
+    return get
+
+
+def _ids(key: str) -> Callable[[Vacancy, PredicateContext], Any]:
+    def get(v: Vacancy, ctx: PredicateContext) -> set[str]:
+        return {str(item["id"]) for item in v.get(key) or [] if "id" in item}
+
+    return get
+
+
+def _area(v: Vacancy, ctx: PredicateContext) -> set[str]:
+    # Регион вместе со всеми родителями
+    result = set()
+    area_id = (v.get("area") or {}).get("id")
+    while area_id is not None and area_id not in result:
+        result.add(str(area_id))
+        area_id = ctx.area_parents.get(str(area_id))
+    return result
+
+
+def _flag(key: str) -> Callable[[Vacancy, PredicateContext], Any]:
+    return lambda v, ctx: bool(v.get(key))
+
+
+# Имя -> (тип, значение из вакансии)
+FIELDS: dict[str, tuple[str, Callable[[Vacancy, PredicateContext], Any]]] = {
+    # Зарплата в рублях
+    "salary": ("number", _salary(None)),
+    "salary_from": ("number", _salary("from")),
+    "salary_to": ("number", _salary("to")),
+    # Дней с публикации
+    "age": ("number", _age),
+    "experience": ("id", _id("experience", "id")),
+    "employer": ("id", _id("employer", "id")),
+    "schedule": ("id", _id("schedule", "id")),
+    "employment": ("id", _id("employment", "id")),
+    "area": ("ids", _area),
+    "work_format": ("ids", _ids("work_format")),
+    "has_salary": ("bool", _flag("salary")),
+    "has_contacts": ("bool", _flag("contacts")),
+    "has_test": ("bool", _flag("has_test")),
+    "premium": ("bool", _flag("premium")),
+}
+
+_COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<number>\d+(?:\.\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op><=|>=|==|!=|<|>|\(|\)|,)
+      | (?P<word>[\w.-]+)
+    )""",
+    re.VERBOSE,
+)
+
+
+class _Parser:
+    def __init__(self, source: str, ctx: PredicateContext) -> None:
+        self.source = source
+        self.ctx = ctx
+        self.tokens: list[tuple[str, str, int]] = []
+        pos = 0
+        while pos < len(source.rstrip()):
+            m = _TOKEN_RE.match(source, pos)
+            if not m or m.end() == pos:
+                raise PredicateError(f"Непонятный символ в позиции {pos}")
+            kind = m.lastgroup
+            value = m.group(kind)
+            if kind == "string":
+                kind, value = "word", value[1:-1]
+            self.tokens.append((kind, value, m.start(kind)))
+            pos = m.end()
+        self.pos = 0
+
+    def peek(self) -> tuple[str, str, int] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def peek_word(self, *words: str) -> bool:
+        token = self.peek()
+        return bool(token and token[0] == "word" and token[1].lower() in words)
+
+    def take(self) -> tuple[str, str, int]:
+        token = self.peek()
+        if token is None:
+            raise PredicateError("Условие оборвалось")
+        self.pos += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, got, at = self.take()
+        if got.lower() != value:
+            raise PredicateError(f"Ожидалось {value!r}, а не {got!r} ({at})")
+
+    def parse(self) -> Predicate:
+        result = self.parse_or()
+        if (token := self.peek()) is not None:
+            raise PredicateError(f"Лишнее {token[1]!r} в позиции {token[2]}")
+        return result
+
+    def parse_or(self) -> Predicate:
+        parts = [self.parse_and()]
+        while self.peek_word("or"):
+            self.take()
+            parts.append(self.parse_and())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda v: any(p(v) for p in parts)
+
+    def parse_and(self) -> Predicate:
+        parts = [self.parse_not()]
+        while self.peek_word("and"):
+            self.take()
+            parts.append(self.parse_not())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda v: all(p(v) for p in parts)
+
+    def parse_not(self) -> Predicate:
+        if self.peek_word("not"):
+            self.take()
+            inner = self.parse_not()
+            return lambda v: not inner(v)
+        return self.parse_atom()
+
+    def parse_atom(self) -> Predicate:
+        kind, value, at = self.take()
+        if value == "(":
+            inner = self.parse_or()
+            self.expect(")")
+            return inner
+        if kind != "word" or value not in FIELDS:
+            raise PredicateError(f"Неизвестное поле {value!r} ({at})")
+        field_type, get = FIELDS[value]
+        ctx = self.ctx
+        if field_type == "bool":
+            return lambda v: get(v, ctx)
+
+        if self.peek_word("not", "in"):
+            negate = self.take()[1].lower() == "not"
+            if negate:
+                self.expect("in")
+            if field_type == "number":
+                raise PredicateError(f"Для {value} in не поддерживается")
+            values = frozenset(self.parse_list())
+            if field_type == "ids":
+                test = lambda v: bool(get(v, ctx) & values)  # noqa: E731
+            else:
+                test = lambda v: get(v, ctx) in values  # noqa: E731
+            return (lambda v: not test(v)) if negate else test
+
+        op_kind, op, op_at = self.take()
+        if op_kind != "op" or op not in _COMPARISONS:
+            raise PredicateError(f"Ожидалось сравнение после {value} ({op_at})")
+        compare = _COMPARISONS[op]
+        if field_type == "number":
+            operand = self.parse_number(value)
+        else:
+            if op not in ("==", "!="):
+                raise PredicateError(f"{value} можно только сравнить на равенство")
+            operand = self.take()[1]
+            if field_type == "ids":
+                member = operand
+                return (
+                    (lambda v: member in get(v, ctx))
+                    if op == "=="
+                    else (lambda v: member not in get(v, ctx))
+                )
+
+        def test(v: Vacancy) -> bool:
+            # Без значения (нет зарплаты и т.п.) сравнение не проходит
+            got = get(v, ctx)
+            return got is not None and compare(got, operand)
+
+        return test
+
+    def parse_number(self, name: str) -> float:
+        kind, value, at = self.take()
+        if kind != "number":
+            raise PredicateError(f"Ожидалось число для {name} ({at})")
+        number = float(value)
+        # salary >= 3000 USD
+        token = self.peek()
+        if name.startswith("salary") and token and token[0] == "word":
+            currency = token[1].upper()
+            if currency in self.ctx.currency_rates:
+                self.take()
+                number = self.ctx.to_rub(number, currency)
+        return number
+
+    def parse_list(self) -> list[str]:
+        self.expect("(")
+        values = [self.take()[1]]
+        while (token := self.take())[1] == ",":
+            values.append(self.take()[1])
+        if token[1] != ")":
+            raise PredicateError(f"Ожидалась ')' ({token[2]})")
+        return values
+
+
+def compile_predicate(
+    source: str, ctx: PredicateContext | None = None
+) -> Predicate:
+    """Компилирует условие в функцию от вакансии из поиска.
+
+    Пример::
+
+        salary >= 200000 and experience in (between1And3, between3And6)
+        and employer not in (1740, 3529) and age <= 7
+        and (work_format in (REMOTE, HYBRID) or area in (1))
+
+    Проверяется только то, что уже есть в выдаче поиска, без запросов.
+    Вакансии без значения поля (например, без зарплаты) сравнения не
+    проходят: для них есть `has_salary`.
+    """
+    return _Parser(source, ctx or PredicateContext()).parse()
+
+
+@dataclass
+class VacancyPredicate:
+    """Скомпилированное условие с исходным текстом для логов."""
+
+    source: str
+    test: Predicate
+
+    @classmethod
+    def compile(
+        cls, source: str, ctx: PredicateContext | None = None
+    ) -> VacancyPredicate:
+        return cls(source, compile_predicate(source, ctx))
+
+    def filter(self, vacancies: list[Vacancy]) -> list[Vacancy]:
+        return [v for v in vacancies if self.test(v)]
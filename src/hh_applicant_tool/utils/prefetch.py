@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+__all__ = ("prefetch_pages",)
+
+logger = logging.getLogger(__package__)
+
+
+def prefetch_pages(
+    fetch_page: Callable[[int], dict[str, Any]],
+    max_pages: int,
+    *,
+    lookahead: int = 2,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Отдает страницы выдачи по порядку, загружая следующие заранее.
+
+    Пока потребитель обрабатывает страницу, в фоне загружаются до
+    `lookahead` следующих. Первая страница загружается отдельно: только из
+    нее известно, сколько страниц всего. Если потребитель прекратил
+    итерацию или выставлен `cancel_event`, загрузка лишних страниц
+    отменяется. Ошибка загрузки поднимается при переходе к этой странице.
+    """
+    if max_pages <= 0:
+        return
+
+    cancelled = lambda: cancel_event is not None and cancel_event.is_set()  # noqa: E731
+    first = fetch_page(0)
+    yield first
+    last_page = min(max_pages, first.get("pages", 0)) - 1
+    if not first.get("items") or last_page < 1 or cancelled():
+        return
+
+    if lookahead < 1:
+        for page in range(1, last_page + 1):
+            if cancelled():
+                return
+            res = fetch_page(page)
+            yield res
+            if not res.get("items"):
+                return
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=lookahead, thread_name_prefix="prefetch"
+    )
+    pending: deque[Future] = deque()
+    next_page = 1
+    try:
+        while True:
+            while next_page <= last_page and len(pending) < lookahead:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+            if not pending or cancelled():
+                return
+            res = pending.popleft().result()
+            # Следующая страница уже в пути, пока обрабатывается эта
+            if next_page <= last_page:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+            yield res
+            if not res.get("items"):
+                return
+    finally:
+        if pending:
+            logger.debug("cancel %d prefetched pages", len(pending))
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
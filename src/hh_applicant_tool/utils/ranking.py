@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Mapping
+
+from .date import try_parse_datetime
+
+__all__ = ("DEFAULT_RANK_WEIGHTS", "VacancyRanker")
+
+DEFAULT_RANK_WEIGHTS = {
+    "freshness": 1.0,
+    "salary": 1.0,
+    "similarity": 1.0,
+    "employer": 1.0,
+}
+# За столько дней свежесть вакансии падает в e раз
+FRESHNESS_DAYS = 7.0
+# Зарплата выше ожидаемой в полтора раза и больше оценивается одинаково
+SALARY_CAP = 1.5
+# Оценка по признаку, о котором ничего не известно
+NEUTRAL = 0.5
+
+
+@dataclass
+class VacancyRanker:
+    """Оценка вакансий для очереди откликов: чем выше, тем раньше.
+
+    Складывает с весами `weights` признаки от 0 до 1: свежесть публикации,
+    зарплату относительно ожидаемой в резюме, текстовую близость к резюме
+    и то, как работодатель отвечал на прошлые отклики.
+    """
+
+    weights: Mapping[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_RANK_WEIGHTS)
+    )
+    # Ожидаемая зарплата из резюме: {"amount": ..., "currency": ...}
+    expected_salary: Mapping[str, Any] | None = None
+    # Текст вакансии -> близость к резюме
+    similarity: Callable[[Mapping[str, Any]], float] | None = None
+    # id работодателя -> (откликов, приглашений)
+    employer_stats: Mapping[str, tuple[int, int]] = field(default_factory=dict)
+    now: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def freshness(self, vacancy: Mapping[str, Any]) -> float:
+        published = try_parse_datetime(vacancy.get("published_at"))
+        if not isinstance(published, datetime) or not published.tzinfo:
+            return NEUTRAL
+        age_days = max((self.now - published).total_seconds(), 0) / 86400
+        return math.exp(-age_days / FRESHNESS_DAYS)
+
+    def salary(self, vacancy: Mapping[str, Any]) -> float:
+        expected = self.expected_salary or {}
+        offer = vacancy.get("salary") or {}
+        amount = offer.get("to") or offer.get("from")
+        if (
+            not expected.get("amount")
+            or not amount
+            or offer.get("currency") != expected.get("currency")
+        ):
+            return NEUTRAL
+        return min(amount / expected["amount"], SALARY_CAP) / SALARY_CAP
+
+    def employer(self, vacancy: Mapping[str, Any]) -> float:
+        employer_id = str((vacancy.get("employer") or {}).get("id"))
+        total, invited = self.employer_stats.get(employer_id, (0, 0))
+        if not total:
+            return NEUTRAL
+        # Сглаживание: один отклик без ответа еще ничего не значит
+        return (invited + NEUTRAL) / (total + 1)
+
+    def score(self, vacancy: Mapping[str, Any]) -> float:
+        features = {
+            "freshness": self.freshness(vacancy),
+            "salary": self.salary(vacancy),
+            "similarity": (
+                self.similarity(vacancy) if self.similarity else NEUTRAL
+            ),
+            "employer": self.employer(vacancy),
+        }
+        return sum(
+            self.weights.get(name, 0.0) * value
+            for name, value in features.items()
+        )
+
+    def rank(self, vacancies: list[Mapping[str, Any]]) -> Iterator[Any]:
+        """Вакансии от лучшей к худшей; при равенстве — в исходном порядке."""
+        heap = [(-self.score(v), n, v) for n, v in enumerate(vacancies)]
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)[2]
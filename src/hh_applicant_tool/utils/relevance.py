@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Iterable
+
+__all__ = ("RelevanceScorer", "tokenize")
+
+# Слова с c++, c#, node.js и т.п. не разбиваются
+_TOKEN_RE = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+# Русские слова обрезаются до основы такой длины: грубый стемминг,
+# «разработчик» и «разработка» дают одно и то же
+_RU_STEM = 6
+_STOP_WORDS = frozenset(
+    """
+    и в во на с со по за из к ко от до для о об при без не но или а что как
+    мы вы вас нас наш ваш это все у же то бы ли так также опыт работы работа
+    год года лет знание знания умение понимание навыки требования задачи
+    должность описание период настоящее время себе указано
+    and or the of to in for with on at by is are be an as we you our your
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.strip("._")
+        if not token or token in _STOP_WORDS or token.isdigit():
+            continue
+        if len(token) > _RU_STEM and "а" <= token[0] <= "я":
+            token = token[:_RU_STEM]
+        tokens.append(token)
+    return tokens
+
+
+# Thread-safe
+@dataclass
+class RelevanceScorer:
+    """Близость текстов к запросу по TF-IDF (косинус, от 0 до 1).
+
+    IDF считается по документам из `add_documents()`: обычно это страницы
+    поиска, так что слова, которые есть почти в каждой вакансии, весят
+    мало. Без документов оценка сводится к косинусу по частотам слов.
+    """
+
+    query: str
+    _query_tf: Counter[str] = field(init=False, repr=False)
+    _df: Counter[str] = field(default_factory=Counter, init=False, repr=False)
+    _docs: int = field(default=0, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._query_tf = Counter(tokenize(self.query))
+
+    def add_documents(self, texts: Iterable[str]) -> None:
+        df: Counter[str] = Counter()
+        n = 0
+        for text in texts:
+            df.update(set(tokenize(text)))
+            n += 1
+        with self._lock:
+            self._df.update(df)
+            self._docs += n
+
+    def score(self, text: str) -> float:
+        doc_tf = Counter(tokenize(text))
+        if not doc_tf or not self._query_tf:
+            return 0.0
+        with self._lock:
+            docs = self._docs
+            idf = {
+                t: math.log((1 + docs) / (1 + self._df[t])) + 1
+                for t in self._query_tf.keys() | doc_tf.keys()
+            }
+        dot = sum(
+            tf * doc_tf[t] * idf[t] ** 2
+            for t, tf in self._query_tf.items()
+            if t in doc_tf
+        )
+        if not dot:
+            return 0.0
+        query_norm = math.sqrt(
+            sum((tf * idf[t]) ** 2 for t, tf in self._query_tf.items())
+        )
+        doc_norm = math.sqrt(
+            sum((tf * idf[t]) ** 2 for t, tf in doc_tf.items())
+        )
+        return dot / (query_norm * doc_norm)
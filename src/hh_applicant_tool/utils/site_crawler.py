@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import html
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from ..storage.connection import transaction
+
+if TYPE_CHECKING:
+    from ..storage.repositories.employer_sites import EmployerSitesRepository
+
+__all__ = ("SiteCrawler", "parse_site_html")
+
+DEFAULT_CRAWLER_WORKERS = 4
+# Больше с одной страницы не читаем: контакты обычно в начале или в подвале
+# небольших страниц, а гигантские ответы только тормозят
+DEFAULT_MAX_BYTES = 512 * 1024
+DEFAULT_TIMEOUT = 10.0
+# Пауза между запросами к одному домену
+DEFAULT_DOMAIN_DELAY = 1.0
+# Сколько страниц контактов смотреть, если на главной емейлов нет
+MAX_CONTACT_PAGES = 2
+# Сколько в конце запуска ждать обхода уже поставленных сайтов
+DEFAULT_CLOSE_TIMEOUT = 30.0
+CHUNK_SIZE = 16 * 1024
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+_DESCRIPTION_RE = re.compile(
+    r'<meta name="description" content="(.*?)"', re.I
+)
+_GENERATOR_RE = re.compile(r'<meta name="generator" content="(.*?)"', re.I)
+# Исключение всякого мусора типа energy-software-slider-225x225@2x.png
+_EMAIL_RE = re.compile(
+    r"\b[a-z][a-z0-9_.-]+@([a-z0-9][a-z0-9-]+)(?!\.(?:png|jpe?g|bmp|gif|ico|js|css)\b)(\.[a-z0-9][a-z0-9-]+)+\b"  # noqa: E501
+)
+_LINK_RE = re.compile(
+    r"""<a\s[^>]*?href\s*=\s*["']([^"'#]+)["'][^>]*>(.*?)</a>""", re.I | re.S
+)
+_CONTACTS_LINK_RE = re.compile(
+    r"contact|kontakt|контакт|svyaz|связ|about|o-kompanii|о компании", re.I
+)
+
+logger = logging.getLogger(__package__)
+
+
+def parse_site_html(text: str) -> dict[str, Any]:
+    """Заголовок, метатеги и емейлы со страницы."""
+    val = lambda m: html.unescape(m.group(1)).strip() if m else ""  # noqa: E731
+    return {
+        "title": val(_TITLE_RE.search(text)),
+        "description": val(_DESCRIPTION_RE.search(text)),
+        "generator": val(_GENERATOR_RE.search(text)),
+        "emails": list(dict.fromkeys(m.group(0) for m in _EMAIL_RE.finditer(text))),
+    }
+
+
+def _contact_links(base_url: str, text: str) -> list[str]:
+    host = urlparse(base_url).netloc
+    links = []
+    for m in _LINK_RE.finditer(text):
+        url = urljoin(base_url, html.unescape(m.group(1)))
+        if (
+            urlparse(url).netloc == host
+            and _CONTACTS_LINK_RE.search(f"{m.group(1)} {m.group(2)}")
+            and url not in links
+        ):
+            links.append(url)
+    return links[:MAX_CONTACT_PAGES]
+
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
+
+@dataclass
+class SiteCrawler:
+    """Фоновый сбор емейлов с сайтов работодателей в employer_sites.
+
+    Сайты обходятся пулом потоков, чтобы медленный сайт не задерживал
+    отклики: стадии конвейера ставят сайт в очередь и берут только уже
+    собранные емейлы. Ответ читается потоком не больше `max_bytes` и не
+    дольше `timeout`, к одному домену — не чаще раза в `domain_delay`
+    секунд. Если на главной емейлов нет, смотрятся ссылки на контакты.
+    """
+
+    session: requests.Session
+    sites: EmployerSitesRepository
+    # Транзакция на выделенном для записи соединении (StorageFacade.writer);
+    # без него пишем через соединение репозитория
+    writer: Callable[[], AbstractContextManager[sqlite3.Connection]] | None = (
+        None
+    )
+    workers: int = DEFAULT_CRAWLER_WORKERS
+    max_bytes: int = DEFAULT_MAX_BYTES
+    timeout: float = DEFAULT_TIMEOUT
+    domain_delay: float = DEFAULT_DOMAIN_DELAY
+    follow_contacts: bool = True
+    close_timeout: float = DEFAULT_CLOSE_TIMEOUT
+    _queue: queue.Queue = field(default_factory=queue.Queue, init=False, repr=False)
+    _threads: list[threading.Thread] = field(
+        default_factory=list, init=False, repr=False
+    )
+    # id работодателя -> емейлы; None — сайт еще обходится
+    _emails: dict[str, list[str] | None] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _domains: threading.Condition = field(
+        default_factory=threading.Condition, init=False, repr=False
+    )
+    _busy_domains: set[str] = field(default_factory=set, init=False, repr=False)
+    _next_visit: dict[str, float] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _closed: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+
+    def cached_emails(
+        self, employer_id: str, site_url: str
+    ) -> list[str] | None:
+        """Емейлы из этого запуска или прошлых, None — сайт не обходили."""
+        with self._lock:
+            if employer_id in self._emails:
+                return self._emails[employer_id] or []
+        saved = self.sites.where(
+            employer_id=employer_id, site_url=site_url
+        ).first()
+        if saved is None:
+            return None
+        emails = [e for e in (saved.emails or "").split(",") if e]
+        with self._lock:
+            self._emails.setdefault(employer_id, emails)
+        return emails
+
+    def emails(self, employer_id: str) -> list[str]:
+        """Уже собранные емейлы без ожидания."""
+        with self._lock:
+            return self._emails.get(employer_id) or []
+
+    def submit(self, employer_id: str, site_url: str) -> None:
+        with self._lock:
+            if employer_id in self._emails or self._closed.is_set():
+                return
+            self._emails[employer_id] = None
+            if not self._threads:
+                self._start()
+        self._queue.put((employer_id, site_url))
+
+    def close(self, timeout: float | None = None) -> None:
+        """Дожидается обхода уже поставленных сайтов, но не дольше
+        `timeout` (по умолчанию `close_timeout`); недообойденные
+        бросаются."""
+        self._closed.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + (
+            self.close_timeout if timeout is None else timeout
+        )
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        if alive := sum(t.is_alive() for t in self._threads):
+            logger.debug("Не дождались обхода сайтов: %d потоков", alive)
+
+    def crawl(self, site_url: str) -> dict[str, Any]:
+        text, info = self._download(site_url)
+        info |= parse_site_html(text)
+        if self.follow_contacts and not info["emails"]:
+            for url in _contact_links(site_url, text):
+                try:
+                    page, _ = self._download(url)
+                except requests.RequestException as ex:
+                    logger.debug("Страница контактов недоступна: %s", ex)
+                    continue
+                if emails := parse_site_html(page)["emails"]:
+                    info["emails"] = emails
+                    break
+        return info
+
+    def _start(self) -> None:
+        for n in range(max(self.workers, 1)):
+            thread = threading.Thread(
+                target=self._work, name=f"site-crawler-{n}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while (job := self._queue.get()) is not None:
+            employer_id, site_url = job
+            logger.debug("visit site: %s", site_url)
+            try:
+                info = self.crawl(site_url)
+            except Exception as ex:
+                if isinstance(ex, requests.RequestException):
+                    logger.error(ex)
+                else:
+                    logger.exception(ex)
+                # В этом запуске сайт больше не трогаем
+                with self._lock:
+                    self._emails[employer_id] = []
+                continue
+            logger.debug("site info: %r", info)
+            with self._lock:
+                self._emails[employer_id] = info["emails"]
+            writer = self.writer or partial(transaction, self.sites.conn)
+            try:
+                with writer() as conn:
+                    self.sites.bind(conn).save(
+                        {
+                            "site_url": site_url,
+                            "employer_id": employer_id,
+                            "subdomains": [],
+                            **info,
+                        },
+                        commit=False,
+                    )
+            except Exception as ex:
+                logger.exception(ex)
+
+    def _download(self, url: str) -> tuple[str, dict[str, Any]]:
+        domain = _domain(url)
+        self._acquire_domain(domain)
+        try:
+            return self._read(url)
+        finally:
+            self._release_domain(domain)
+
+    def _read(self, url: str) -> tuple[str, dict[str, Any]]:
+        deadline = time.monotonic() + self.timeout
+        with self.session.get(url, timeout=self.timeout, stream=True) as r:
+            info = {
+                "server_name": r.headers.get("Server"),
+                "powered_by": r.headers.get("X-Powered-By"),
+                "ip_address": self._peer_ip(r),
+            }
+            body = bytearray()
+            for chunk in r.iter_content(CHUNK_SIZE):
+                body += chunk
+                # Медленный сайт может отдавать по байту и не упираться
+                # в таймаут чтения
+                if len(body) >= self.max_bytes or time.monotonic() > deadline:
+                    break
+            content_type = r.headers.get("Content-Type", "").lower()
+            encoding = r.encoding if "charset=" in content_type else "utf-8"
+        text = bytes(body[: self.max_bytes]).decode(
+            encoding or "utf-8", errors="replace"
+        )
+        return text, info
+
+    @staticmethod
+    def _peer_ip(r: requests.Response) -> str | None:
+        # Не работает, если отключена проверка сертификата
+        try:
+            return r.raw._connection.sock.getpeername()[0]
+        except (AttributeError, OSError, TypeError):
+            return None
+
+    def _acquire_domain(self, domain: str) -> None:
+        with self._domains:
+            while True:
+                wait = self._next_visit.get(domain, 0) - time.monotonic()
+                if domain not in self._busy_domains and wait <= 0:
+                    self._busy_domains.add(domain)
+                    return
+                self._domains.wait(max(wait, 0.05))
+
+    def _release_domain(self, domain: str) -> None:
+        with self._domains:
+            self._busy_domains.discard(domain)
+            self._next_visit[domain] = time.monotonic() + self.domain_delay
+            self._domains.notify_all()
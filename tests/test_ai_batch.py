@@ -0,0 +1,83 @@
+"""Тесты пакетной AI-фильтрации."""
+
+from __future__ import annotations
+
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.operations.apply_vacancies import Operation, _ApplyTask
+from hh_applicant_tool.storage.facade import StorageFacade
+
+RUN = SimpleNamespace(resume={"id": "r1"})
+
+
+@pytest.fixture
+def op() -> Operation:
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.storage = StorageFacade(sqlite3.connect(":memory:"))
+    op.ai_filter = "light"
+    op.vacancy_filter_ai = MagicMock(system_prompt="resume", model="m1")
+    op._get_vacancy_key_skills = lambda vacancy: "Python"
+    return op
+
+
+def _tasks(*ids: int) -> list[_ApplyTask]:
+    return [
+        _ApplyTask(
+            vacancy={
+                "id": str(i),
+                "name": f"Vacancy {i}",
+                "alternate_url": f"https://hh.ru/vacancy/{i}",
+            },
+            placeholders={},
+        )
+        for i in ids
+    ]
+
+
+def test_one_request_for_batch(op):
+    op.vacancy_filter_ai.complete.return_value = (
+        '```json\n[{"id": "1", "suitable": true},\n'
+        ' {"id": 2, "suitable": false}, {"id": "3", "suitable": true}]\n```'
+    )
+
+    tasks = op._judge_vacancies(RUN, _tasks(1, 2, 3))
+
+    op.vacancy_filter_ai.complete.assert_called_once()
+    assert [t.skip_reason for t in tasks] == [None, "ai_rejected", None]
+    # Ответы сохранены по вакансиям
+    assert op.tool.storage.ai_verdicts.count_total() == 3
+
+
+def test_missing_items_are_asked_one_by_one(op):
+    op.vacancy_filter_ai.complete.side_effect = [
+        '[{"id": "1", "suitable": false}, {"id": "2", "suit',
+        '{"suitable": false}',
+    ]
+
+    tasks = op._judge_vacancies(RUN, _tasks(1, 2))
+
+    assert op.vacancy_filter_ai.complete.call_count == 2
+    retry = op.vacancy_filter_ai.complete.call_args.args[0]
+    assert "Vacancy 2" in retry
+    assert "Vacancy 1" not in retry
+    assert [t.skip_reason for t in tasks] == ["ai_rejected", "ai_rejected"]
+
+
+def test_cached_verdicts_are_not_sent(op):
+    op.vacancy_filter_ai.complete.return_value = '{"suitable": false}'
+    op._judge_vacancies(RUN, _tasks(1))
+    op.vacancy_filter_ai.complete.reset_mock()
+    op.vacancy_filter_ai.complete.return_value = (
+        '[{"id": "2", "suitable": true}, {"id": "3", "suitable": true}]'
+    )
+
+    tasks = op._judge_vacancies(RUN, _tasks(1, 2, 3))
+
+    message = op.vacancy_filter_ai.complete.call_args.args[0]
+    assert "[id: 1]" not in message
+    assert [t.skip_reason for t in tasks] == ["ai_rejected", None, None]
@@ -0,0 +1,63 @@
+"""Тесты кеша ответов AI-фильтра."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.ai.base import AIError
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+
+VACANCY = {"id": "100", "name": "Python developer"}
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:"))
+
+
+def _operation(storage: StorageFacade, answer: str = '{"suitable": false}'):
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.storage = storage
+    op.vacancy_filter_ai = MagicMock(system_prompt="resume A", model="m1")
+    op.vacancy_filter_ai.complete.return_value = answer
+    op._get_vacancy_key_skills = lambda vacancy: "Python"
+    return op
+
+
+def test_verdict_is_reused_by_next_run(storage):
+    assert not _operation(storage)._is_vacancy_suitable_light(VACANCY)
+
+    op = _operation(storage, '{"suitable": true}')
+    assert not op._is_vacancy_suitable_light(VACANCY)
+    op.vacancy_filter_ai.complete.assert_not_called()
+
+    saved = next(storage.ai_verdicts.find(vacancy_id=100))
+    assert saved.model == "m1"
+    assert saved.latency is not None
+    assert saved.created_at is not None
+
+
+def test_other_prompt_or_context_is_asked_again(storage):
+    _operation(storage)._is_vacancy_suitable_light(VACANCY)
+
+    op = _operation(storage, '{"suitable": true}')
+    op.vacancy_filter_ai.system_prompt = "resume B"
+    assert op._is_vacancy_suitable_light(VACANCY)
+
+    op = _operation(storage, '{"suitable": true}')
+    op._get_vacancy_key_skills = lambda vacancy: "Python, Go"
+    assert op._is_vacancy_suitable_light(VACANCY)
+    assert storage.ai_verdicts.count_total() == 3
+
+
+def test_failed_answer_is_not_saved(storage):
+    op = _operation(storage)
+    op.vacancy_filter_ai.complete.side_effect = AIError("timeout")
+
+    assert op._is_vacancy_suitable_light(VACANCY)
+    assert storage.ai_verdicts.count_total() == 0
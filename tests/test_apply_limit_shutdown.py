@@ -83,6 +83,25 @@ class TestMaxResponses:
 
         assert op.tool.api_client.post.call_count == 5
 
+    def test_no_cover_letters_past_max_responses(self):
+        """AI letters are not generated for vacancies past the limit."""
+        op = _make_operation(max_responses=2)
+        op.force_message = True
+        op.message_prompt = "prompt"
+        op.cover_letter_ai = MagicMock()
+        op.cover_letter_ai.complete.return_value = "letter"
+        op.stage_workers = {"enrich": 1, "ai": 1, "letter": 4}
+        op._get_vacancies = lambda resume_id=None: iter(
+            _make_vacancy(i) for i in range(20)
+        )
+
+        resume = {"id": "r1", "title": "Dev", "alternate_url": "u"}
+        user = {"first_name": "A", "last_name": "B", "email": "a@b.c", "phone": ""}
+        op._apply_resume(resume=resume, user=user, seen_employers=set())
+
+        assert op.tool.api_client.post.call_count == 2
+        assert op.cover_letter_ai.complete.call_count == 2
+
     def test_no_limit_means_no_early_stop(self):
         """Without max-responses, all vacancies are attempted."""
         op = _make_operation(max_responses=0)
@@ -0,0 +1,301 @@
+"""Тесты конвейера откликов."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api.errors import LimitExceeded
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+from hh_applicant_tool.utils.pipeline import Pipeline, Stage
+
+RESUME = {"id": "r1", "title": "Dev", "alternate_url": "u"}
+USER = {"first_name": "A", "last_name": "B", "email": "a@b.c", "phone": ""}
+
+
+def test_items_flow_through_stages():
+    out = []
+    Pipeline(
+        range(10),
+        [
+            Stage("double", lambda x: x * 2, workers=3),
+            # Нечетные отбрасываются
+            Stage("odd", lambda x: x if x % 4 == 0 else None),
+            Stage("sink", out.append),
+        ],
+    ).run()
+
+    assert sorted(out) == [0, 4, 8, 12, 16]
+
+
+def test_slow_stage_runs_concurrently():
+    def slow(x):
+        time.sleep(0.1)
+        return x
+
+    started = time.monotonic()
+    Pipeline(range(8), [Stage("slow", slow, workers=8)]).run()
+
+    assert time.monotonic() - started < 0.5
+
+
+def test_stop_drains_only_drain_stages():
+    seen, drained = [], []
+    pipeline: Pipeline
+
+    def first(x):
+        seen.append(x)
+        if x == 2:
+            pipeline.stop()
+        return x
+
+    pipeline = Pipeline(
+        range(100),
+        [Stage("first", first), Stage("drain", drained.append, drain=True)],
+        queue_size=1,
+    )
+    pipeline.run()
+
+    assert seen == [0, 1, 2]
+    assert drained == [0, 1, 2]
+
+
+def test_passthrough_items_reach_drain_stage_after_stop():
+    drained = []
+    pipeline: Pipeline
+
+    def first(x):
+        if x == 5:
+            pipeline.stop()
+        return x
+
+    def middle(x):
+        time.sleep(0.01)
+        return x
+
+    pipeline = Pipeline(
+        range(6),
+        [
+            Stage("first", first),
+            # Четные уже «решены» и должны дойти до конца после остановки
+            Stage("middle", middle, passthrough=lambda x: x % 2 == 0),
+            Stage("drain", drained.append, drain=True),
+        ],
+        queue_size=10,
+    )
+    pipeline.run()
+
+    assert {0, 2, 4} <= set(drained)
+
+
+def test_error_is_raised_from_run():
+    def fail(x):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        Pipeline(range(5), [Stage("fail", fail, workers=2)]).run()
+
+
+def test_batch_stage_gets_waiting_items():
+    batches, out = [], []
+
+    def judge(items):
+        batches.append(len(items))
+        return [x for x in items if x % 2 == 0]
+
+    Pipeline(
+        range(20),
+        [Stage("batch", judge, batch=5), Stage("sink", out.append)],
+        queue_size=20,
+    ).run()
+
+    assert sorted(out) == list(range(0, 20, 2))
+    assert sum(batches) == 20
+    assert max(batches) <= 5
+
+
+def _make_operation(vacancies: list[dict]) -> Operation:
+    op = Operation()
+    op._args = SimpleNamespace(
+        skip_tests=False, send_email=False, ai_rate_limit=0
+    )
+    op.max_responses = 0
+    op.dry_run = False
+    op.ai_filter = None
+    op.ai_filter_prompt = None
+    op.vacancy_filter_ai = None
+    op.excluded_filter = None
+    op.cover_letter_ai = None
+    op.cover_letter = "hello"
+    op.force_message = False
+    op.tool = MagicMock()
+    op.tool.api_client.post.return_value = {}
+    op._get_vacancies = lambda resume_id=None: iter(vacancies)
+    return op
+
+
+def _vacancy(i: int, **kwargs) -> dict:
+    return {
+        "id": str(i),
+        "name": f"Vacancy {i}",
+        "alternate_url": f"https://hh.ru/vacancy/{i}",
+        "employer": {},
+        "snippet": {},
+        **kwargs,
+    }
+
+
+def test_slow_ai_does_not_stall_other_vacancies():
+    op = _make_operation([_vacancy(i) for i in range(4)])
+    op.ai_filter = "light"
+    op._analyze_resume_light = lambda resume: "resume"
+    op.stage_workers = {"enrich": 1, "ai": 4, "letter": 1}
+    op.tool.storage.skipped_vacancies.find.return_value = []
+    release = threading.Event()
+
+    def judge(vacancy):
+        # Вакансия 0 «думает», пока не откликнемся на остальные
+        if vacancy["id"] == "0":
+            assert release.wait(2)
+            return False
+        return True
+
+    def post(endpoint, params, **kwargs):
+        if op.tool.api_client.post.call_count == 3:
+            release.set()
+        return {}
+
+    op._is_vacancy_suitable_light = judge
+    op.tool.api_client.post.side_effect = post
+
+    op._apply_resume(resume=RESUME, user=USER, seen_employers=set())
+
+    applied = [
+        c.args[1]["vacancy_id"] for c in op.tool.api_client.post.call_args_list
+    ]
+    assert sorted(applied) == ["1", "2", "3"]
+    repository, saved = op.tool.storage.buffer.save.call_args.args
+    assert repository is op.tool.storage.skipped_vacancies
+    assert saved["vacancy_id"] == "0"
+    assert saved["reason"] == "ai_rejected"
+
+
+def test_limit_exceeded_stops_run():
+    op = _make_operation([_vacancy(i) for i in range(10)])
+    op.tool.api_client.post.side_effect = LimitExceeded(MagicMock(), {})
+
+    limit_reached = op._apply_resume(
+        resume=RESUME, user=USER, seen_employers=set()
+    )
+
+    assert limit_reached
+    assert op.tool.api_client.post.call_count == 1
+
+
+def test_employer_profile_is_fetched_once():
+    vacancies = [_vacancy(i, employer={"id": "42", "name": "E"}) for i in range(3)]
+    op = _make_operation(vacancies)
+    op.tool.employer_cache.get.return_value = {"id": "42", "name": "E"}
+
+    op._apply_resume(resume=RESUME, user=USER, seen_employers=set())
+
+    op.tool.employer_cache.get.assert_called_once_with("42")
+    assert op.tool.api_client.post.call_count == 3
+
+
+def test_skipped_index_is_loaded_once_and_updated():
+    storage = StorageFacade(sqlite3.connect(":memory:", check_same_thread=False))
+    storage.skipped_vacancies.save(
+        {"resume_id": "", "vacancy_id": 1, "reason": "excluded_filter"}
+    )
+    storage.skipped_vacancies.save(
+        {"resume_id": "r1", "vacancy_id": 2, "reason": "ai_rejected"}
+    )
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.storage = storage
+
+    assert op._is_vacancy_already_skipped(_vacancy(1), "r1")
+    assert op._is_vacancy_already_skipped(_vacancy(2), "r1")
+    assert not op._is_vacancy_already_skipped(_vacancy(2), "r2")
+    assert not op._is_vacancy_already_skipped(_vacancy(3), "r1")
+
+    op._save_skipped_vacancy(_vacancy(3), "ai_rejected", "r1")
+    storage.skipped_vacancies.clear()
+
+    # Проверки идут по индексу в памяти, а не по базе
+    assert op._is_vacancy_already_skipped(_vacancy(3), "r1")
+    assert op._is_vacancy_already_skipped(_vacancy(1), "r1")
+
+
+def test_employer_is_not_fetched_for_rejected_vacancy():
+    vacancies = [
+        _vacancy(i, employer={"id": str(i), "name": "E"}) for i in range(2)
+    ]
+    op = _make_operation(vacancies)
+    op.ai_filter = "light"
+    op._analyze_resume_light = lambda resume: "resume"
+    op.tool.storage.skipped_vacancies.find.return_value = []
+    op._is_vacancy_suitable_light = lambda vacancy: vacancy["id"] == "1"
+
+    op._apply_resume(resume=RESUME, user=USER, seen_employers=set())
+
+    op.tool.employer_cache.get.assert_called_once_with("1")
+
+
+def test_rejected_vacancies_are_saved_after_stop():
+    op = _make_operation([_vacancy(i) for i in range(6)])
+    op.ai_filter = "light"
+    op._analyze_resume_light = lambda resume: "resume"
+    op.tool.storage.skipped_vacancies.find.return_value = []
+    judged = threading.Semaphore(0)
+
+    def judge(vacancy):
+        if vacancy["id"] == "0":
+            return True
+        judged.release()
+        return False
+
+    def post(endpoint, params, **kwargs):
+        # Лимит наступает, когда AI уже отклонил остальные вакансии
+        for _ in range(5):
+            assert judged.acquire(timeout=2)
+        raise LimitExceeded(MagicMock(), {})
+
+    op._is_vacancy_suitable_light = judge
+    op.tool.api_client.post.side_effect = post
+
+    assert op._apply_resume(resume=RESUME, user=USER, seen_employers=set())
+
+    saved = [
+        c.args[1]
+        for c in op.tool.storage.buffer.save.call_args_list
+        if c.args[0] is op.tool.storage.skipped_vacancies
+    ]
+    assert sorted(s["vacancy_id"] for s in saved) == ["1", "2", "3", "4", "5"]
+    assert {s["reason"] for s in saved} == {"ai_rejected"}
+
+
+def test_site_crawler_is_closed_on_error():
+    op = _make_operation([])
+    op.resume_id = None
+    op.tool.get_resumes.return_value = [
+        {"id": "r1", "status": {"id": "published"}}
+    ]
+    op.__dict__["_site_crawler"] = crawler = MagicMock()
+
+    def fail(**kwargs):
+        raise RuntimeError("boom")
+
+    op._apply_resume = fail
+
+    with pytest.raises(RuntimeError, match="boom"):
+        op._apply_vacancies()
+
+    crawler.close.assert_called_once_with(0)
@@ -0,0 +1,146 @@
+"""Тесты асинхронного клиента API."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api import errors
+from hh_applicant_tool.api.async_client import AsyncApiClient
+from hh_applicant_tool.api.client import ApiClient
+from hh_applicant_tool.api.rate_limiter import TokenBucket
+
+
+def _response(status_code: int = 200, data=None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = "{}"
+    response.json.return_value = {} if data is None else data
+    return response
+
+
+def _client(session: MagicMock, **kwargs) -> ApiClient:
+    return ApiClient(
+        session=session, limiter=TokenBucket(1000, burst=100), **kwargs
+    )
+
+
+def test_concurrency_is_bounded():
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def request(*args, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return _response()
+
+    session = MagicMock()
+    session.request.side_effect = request
+    client = AsyncApiClient(_client(session), max_concurrency=3)
+
+    async def main():
+        return await asyncio.gather(
+            *(client.get("/vacancies", page=i) for i in range(9))
+        )
+
+    assert asyncio.run(main()) == [{}] * 9
+    assert peak == 3
+
+
+def test_uses_shared_limiter():
+    session = MagicMock()
+    session.request.return_value = _response()
+    sync_client = _client(session)
+    sync_client.limiter = MagicMock()
+
+    async def acquire_async(delay):
+        return 0.0
+
+    sync_client.limiter.acquire_async.side_effect = acquire_async
+    client = AsyncApiClient(sync_client)
+    asyncio.run(client.get("/me"))
+    sync_client.limiter.acquire_async.assert_called_once_with(None)
+    sync_client.limiter.record_success.assert_called_once()
+
+
+def test_refreshes_expired_token_once():
+    session = MagicMock()
+    session.request.return_value = _response()
+    sync_client = _client(
+        session,
+        access_token="USER_OLD",
+        refresh_token="refresh",
+        access_expires_at=1,
+    )
+    refreshed = []
+
+    def refresh():
+        refreshed.append(True)
+        sync_client.handle_access_token(
+            {"access_token": "USER_NEW", "access_expires_at": 2**40}
+        )
+
+    sync_client.refresh_access_token = refresh
+    client = AsyncApiClient(sync_client, max_concurrency=1)
+
+    async def main():
+        return await asyncio.gather(client.get("/a"), client.get("/b"))
+
+    # Истекший токен обновляется до запроса, причем один раз на оба
+    assert asyncio.run(main()) == [{}, {}]
+    assert refreshed == [True]
+    for call in session.request.call_args_list:
+        assert call.kwargs["headers"]["authorization"] == "Bearer USER_NEW"
+
+
+def test_forbidden_without_refresh_token_is_raised():
+    session = MagicMock()
+    session.request.return_value = _response(403, {"errors": []})
+    client = AsyncApiClient(_client(session))
+    with pytest.raises(errors.Forbidden):
+        asyncio.run(client.get("/me"))
+
+
+def _paged_tool(pages: int):
+    from hh_applicant_tool.main import HHApplicantTool
+
+    session = MagicMock()
+    session.request.side_effect = lambda method, url, **kw: _response(
+        data={"items": [kw["params"]["page"]], "pages": pages}
+    )
+    client = _client(session)
+    tool = HHApplicantTool.__new__(HHApplicantTool)
+    tool.__dict__["api_client"] = client
+    tool.__dict__["async_api_client"] = AsyncApiClient(
+        client, max_concurrency=2
+    )
+    return tool, session
+
+
+def test_pages_are_fetched_lazily_in_windows():
+    tool, session = _paged_tool(10)
+
+    negotiations = tool.get_negotiations()
+    assert [next(negotiations) for _ in range(2)] == [0, 1]
+    # Первая страница и одно окно из двух
+    assert session.request.call_count == 3
+    assert list(negotiations) == list(range(2, 10))
+
+
+def test_pages_inside_running_loop_are_fetched_sync():
+    tool, session = _paged_tool(3)
+
+    async def main():
+        return list(tool.get_negotiations())
+
+    assert asyncio.run(main()) == [0, 1, 2]
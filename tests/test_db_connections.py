@@ -0,0 +1,111 @@
+"""Тесты соединений с базой профиля."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from hh_applicant_tool.storage import ConnectionManager, StorageFacade
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ConnectionManager(tmp_path / "data", {"cache_size": -2000})
+    yield manager
+    manager.close()
+
+
+def test_pragmas_are_applied(manager):
+    conn = manager.connection
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 10_000
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2000
+
+
+def test_each_thread_gets_own_connection(manager):
+    storage = StorageFacade(manager.local)
+    storage.settings.set_value("a", "1")
+    connections = []
+
+    def work():
+        connections.append(manager.connection)
+        # Запись основного потока видна
+        storage.settings.set_value("b", storage.settings.get_value("a"))
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+
+    assert connections[0] is not manager.connection
+    assert storage.settings.get_value("b") == "1"
+    # Соединение завершившегося потока закрывается при следующем создании
+    other = threading.Thread(target=lambda: manager.connection)
+    other.start()
+    other.join()
+    assert thread not in manager._connections
+
+
+def test_read_while_writer_holds_transaction(manager):
+    storage = StorageFacade(manager.local)
+    storage.settings.set_value("a", "1")
+
+    with manager.writer() as conn:
+        conn.execute("UPDATE settings SET value = '2' WHERE key = 'a'")
+        # WAL: читатель видит последнее зафиксированное, а не ждет
+        assert storage.settings.get_value("a") == "1"
+        with manager.writer() as nested:
+            assert nested is conn
+    assert storage.settings.get_value("a") == 2
+
+    with pytest.raises(ZeroDivisionError):
+        with manager.writer() as conn:
+            conn.execute("UPDATE settings SET value = '3' WHERE key = 'a'")
+            raise ZeroDivisionError
+    assert storage.settings.get_value("a") == 2
+
+
+def test_memory_database_is_shared():
+    manager = ConnectionManager(":memory:")
+    StorageFacade(manager.local).settings.set_value("a", "1")
+    values = []
+
+    thread = threading.Thread(
+        target=lambda: values.append(
+            StorageFacade(manager.local).settings.get_value("a")
+        )
+    )
+    thread.start()
+    thread.join()
+
+    assert values == ["1"]
+
+
+def test_buffered_and_crawler_writes_use_writer(manager):
+    from hh_applicant_tool.utils.site_crawler import SiteCrawler
+
+    storage = StorageFacade(manager.local, writer=manager.writer)
+    statements, main_statements = [], []
+    with manager.writer() as writer:
+        writer.set_trace_callback(statements.append)
+    manager.connection.set_trace_callback(main_statements.append)
+
+    storage.buffer.save(
+        storage.skipped_vacancies,
+        {"resume_id": "r1", "vacancy_id": 1, "reason": "test"},
+    )
+    storage.flush()
+    crawler = SiteCrawler(None, storage.employer_sites, writer=storage.writer)
+    crawler.crawl = lambda url: {"emails": ["hr@acme.ru"]}
+    crawler.submit("1", "https://acme.ru")
+    crawler.close(5)
+
+    inserts = [s for s in statements if s.startswith("INSERT")]
+    assert len(inserts) == 2
+    assert statements.count("BEGIN IMMEDIATE") == 2
+    # Основное соединение только читает
+    assert not any(s.startswith("INSERT") for s in main_statements)
+    assert storage.skipped_vacancies.vacancy_ids("r1") == {1}
+    assert storage.employer_sites.where(employer_id="1").first().emails
@@ -0,0 +1,72 @@
+"""Тесты кеша профилей работодателей."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api.employer_cache import EmployerCache
+from hh_applicant_tool.api.errors import ResourceNotFound
+from hh_applicant_tool.storage.facade import StorageFacade
+
+PROFILE = {
+    "id": "42",
+    "name": "ACME",
+    "site_url": "acme.example",
+    "area": {"id": "1", "name": "Москва"},
+}
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:"))
+
+
+def _cache(storage: StorageFacade, client: MagicMock, **kwargs) -> EmployerCache:
+    return EmployerCache(
+        client, storage.employers, storage.hidden_employers, **kwargs
+    )
+
+
+def test_profile_is_saved_and_reused_by_next_run(storage):
+    client = MagicMock()
+    client.get.return_value = PROFILE
+
+    assert _cache(storage, client).get("42") == PROFILE
+    client.get.reset_mock()
+
+    # Новый экземпляр — как при следующем запуске по крону
+    profile = _cache(storage, client).get(42)
+
+    client.get.assert_not_called()
+    assert profile["name"] == "ACME"
+    assert profile["site_url"] == "acme.example"
+
+
+def test_expired_profile_is_refetched(storage):
+    client = MagicMock()
+    client.get.return_value = PROFILE
+    _cache(storage, client).get("42")
+
+    _cache(storage, client, ttl=timedelta(0)).get("42")
+
+    assert client.get.call_count == 2
+
+
+def test_hidden_employer_is_remembered(storage):
+    client = MagicMock()
+    response = MagicMock(status_code=404)
+    client.get.side_effect = ResourceNotFound(response, {})
+
+    assert _cache(storage, client).get("7") is None
+    assert _cache(storage, client).get("7") is None
+
+    client.get.assert_called_once_with("/employers/7")
+    assert storage.hidden_employers.get(7).status_code == 404
+
+    # После hidden_ttl пробуем снова
+    _cache(storage, client, hidden_ttl=timedelta(0)).get("7")
+    assert client.get.call_count == 2
@@ -0,0 +1,109 @@
+"""Тесты фильтра исключения вакансий."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.utils.exclusion import ExclusionFilter, ExclusionRule
+
+VACANCY = {
+    "id": "1",
+    "name": "Python Developer",
+    "employer": {"name": "ООО Ёлка"},
+    "snippet": {
+        "requirement": "Опыт с <highlighttext>Python</highlighttext>",
+        "responsibility": "Работа в  дружном\nколлективе",
+    },
+}
+
+
+def test_reports_matched_rule_and_field():
+    engine = ExclusionFilter(
+        [
+            ExclusionRule("junior|стажер", name="junior"),
+            ExclusionRule(r"дружн\w+ коллектив", ("snippet",), "team"),
+            ExclusionRule.from_config(
+                {"keywords": ["ООО Елка"], "fields": ["employer"]}, 3
+            ),
+        ]
+    )
+
+    match = engine.match(VACANCY)
+
+    assert match.rule == "team"
+    assert match.field == "snippet"
+    assert match.text == "дружном коллектив"
+    assert engine.match(
+        VACANCY | {"snippet": {}}
+    ) == ("rule3", "employer", "ооо елка")
+
+
+def test_description_is_loaded_only_when_needed():
+    description = MagicMock(return_value="Работаем в OPEN SPACE")
+    engine = ExclusionFilter([ExclusionRule(r"open\s*space")])
+
+    # Без загрузчика описание не проверяется
+    assert engine.match(VACANCY) is None
+    assert engine.match(VACANCY, description).field == "description"
+    description.assert_called_once()
+
+    engine = ExclusionFilter([ExclusionRule("developer", ("name",))])
+    assert engine.match(VACANCY, description).field == "name"
+    assert not engine.needs_description
+    description.assert_called_once()
+
+
+def test_rule_with_own_groups_and_unknown_field():
+    engine = ExclusionFilter(
+        [ExclusionRule("nothing"), ExclusionRule(r"(?P<lang>python)", name="py")]
+    )
+    assert engine.match(VACANCY).rule == "py"
+
+    with pytest.raises(ValueError):
+        ExclusionRule.from_config({"pattern": "x", "fields": ["salary"]}, 1)
+
+
+def test_operation_compiles_filter_once():
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.vacancy_details.get.return_value.description = "без совпадений"
+    op.excluded_filter = "bitrix|php"
+    op.exclusion_rules = [ExclusionRule("ёлка", ("employer",), "tree")]
+
+    assert op._match_exclusion(VACANCY).rule == "tree"
+    assert not op._is_excluded(VACANCY | {"employer": {}})
+    assert op._is_excluded(VACANCY | {"name": "PHP Developer"})
+    assert op._exclusion_filter is op._exclusion_filter
+
+
+def test_rules_that_cannot_be_merged_are_compiled_separately():
+    engine = ExclusionFilter(
+        [
+            ExclusionRule("(?i)senior|lead", name="flags"),
+            ExclusionRule(r"(py)\1", name="backref"),
+            ExclusionRule(r"(?P<lang>java)", name="java"),
+            ExclusionRule(r"(?P<lang>python)", name="python"),
+        ]
+    )
+
+    assert engine.match({"name": "Team Lead"}).rule == "flags"
+    assert engine.match({"name": "pypy"}).rule == "backref"
+    assert engine.match({"name": "Java"}).rule == "java"
+    assert engine.match({"name": "Python"}).rule == "python"
+    assert engine.match({"name": "Go"}) is None
+
+
+def test_invalid_rule_is_reported_before_search():
+    with pytest.raises(ValueError, match="broken"):
+        ExclusionRule.from_config({"pattern": "(", "name": "broken"}, 1)
+    with pytest.raises(ValueError, match="--excluded-filter"):
+        ExclusionFilter([ExclusionRule("[a-", name="--excluded-filter")])
+
+    op = Operation()
+    tool = MagicMock()
+    tool.config = {"exclusion_rules": [{"pattern": "(?<bad"}]}
+    assert op.run(tool, MagicMock(excluded_filter=None)) == 1
+    tool.api_client.get.assert_not_called()
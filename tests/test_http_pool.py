@@ -0,0 +1,86 @@
+"""Тесты пулов соединений: отдельные адаптеры, счетчики и закрытие простоя."""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from hh_applicant_tool.utils.http import (
+    HH_POOL_PREFIXES,
+    PooledHTTPAdapter,
+    setup_session_pools,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_hh_hosts_get_own_adapters():
+    session = requests.Session()
+    pooled = setup_session_pools(session, {}, HH_POOL_PREFIXES)
+    api = session.get_adapter("https://api.hh.ru/me")
+    web = session.get_adapter("https://hh.ru/vacancy/1")
+    other = session.get_adapter("https://example.com/")
+    assert api is pooled.adapters["api"]
+    assert web is pooled.adapters["web"]
+    assert other is pooled.adapters["default"]
+    assert len({id(api), id(web), id(other)}) == 3
+
+
+def test_config_overrides_per_adapter():
+    session = requests.Session()
+    pooled = setup_session_pools(
+        session,
+        {"pool_maxsize": 4, "api": {"pool_maxsize": 16}},
+        HH_POOL_PREFIXES,
+    )
+    assert pooled.adapters["api"]._pool_maxsize == 16
+    assert pooled.adapters["web"]._pool_maxsize == 4
+
+
+def test_counts_reused_connections(server_url):
+    session = requests.Session()
+    adapter = PooledHTTPAdapter()
+    session.mount("http://", adapter)
+    for _ in range(3):
+        session.get(server_url).close()
+    assert adapter.stats.requests == 3
+    assert adapter.stats.new_connections == 1
+    assert adapter.stats.reused_connections == 2
+    assert adapter.stats.tls_handshakes == 0
+
+
+def test_reaps_idle_pools(server_url):
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(idle_timeout=0.0)
+    session.mount("http://", adapter)
+    session.get(server_url).close()
+    assert adapter.reap_idle(force=True) == 1
+    assert not list(adapter.poolmanager.pools.keys())
+    # После закрытия пула соединение создается заново
+    session.get(server_url).close()
+    assert adapter.stats.new_connections == 2
@@ -0,0 +1,91 @@
+"""Тесты преобразований моделей хранилища."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from hh_applicant_tool.storage.models.base import BaseModel, mapped
+from hh_applicant_tool.storage.models.contacts import VacancyContactsModel
+from hh_applicant_tool.storage.models.setting import SettingModel
+
+
+class CompanyModel(BaseModel):
+    id: int
+    name: str = mapped(transform="normalize")
+    city_id: int = mapped(path="location.city.id", default=None)
+    city: str = mapped(path="location.city.name", default=None)
+    token: str = mapped(skip_src=True, default="local")
+    founded_at: datetime = None
+    tags: list[str] = mapped(store_json=True, default_factory=list)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip()
+
+
+def test_from_api_follows_paths_and_coerces():
+    c = CompanyModel.from_api(
+        {
+            "id": "42",
+            "name": " ACME ",
+            "location": {"city": {"id": "1"}},
+            "token": "remote",
+            "founded_at": "2026-01-09T04:12:00+0300",
+        }
+    )
+
+    assert c == CompanyModel(
+        id=42,
+        name="ACME",
+        city_id=1,
+        founded_at=datetime.fromisoformat("2026-01-09T04:12:00+03:00"),
+    )
+    # Нет промежуточного ключа — поле берет значение по умолчанию, нет
+    # последнего — None
+    assert CompanyModel.from_api({"id": 1, "name": "x"}).city_id is None
+    assert CompanyModel.from_api(
+        {"id": 1, "name": "x", "location": {"city": {}}, "founded_at": 1}
+    ) == CompanyModel(id=1, name="x", founded_at=1)
+    assert CompanyModel.from_api({"id": "x", "name": "y"}).id == "x"
+
+
+def test_db_round_trip_without_deep_copy():
+    c = CompanyModel(id=1, name="ACME", tags=["a"])
+
+    row = c.to_db()
+
+    assert row == {
+        "id": 1,
+        "name": "ACME",
+        "city_id": None,
+        "city": None,
+        "token": "local",
+        "founded_at": None,
+        "tags": '["a"]',
+    }
+    assert CompanyModel.from_db(row) == c
+    assert SettingModel.from_db({"key": "k", "value": "[1]"}).value == [1]
+
+
+def test_models_use_slots():
+    contact = VacancyContactsModel.from_api(
+        {"id": "5", "name": "Dev", "contacts": {"email": "hr@acme.ru"}}
+    )
+
+    assert contact.vacancy_id == 5
+    assert not hasattr(contact, "__dict__")
+    with pytest.raises(AttributeError):
+        contact.unknown = 1
+
+
+def test_optional_fields_are_coerced():
+    class Stamped(BaseModel):
+        id: int | None = None
+        at: datetime | None = None
+
+    row = Stamped.from_db({"id": "3", "at": "2026-01-09 04:12:00"})
+
+    assert row == Stamped(id=3, at=datetime(2026, 1, 9, 4, 12))
+    assert Stamped.from_db({"id": None, "at": None}) == Stamped()
@@ -0,0 +1,99 @@
+"""Тесты инкрементальной синхронизации откликов."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api.negotiations_sync import NegotiationsSync
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+
+
+def _negotiation(i: int, updated_at: str, resume_id: str = "r1") -> dict:
+    return {
+        "id": str(i),
+        "chat_id": i,
+        "state": {"id": "response"},
+        "updated_at": updated_at,
+        "resume": {"id": resume_id},
+        "vacancy": {"id": str(100 + i), "employer": {"id": "1"}},
+    }
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:", check_same_thread=False))
+
+
+def _pages(*pages: list[dict]) -> MagicMock:
+    client = MagicMock()
+    client.get.side_effect = lambda endpoint, page, **kw: {
+        "items": pages[page],
+        "pages": len(pages),
+    }
+    return client
+
+
+def test_first_sync_reads_all_pages(storage):
+    client = _pages(
+        [_negotiation(1, "2026-10-03T10:00:00+0300")],
+        [_negotiation(2, "2026-10-02T10:00:00+0300")],
+    )
+    sync = NegotiationsSync(client, storage.negotiations, storage.settings)
+
+    assert sync.sync("all") == 2
+    assert client.get.call_count == 2
+    assert client.get.call_args.kwargs["order_by"] == "updated_at"
+    assert (
+        storage.settings.get_value("negotiations_synced_at.all")
+        == "2026-10-03T10:00:00+0300"
+    )
+    assert storage.negotiations.vacancy_ids("r1") == {101, 102}
+
+
+def test_sync_stops_at_watermark(storage):
+    storage.settings.set_value(
+        "negotiations_synced_at.all", "2026-10-02T10:00:00+0300"
+    )
+    client = _pages(
+        [
+            _negotiation(3, "2026-10-04T10:00:00+0300"),
+            _negotiation(2, "2026-10-01T10:00:00+0300"),
+        ],
+        [_negotiation(1, "2026-09-01T10:00:00+0300")],
+    )
+    sync = NegotiationsSync(client, storage.negotiations, storage.settings)
+
+    assert sync.sync("all") == 1
+    # Вторую страницу не запрашиваем
+    client.get.assert_called_once()
+    assert storage.negotiations.vacancy_ids("r1") == {103}
+    assert (
+        storage.settings.get_value("negotiations_synced_at.all")
+        == "2026-10-04T10:00:00+0300"
+    )
+    # Отметка своя у каждого статуса
+    assert storage.settings.get_value("negotiations_synced_at.active") is None
+
+
+def test_applied_vacancy_is_filtered_without_network(storage):
+    storage.negotiations.save(_negotiation(1, "2026-10-03T10:00:00+0300"))
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.storage = storage
+    run = MagicMock(resume={"id": "r1"})
+
+    vacancy = {
+        "id": "101",
+        "name": "Dev",
+        "area": {"id": "1", "name": "Москва"},
+        "alternate_url": "u",
+        "relations": [],
+    }
+    assert op._filter_vacancy(run, vacancy) is None
+    assert op._is_vacancy_already_applied(vacancy, "r1")
+    assert not op._is_vacancy_already_applied(vacancy, "r2")
+    op.tool.api_client.get.assert_not_called()
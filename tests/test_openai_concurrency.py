@@ -0,0 +1,98 @@
+"""Тесты параллельных запросов ChatOpenAI."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from hh_applicant_tool.ai.openai import ChatOpenAI
+
+
+class _Response:
+    def __init__(self, status_code: int = 200, headers: dict | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+
+def _client(post, **kwargs) -> ChatOpenAI:
+    session = MagicMock()
+    session.post.side_effect = post
+    return ChatOpenAI(
+        api_key="key",
+        base_url="https://example.test/v1/chat/completions",
+        session=session,
+        **kwargs,
+    )
+
+
+def _run_threads(client: ChatOpenAI, n: int, stagger: float = 0.0) -> None:
+    threads = [
+        threading.Thread(target=client.complete, args=(f"q{i}",))
+        for i in range(n)
+    ]
+    for t in threads:
+        t.start()
+        time.sleep(stagger)
+    for t in threads:
+        t.join()
+
+
+def test_requests_run_in_parallel_up_to_limit():
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    def post(*args, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.1)
+        with lock:
+            in_flight[0] -= 1
+        return _Response()
+
+    started = time.monotonic()
+    _run_threads(_client(post, rate_limit=0, max_concurrency=3), 6)
+
+    assert peak[0] == 3
+    assert time.monotonic() - started < 0.35
+
+
+def test_rate_limit_spaces_request_starts():
+    starts = []
+
+    def post(*args, **kwargs):
+        starts.append(time.monotonic())
+        time.sleep(0.2)
+        return _Response()
+
+    # 600 в минуту — не чаще раза в 0.1 с, но ответа ждут параллельно
+    _run_threads(_client(post, rate_limit=600, max_concurrency=4), 3)
+
+    starts.sort()
+    assert all(b - a >= 0.09 for a, b in zip(starts[:-1], starts[1:], strict=True))
+    assert starts[-1] - starts[0] < 0.3
+
+
+def test_retry_after_pauses_all_threads():
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return _Response(429, {"Retry-After": "0.3"})
+        return _Response()
+
+    client = _client(post, rate_limit=600, max_concurrency=4)
+    started = time.monotonic()
+    _run_threads(client, 2, stagger=0.05)
+
+    # Второй поток тоже дождался конца паузы после 429
+    assert len(calls) == 3
+    assert min(calls[1:]) - started >= 0.3
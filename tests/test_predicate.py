@@ -0,0 +1,103 @@
+"""Тесты условий на вакансии (--where)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api.reference import ReferenceItem
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.utils.predicate import (
+    PredicateContext,
+    PredicateError,
+    compile_predicate,
+)
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+CTX = PredicateContext(
+    {"RUR": 1.0, "USD": 0.01},
+    {"2019": "1", "1": "113"},
+    NOW,
+)
+
+
+def vacancy(**kwargs):
+    return {
+        "id": "1",
+        "salary": {"from": 150000, "to": None, "currency": "RUR"},
+        "experience": {"id": "between1And3"},
+        "employer": {"id": "1740"},
+        "schedule": {"id": "remote"},
+        "work_format": [{"id": "REMOTE"}, {"id": "HYBRID"}],
+        "area": {"id": "2019"},
+        "published_at": "2026-09-28T12:00:00+0300",
+        "contacts": None,
+    } | kwargs
+
+
+def check(source, v=None):
+    return compile_predicate(source, CTX)(v or vacancy())
+
+
+def test_comparisons_and_lists():
+    assert check("salary >= 150000 and salary < 200000")
+    assert check("experience in (between1And3, between3And6)")
+    assert not check("employer not in (1740, 3529)")
+    assert check("work_format == HYBRID and schedule != office")
+    assert check("age <= 3 and not age < 2")
+    assert not check("has_contacts or has_test")
+    assert check("not (has_contacts) and (employer == 1 or has_salary)")
+
+
+def test_salary_is_normalized_to_rubles():
+    usd = vacancy(salary={"from": 1000, "to": 3000, "currency": "USD"})
+    assert check("salary == 300000", usd)
+    assert check("salary_from >= 1000 USD and salary_to <= 3000 USD", usd)
+    # Без зарплаты сравнения не проходят
+    assert not check("salary < 1", vacancy(salary=None))
+    assert not check("salary_to > 0")
+
+
+def test_area_matches_nested_regions():
+    assert check("area in (1)")
+    assert check("area == 113")
+    assert not check("area in (2)")
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["salary >=", "foo == 1", "salary in (1)", "age == 1 1", "(has_test", "$"],
+)
+def test_syntax_errors(source):
+    with pytest.raises(PredicateError):
+        compile_predicate(source)
+
+
+def test_operation_filters_pages_before_enrich():
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.reference.dictionaries.return_value = {
+        "currency": [{"code": "RUR", "rate": 1}, {"code": "EUR", "rate": 0.01}]
+    }
+    op.tool.reference.areas.return_value = [ReferenceItem("1", None, "М", 0)]
+    op.vacancy_where = "salary >= 1600 EUR and area in (1)"
+
+    cheap = vacancy(area={"id": "1"})
+    rich = vacancy(salary={"from": 200000, "currency": "RUR"}, area={"id": "1"})
+    assert op._select_vacancies([cheap, rich]) == [rich]
+    assert op._vacancy_predicate is op._vacancy_predicate
+    op.tool.reference.dictionaries.assert_called_once()
+
+    op = Operation()
+    assert op._select_vacancies([cheap]) == [cheap]
+
+
+def test_operation_reports_bad_where_before_search(caplog):
+    tool = MagicMock()
+    tool.config = {"vacancy_where": "salary >="}
+
+    assert Operation().run(tool, MagicMock(excluded_filter=None, where=None)) == 1
+    assert "vacancy_where" in caplog.text
+    tool.api_client.get.assert_not_called()
@@ -0,0 +1,90 @@
+"""Тесты загрузки страниц поиска впрок."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.utils.prefetch import prefetch_pages
+
+
+def _pages(total: int, per_page: int = 2):
+    started: dict[int, threading.Event] = {
+        n: threading.Event() for n in range(total + 5)
+    }
+    calls: list[int] = []
+
+    def fetch(page: int) -> dict:
+        calls.append(page)
+        started[page].set()
+        items = (
+            [f"{page}-{i}" for i in range(per_page)] if page < total else []
+        )
+        return {"items": items, "pages": total, "found": total * per_page}
+
+    return fetch, started, calls
+
+
+def test_yields_pages_in_order_and_stops_at_last():
+    fetch, _, calls = _pages(4)
+
+    pages = list(prefetch_pages(fetch, 20, lookahead=2))
+
+    assert [p["items"][0] for p in pages] == ["0-0", "1-0", "2-0", "3-0"]
+    assert sorted(calls) == [0, 1, 2, 3]
+
+
+def test_next_page_is_requested_while_current_is_processed():
+    fetch, started, _ = _pages(5)
+    it = prefetch_pages(fetch, 5, lookahead=1)
+
+    next(it)
+    next(it)
+    # Потребитель еще занят страницей 1, а страница 2 уже загружается
+    assert started[2].wait(1)
+    it.close()
+
+
+def test_closing_stops_prefetch():
+    fetch, _, calls = _pages(10)
+
+    for page in prefetch_pages(fetch, 10, lookahead=2):
+        if page["items"][0] == "1-0":
+            break
+    time.sleep(0.05)
+
+    # Страницы 0 и 1 и не больше двух впрок
+    assert max(calls) <= 3
+
+
+def test_cancel_event_stops_iteration():
+    fetch, _, _ = _pages(10)
+    cancel = threading.Event()
+    seen = []
+
+    for page in prefetch_pages(fetch, 10, lookahead=2, cancel_event=cancel):
+        seen.append(page)
+        cancel.set()
+
+    assert len(seen) == 1
+
+
+def test_get_vacancies_uses_prefetch():
+    fetch, _, _ = _pages(3)
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.api_client.get.side_effect = lambda endpoint, params: fetch(
+        params["page"]
+    )
+    op._get_search_params = lambda page: {"page": page}
+    op.search = None
+    op.total_pages = 10
+    op.prefetch_pages = 2
+
+    items = list(op._get_vacancies(resume_id="r1"))
+
+    assert items == ["0-0", "0-1", "1-0", "1-1", "2-0", "2-1"]
+    endpoint = op.tool.api_client.get.call_args.args[0]
+    assert endpoint == "/resumes/r1/similar_vacancies"
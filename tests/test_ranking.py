@@ -0,0 +1,96 @@
+"""Тесты очереди откликов по оценке вакансий."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+from hh_applicant_tool.utils.ranking import VacancyRanker
+
+NOW = datetime(2026, 10, 17, tzinfo=timezone.utc)
+
+
+def _vacancy(i: int, **kwargs) -> dict:
+    return {
+        "id": str(i),
+        "name": f"Vacancy {i}",
+        "published_at": "2026-10-16T10:00:00+0300",
+        "employer": {"id": str(i)},
+        **kwargs,
+    }
+
+
+def test_features():
+    ranker = VacancyRanker(
+        expected_salary={"amount": 200_000, "currency": "RUR"},
+        employer_stats={"1": (4, 3), "2": (4, 0)},
+        now=NOW,
+    )
+
+    fresh = ranker.freshness(_vacancy(1))
+    old = ranker.freshness(_vacancy(1, published_at="2026-09-01T10:00:00+0300"))
+    assert 0 < old < fresh <= 1
+
+    assert ranker.salary(
+        _vacancy(1, salary={"from": 300_000, "currency": "RUR"})
+    ) == 1.0
+    assert ranker.salary(
+        _vacancy(1, salary={"to": 100_000, "currency": "RUR"})
+    ) < 0.5
+    # Другая валюта или нет зарплаты — нейтрально
+    assert ranker.salary(_vacancy(1, salary={"from": 1, "currency": "USD"})) == 0.5
+    assert ranker.salary(_vacancy(1)) == 0.5
+
+    assert ranker.employer(_vacancy(1)) > 0.5 > ranker.employer(_vacancy(2))
+    assert ranker.employer(_vacancy(3)) == 0.5
+
+
+def test_rank_is_best_first_and_stable():
+    ranker = VacancyRanker(
+        weights={"salary": 1.0},
+        expected_salary={"amount": 100, "currency": "RUR"},
+        now=NOW,
+    )
+    vacancies = [
+        _vacancy(1),
+        _vacancy(2, salary={"from": 150, "currency": "RUR"}),
+        _vacancy(3),
+        _vacancy(4, salary={"from": 10, "currency": "RUR"}),
+    ]
+
+    assert [v["id"] for v in ranker.rank(vacancies)] == ["2", "1", "3", "4"]
+
+
+def test_first_pages_are_ranked_rest_keep_order():
+    storage = StorageFacade(sqlite3.connect(":memory:"))
+    for i, state in enumerate(["invitation", "interview", "response"]):
+        storage.negotiations.save(
+            {
+                "id": i,
+                "chat_id": i,
+                "state": {"id": state},
+                "resume": {"id": "r1"},
+                "vacancy": {"id": 100 + i, "employer": {"id": "7"}},
+            }
+        )
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.storage = storage
+    op.rank_pages = 1
+    op.per_page = 3
+    op.rank_weights = {"employer": 1.0}
+    op._analyze_resume_light = lambda resume: "Python"
+
+    vacancies = [
+        _vacancy(1, employer={"id": "8"}),
+        _vacancy(2, employer={"id": "7"}),
+        _vacancy(3, employer={"id": "9"}),
+        _vacancy(4, employer={"id": "7"}),
+        _vacancy(5, employer={"id": "8"}),
+    ]
+    ranked = op._rank_vacancies({"id": "r1"}, iter(vacancies))
+
+    assert [v["id"] for v in ranked] == ["2", "1", "3", "4", "5"]
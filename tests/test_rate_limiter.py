@@ -0,0 +1,152 @@
+"""Тесты ограничителя частоты запросов к API HH."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api import errors
+from hh_applicant_tool.api.client import ApiClient
+from hh_applicant_tool.api.rate_limiter import (
+    AdaptiveRateLimiter,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+def _response(status_code: int, text: str = "{}", data=None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.json.return_value = {} if data is None else data
+    return response
+
+
+class TestTokenBucket:
+    def test_burst_does_not_wait(self):
+        bucket = TokenBucket(1.0, burst=3)
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_waits_when_empty(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(
+            "hh_applicant_tool.api.rate_limiter.time.sleep", sleeps.append
+        )
+        bucket = TokenBucket(2.0)
+        bucket.acquire()
+        bucket.acquire()
+        assert sleeps and sleeps[0] == pytest.approx(0.5, abs=0.05)
+
+    def test_min_interval_is_respected(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(
+            "hh_applicant_tool.api.rate_limiter.time.sleep", sleeps.append
+        )
+        bucket = TokenBucket(100.0, burst=10)
+        bucket.acquire()
+        bucket.acquire(2.0)
+        assert sleeps[0] == pytest.approx(2.0, abs=0.05)
+
+
+def test_acquire_async_defaults_to_acquire():
+    class Limiter(RateLimiter):
+        def acquire(self, min_interval=None):
+            calls.append(min_interval)
+            return 0.5
+
+    calls = []
+    assert asyncio.run(Limiter().acquire_async(2.0)) == 0.5
+    assert calls == [2.0]
+
+
+class TestAdaptiveRateLimiter:
+    def test_increases_rate_on_success(self):
+        limiter = AdaptiveRateLimiter(1.0)
+        for _ in range(100):
+            limiter.record_success()
+        assert limiter.rate == limiter.max_rate == 2.0
+
+    def test_decreases_rate_on_throttle(self):
+        limiter = AdaptiveRateLimiter(1.0)
+        limiter.record_throttle()
+        assert limiter.rate == 0.5
+        for _ in range(10):
+            limiter.record_throttle()
+        assert limiter.rate == limiter.min_rate == 0.125
+
+    def test_reset_moves_bounds(self):
+        limiter = AdaptiveRateLimiter(1.0)
+        limiter.reset(4.0)
+        assert limiter.rate == 4.0
+        assert limiter.max_rate == 8.0
+
+    def test_reset_keeps_configured_bounds(self):
+        limiter = AdaptiveRateLimiter(1.0, min_rate=0.5, max_rate=3.0)
+        limiter.reset(4.0)
+        assert limiter.rate == 3.0
+        assert (limiter.min_rate, limiter.max_rate) == (0.5, 3.0)
+        assert limiter.increase == 0.2
+        limiter.reset(0.1)
+        assert limiter.rate == 0.5
+
+
+class TestClientFeedback:
+    def _client(self, response: MagicMock) -> ApiClient:
+        session = MagicMock()
+        session.request.return_value = response
+        limiter = MagicMock()
+        return ApiClient(session=session, limiter=limiter)
+
+    def test_success_is_recorded(self):
+        client = self._client(_response(200))
+        client.get("/me")
+        client.limiter.acquire.assert_called_once_with(None)
+        client.limiter.record_success.assert_called_once()
+
+    def test_captcha_is_throttle(self):
+        data = {"errors": [{"type": "x", "value": "captcha_required"}]}
+        client = self._client(_response(403, data=data))
+        with pytest.raises(errors.CaptchaRequired):
+            client.get("/vacancies")
+        client.limiter.record_throttle.assert_called_once()
+
+    def test_server_error_is_throttle(self):
+        client = self._client(_response(503, data={"errors": []}))
+        with pytest.raises(errors.InternalServerError):
+            client.get("/vacancies")
+        client.limiter.record_throttle.assert_called_once()
+
+    def test_requests_overlap_in_flight(self):
+        # Второй запрос должен уйти, пока первый еще не вернулся
+        started = threading.Barrier(2, timeout=2)
+
+        def request(*args, **kwargs):
+            started.wait()
+            return _response(200)
+
+        session = MagicMock()
+        session.request.side_effect = request
+        client = ApiClient(session=session, limiter=TokenBucket(1000, burst=2))
+        threads = [
+            threading.Thread(target=client.get, args=("/me",))
+            for _ in range(2)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(3)
+        assert session.request.call_count == 2
+        assert not started.broken
+
+    def test_set_delay_rejects_non_positive(self):
+        client = ApiClient(session=MagicMock())
+        rate = client.limiter.rate
+        for delay in (0, -1):
+            with pytest.raises(ValueError):
+                client.set_delay(delay)
+        assert client.limiter.rate == rate
+        client.set_delay(1.0)
+        assert client.limiter.rate == pytest.approx(1.0)
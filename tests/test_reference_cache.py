@@ -0,0 +1,102 @@
+"""Тесты кеша справочников API."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api import errors
+from hh_applicant_tool.api.reference import ReferenceCache
+from hh_applicant_tool.storage.facade import StorageFacade
+
+AREAS = [
+    {
+        "id": "113",
+        "name": "Россия",
+        "areas": [
+            {
+                "id": "2019",
+                "name": "Московская область",
+                "areas": [{"id": "2034", "name": "Химки", "areas": []}],
+            },
+        ],
+    },
+]
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:"))
+
+
+def _cache(storage: StorageFacade, client: MagicMock) -> ReferenceCache:
+    return ReferenceCache(client, storage.references)
+
+
+def test_fetches_and_flattens_tree(storage):
+    client = MagicMock()
+    client.get_conditional.return_value = (AREAS, {"ETag": '"v1"'})
+
+    areas = _cache(storage, client).areas()
+
+    assert [(a.id, a.parent_id, a.depth) for a in areas] == [
+        ("113", None, 0),
+        ("2019", "113", 1),
+        ("2034", "2019", 2),
+    ]
+    saved = storage.references.get("/areas")
+    assert saved.etag == '"v1"'
+    assert saved.fetched_at is not None
+
+
+def test_fresh_copy_is_served_without_requests(storage):
+    client = MagicMock()
+    client.get_conditional.return_value = (AREAS, {})
+    _cache(storage, client).areas()
+    client.get_conditional.reset_mock()
+
+    # Новый экземпляр — как при следующем запуске
+    assert len(_cache(storage, client).areas()) == 3
+    client.get_conditional.assert_not_called()
+
+
+def test_not_modified_extends_stored_copy(storage):
+    client = MagicMock()
+    client.get_conditional.return_value = (AREAS, {"ETag": '"v1"'})
+    _cache(storage, client).areas()
+    stale = storage.references.get("/areas")
+    stale.fetched_at = datetime.now() - timedelta(days=30)
+    storage.references.save(stale)
+
+    client.get_conditional.return_value = (None, {})
+    areas = _cache(storage, client).areas()
+
+    assert client.get_conditional.call_args.kwargs["etag"] == '"v1"'
+    assert len(areas) == 3
+    saved = storage.references.get("/areas")
+    assert saved.etag == '"v1"'
+    assert datetime.now() - saved.fetched_at < timedelta(minutes=1)
+
+
+def test_stale_copy_is_used_on_api_error(storage):
+    client = MagicMock()
+    client.get_conditional.return_value = (AREAS, {})
+    cache = ReferenceCache(client, storage.references, ttl=timedelta(0))
+    cache.areas()
+
+    client.get_conditional.side_effect = errors.ApiError(MagicMock(), {})
+    cache = ReferenceCache(client, storage.references, ttl=timedelta(0))
+    assert len(cache.areas()) == 3
+
+
+def test_area_index_builds_full_path(storage):
+    client = MagicMock()
+    client.get_conditional.return_value = (AREAS, {})
+
+    index = _cache(storage, client).area_index()
+
+    assert index["2034"].name == "Химки"
+    assert index["2034"].path == "Россия / Московская область / Химки"
@@ -0,0 +1,110 @@
+"""Тесты локальной оценки близости вакансий к резюме."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from hh_applicant_tool.operations.apply_vacancies import Operation, _ApplyTask
+from hh_applicant_tool.storage.facade import StorageFacade
+from hh_applicant_tool.utils.relevance import RelevanceScorer, tokenize
+
+RESUME = "Должность: Python разработчик\nНавыки: Python, Django, PostgreSQL"
+
+
+def _vacancy(i: int, name: str, requirement: str = "") -> dict:
+    return {
+        "id": str(i),
+        "name": name,
+        "alternate_url": f"https://hh.ru/vacancy/{i}",
+        "snippet": {"requirement": requirement},
+    }
+
+
+def test_tokenize_keeps_tech_names_and_stems_russian():
+    assert tokenize("Разработчик C++, C#, Node.js") == [
+        "разраб",
+        "c++",
+        "c#",
+        "node.js",
+    ]
+    assert tokenize("разработка и опыт работы") == ["разраб"]
+
+
+def test_similar_text_scores_higher():
+    scorer = RelevanceScorer(RESUME)
+    scorer.add_documents(
+        [
+            "Python developer Django",
+            "Бухгалтер 1С",
+            "Python аналитик данных",
+        ]
+    )
+
+    backend = scorer.score("Python разработчик Django PostgreSQL")
+    analyst = scorer.score("Python аналитик данных")
+    accountant = scorer.score("Бухгалтер 1С")
+
+    assert backend > analyst > accountant == 0.0
+    assert backend <= 1.0
+
+
+def test_page_is_scored_in_milliseconds():
+    scorer = RelevanceScorer(RESUME * 20)
+    page = [
+        f"Вакансия {i} Python Django разработчик сервисов и API, "
+        "опыт с PostgreSQL, Redis, Docker, Kubernetes" * 3
+        for i in range(100)
+    ]
+
+    started = time.perf_counter()
+    scorer.add_documents(page)
+    for text in page:
+        scorer.score(text)
+
+    assert time.perf_counter() - started < 0.1
+
+
+def test_only_middle_band_reaches_ai():
+    op = Operation()
+    op.tool = MagicMock()
+    op.ai_filter = "light"
+    op.ai_prefilter_reject = 0.05
+    op.ai_prefilter_accept = 0.6
+    op.vacancy_filter_ai = MagicMock(system_prompt="resume")
+    op.vacancy_filter_ai.complete.return_value = '{"suitable": true}'
+    op.tool.vacancy_details.cached.return_value = None
+    op._relevance_scorers["r1"] = RelevanceScorer(RESUME)
+    run = SimpleNamespace(resume={"id": "r1"})
+    op.tool.storage.ai_verdicts.get_verdict.return_value = None
+
+    tasks = [
+        _ApplyTask(vacancy=v, placeholders={})
+        for v in (
+            _vacancy(1, "Бухгалтер", "1С, отчетность"),
+            _vacancy(2, "Python разработчик", "Django, PostgreSQL"),
+            _vacancy(3, "Python аналитик", "SQL, Excel"),
+        )
+    ]
+    for task in tasks:
+        op._judge_vacancy(run, task)
+
+    assert [t.skip_reason for t in tasks] == ["low_relevance", None, None]
+    op.vacancy_filter_ai.complete.assert_called_once()
+    # Полная вакансия нужна только AI, а не локальной оценке
+    op.tool.vacancy_details.get.assert_called_once()
+    assert "аналитик" in op.vacancy_filter_ai.complete.call_args.args[0]
+
+
+def test_low_relevance_is_not_skipped_in_later_runs():
+    storage = StorageFacade(sqlite3.connect(":memory:"))
+    for vacancy_id, reason in ((1, "low_relevance"), (2, "blocked")):
+        storage.skipped_vacancies.save(
+            {"resume_id": "r1", "vacancy_id": vacancy_id, "reason": reason}
+        )
+
+    # Запись остается для истории, но пороги можно поменять
+    assert storage.skipped_vacancies.count(reason="low_relevance") == 1
+    assert storage.skipped_vacancies.vacancy_ids("r1") == {2}
@@ -0,0 +1,97 @@
+"""Тесты построителя запросов репозиториев."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.operations.clear_skipped import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+from hh_applicant_tool.storage.repositories.errors import RepositoryError
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    storage = StorageFacade(sqlite3.connect(":memory:"))
+    storage.skipped_vacancies.save_batch(
+        [
+            {"resume_id": "r1", "vacancy_id": i, "reason": reason}
+            for i, reason in enumerate(["blocked", "ai_rejected"] * 5, 1)
+        ]
+    )
+    return storage
+
+
+def test_where_streams_newest_first(storage):
+    repo = storage.skipped_vacancies
+    query = repo.where(reason="blocked")
+    statements = []
+    repo.conn.set_trace_callback(statements.append)
+
+    assert [v.vacancy_id for v in query.limit(2)] == [9, 7]
+    assert [v.vacancy_id for v in query.where(vacancy_id__gt=4)] == [9, 7, 5]
+    assert [v.vacancy_id for v in repo.find(vacancy_id__in=[2, 3])] == [3, 2]
+    assert list(repo.only("vacancy_id").where(vacancy_id=1)) == [
+        {"vacancy_id": 1}
+    ]
+    assert repo.where(vacancy_id=100).first() is None
+    assert statements[0].endswith("ORDER BY rowid DESC LIMIT 2")
+
+
+def test_keyset_pages(storage):
+    repo = storage.skipped_vacancies
+    pages = repo.only("vacancy_id").pages(4)
+
+    first = next(pages)
+    # Между страницами курсор не держится, писать можно
+    repo.delete_where(vacancy_id__in=[5, 6])
+    rest = list(pages)
+
+    assert [r["vacancy_id"] for r in first] == [10, 9, 8, 7]
+    assert [[r["vacancy_id"] for r in p] for p in rest] == [[4, 3, 2, 1]]
+    assert [len(p) for p in repo.query().limit(5).pages(2)] == [2, 2, 1]
+
+
+def test_aggregates_and_bulk_changes(storage):
+    repo = storage.skipped_vacancies
+
+    assert repo.count() == 10
+    assert repo.count(reason="blocked") == 5
+    assert repo.where(reason="blocked").limit(2).count() == 2
+    assert repo.exists(vacancy_id=3)
+    assert not repo.exists(vacancy_id=30)
+
+    assert repo.update_where({"reason": "manual"}, vacancy_id__le=2) == 2
+    assert repo.count(reason="manual") == 2
+    assert repo.where(reason="blocked").limit(2).delete() == 2
+    assert repo.count(reason="blocked") == 2
+    assert repo.delete_where(reason="ai_rejected") == 4
+    assert repo.count_total() == 4
+
+
+def test_bad_column_is_rejected(storage):
+    with pytest.raises(ValueError):
+        storage.skipped_vacancies.where(**{"reason = 1 OR 1": 1})
+    with pytest.raises(ValueError):
+        storage.skipped_vacancies.where(reason__between=1)
+    with pytest.raises(RepositoryError):
+        list(storage.skipped_vacancies.where(missing=1))
+
+
+def test_clear_skipped_uses_bulk_delete(storage, capsys):
+    tool = MagicMock(storage=storage)
+    args = MagicMock(reason="blocked", dry_run=True)
+
+    Operation().run(tool, args)
+    assert storage.skipped_vacancies.count() == 10
+
+    args.dry_run = False
+    Operation().run(tool, args)
+    assert storage.skipped_vacancies.count(reason="blocked") == 0
+
+    args.reason = None
+    Operation().run(tool, args)
+    assert storage.skipped_vacancies.count() == 0
+    assert "Удалено 5" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+"""Тесты кеша текста резюме для AI-фильтра."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+
+RESUME = {"id": "r1", "updated_at": "2026-10-01T10:00:00+0300"}
+FULL_RESUME = {
+    "id": "r1",
+    "title": "Python developer",
+    "skill_set": ["Python", "SQL"],
+}
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:"))
+
+
+def _operation(storage: StorageFacade) -> Operation:
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.storage = storage
+    op.tool.api_client.get.return_value = FULL_RESUME
+    return op
+
+
+def test_next_run_reuses_saved_analysis(storage):
+    first = _operation(storage)
+    text = first._analyze_resume_light(RESUME)
+    assert first._analyze_resume_light(RESUME) == text
+    first.tool.api_client.get.assert_called_once_with("/resumes/r1")
+
+    second = _operation(storage)
+    assert second._analyze_resume_light(RESUME) == text
+    second.tool.api_client.get.assert_not_called()
+    # Один и тот же текст — один и тот же системный промпт
+    assert second._build_filter_system_prompt_light(
+        text
+    ) == first._build_filter_system_prompt_light(text)
+
+
+def test_changed_resume_is_analyzed_again(storage):
+    _operation(storage)._analyze_resume_heavy(RESUME)
+
+    op = _operation(storage)
+    op.tool.api_client.get.return_value = FULL_RESUME | {"title": "Go developer"}
+    text = op._analyze_resume_heavy(
+        RESUME | {"updated_at": "2026-10-05T10:00:00+0300"}
+    )
+
+    assert "Go developer" in text
+    op.tool.api_client.get.assert_called_once()
+    # Режимы хранятся отдельно
+    assert op._analyze_resume_light(RESUME | {"updated_at": "x"}) != text
+
+
+def test_resume_without_date_is_hashed_by_content(storage):
+    resume = {"id": "r1"}
+    text = _operation(storage)._analyze_resume_light(resume)
+
+    op = _operation(storage)
+    assert op._analyze_resume_light(resume) == text
+    # Полное резюме нужно для хеша, но текст не пересобирается
+    op.tool.api_client.get.assert_called_once()
+    assert storage.resume_analyses.count_total() == 1
@@ -0,0 +1,139 @@
+"""Тесты разбиения поиска на подзапросы."""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from hh_applicant_tool.api.search_shards import SearchShardPlanner, fetch_shards
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.utils.date import DATETIME_FORMAT
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+# По вакансии в час за 10 дней, поровну в двух районах
+VACANCIES = [
+    {
+        "id": str(n),
+        "area": {"id": "11" if n % 2 else "12"},
+        "published_at": (NOW - timedelta(hours=n)).strftime(DATETIME_FORMAT),
+    }
+    for n in range(240)
+]
+
+
+def _matching(params: dict) -> list[dict]:
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+    areas = params.get("area") or ["1"]
+    result = []
+    for v in VACANCIES:
+        published = datetime.strptime(v["published_at"], DATETIME_FORMAT)
+        if date_from and published < datetime.strptime(date_from, DATETIME_FORMAT):
+            continue
+        if date_to and published > datetime.strptime(date_to, DATETIME_FORMAT):
+            continue
+        if "1" not in areas and v["area"]["id"] not in areas:
+            continue
+        result.append(v)
+    return result
+
+
+def _search(params: dict, limit: int = 50) -> dict:
+    """Поиск, который, как и настоящий, отдает только первые `limit`."""
+    found = _matching(params)
+    per_page = params.get("per_page", 20)
+    start = params.get("page", 0) * per_page
+    return {
+        "items": found[:limit][start : start + per_page],
+        "found": len(found),
+        "pages": -(-min(len(found), limit) // per_page),
+    }
+
+
+def _planner(**kwargs) -> SearchShardPlanner:
+    return SearchShardPlanner(
+        lambda p: _search(p)["found"],
+        {"1": ["11", "12"]},
+        limit=50,
+        now=NOW,
+        **kwargs,
+    )
+
+
+def test_plan_splits_until_every_shard_fits():
+    shards = _planner().plan({"text": "python", "period": 10, "page": 3})
+
+    assert all(len(_matching(s)) <= 50 for s in shards)
+    assert all("period" not in s and "page" not in s for s in shards)
+    assert {v["id"] for s in shards for v in _matching(s)} == {
+        v["id"] for v in VACANCIES
+    }
+
+
+def test_plan_splits_area_when_window_is_minimal():
+    planner = _planner(min_window=timedelta(days=30))
+
+    shards = planner.plan({"area": ["1"]})
+
+    assert [s["area"] for s in shards] == [["11"], ["12"]]
+    # Списки делятся поодиночке до всего остального
+    assert _planner().plan({"area": ["11", "12"], "date_from": "2026-09-25T00:00:00+0000"})[
+        0
+    ]["area"] == ["11"]
+
+
+def test_plan_keeps_shard_when_parts_are_empty():
+    # Общий found не сходится с частями: все части пустые
+    planner = SearchShardPlanner(
+        lambda p: 100 if "date_from" not in p else 0, limit=50, now=NOW
+    )
+
+    assert planner.plan({"text": "python", "period": 10}) == [
+        {"text": "python", "period": 10}
+    ]
+
+
+def test_fetch_shards_merges_without_duplicates():
+    shards = _planner().plan({"period": 10})
+    # Повтор подзапроса дает те же вакансии
+    shards.append(shards[0])
+
+    pages = list(
+        fetch_shards(lambda s, page: _search(s | {"page": page}), shards, 20)
+    )
+
+    ids = [v["id"] for p in pages for v in p["items"]]
+    assert len(ids) == len(set(ids)) == len(VACANCIES)
+
+
+def test_fetch_shards_stops_when_consumer_leaves():
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(shard, page):
+        with lock:
+            calls.append(page)
+        return {"items": [{"id": f"{shard['n']}-{page}"}], "pages": 100}
+
+    pages = fetch_shards(fetch, [{"n": n} for n in range(3)], 100, workers=2)
+    next(pages)
+    pages.close()
+    count = len(calls)
+
+    assert count < 20
+    threading.Event().wait(0.3)
+    assert len(calls) <= count + 2
+
+
+def test_operation_uses_shards():
+    op = Operation()
+    op.search = "python"
+    op.per_page = 20
+    op.total_pages = 20
+    op.shard_search = True
+    op._search = lambda resume_id, params: _search(params, limit=2000)
+    op._get_search_params = lambda page: {"period": 10, "page": page}
+
+    ids = [v["id"] for v in op._get_vacancies("r1")]
+
+    assert sorted(ids) == sorted(v["id"] for v in VACANCIES)
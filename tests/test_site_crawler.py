@@ -0,0 +1,115 @@
+"""Тесты фонового обхода сайтов работодателей."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.storage.facade import StorageFacade
+from hh_applicant_tool.utils.site_crawler import SiteCrawler, parse_site_html
+
+PAGES = {
+    "https://example.com": (
+        "<title>Пример &amp; Ко</title>"
+        '<meta name="generator" content="Bitrix">'
+        '<a href="/about/contacts/">Контакты</a>'
+        '<a href="https://other.com/contacts">Чужие</a>'
+        '<img src="slider-225x225@2x.png">'
+    ),
+    "https://example.com/about/contacts/": "Пишите: hr@example.com",
+    "https://slow.example.com": "x" * 10_000_000,
+}
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls: list[tuple[str, float]] = []
+        self.read = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout, stream):
+        assert stream
+        with self.lock:
+            self.calls.append((url, time.monotonic()))
+        body = PAGES[url].encode()
+
+        def chunks(size):
+            for start in range(0, len(body), size):
+                self.read += size
+                yield body[start : start + size]
+
+        response = MagicMock()
+        response.headers = {"Server": "nginx", "Content-Type": "text/html"}
+        response.iter_content.side_effect = chunks
+        response.raw._connection = None
+        response.__enter__.return_value = response
+        return response
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:", check_same_thread=False))
+
+
+def test_parse_site_html():
+    info = parse_site_html(PAGES["https://example.com"] + " hr@bank.ru hr@bank.ru")
+
+    assert info["title"] == "Пример & Ко"
+    assert info["generator"] == "Bitrix"
+    assert info["emails"] == ["hr@bank.ru"]
+
+
+def test_follows_contacts_and_saves_in_background(storage):
+    session = FakeSession()
+    crawler = SiteCrawler(session, storage.employer_sites, domain_delay=0)
+
+    assert crawler.cached_emails("1", "https://example.com") is None
+    crawler.submit("1", "https://example.com")
+    crawler.submit("1", "https://example.com")
+    crawler.close(5)
+
+    assert [url for url, _ in session.calls] == [
+        "https://example.com",
+        "https://example.com/about/contacts/",
+    ]
+    assert crawler.emails("1") == ["hr@example.com"]
+    saved = next(storage.employer_sites.find(employer_id="1"))
+    assert saved.emails == "hr@example.com"
+    assert saved.server_name == "nginx"
+
+    # Следующий запуск берет емейлы из базы без обхода
+    crawler = SiteCrawler(session, storage.employer_sites)
+    assert crawler.cached_emails("1", "https://example.com") == [
+        "hr@example.com"
+    ]
+
+
+def test_download_is_capped():
+    session = FakeSession()
+    crawler = SiteCrawler(session, MagicMock(), max_bytes=100_000)
+
+    info = crawler.crawl("https://slow.example.com")
+
+    assert info["emails"] == []
+    assert session.read < 200_000
+
+
+def test_one_domain_is_visited_politely(storage):
+    session = FakeSession()
+    crawler = SiteCrawler(
+        session,
+        storage.employer_sites,
+        domain_delay=0.2,
+        follow_contacts=False,
+    )
+
+    for employer_id in ("1", "2"):
+        crawler.submit(employer_id, "https://example.com")
+    crawler.close(5)
+
+    (_, first), (_, second) = session.calls
+    assert second - first >= 0.2
@@ -0,0 +1,159 @@
+"""Тесты упреждающего обновления токена и согласования между процессами."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from hh_applicant_tool.api import errors
+from hh_applicant_tool.api.client import ApiClient
+from hh_applicant_tool.api.rate_limiter import TokenBucket
+from hh_applicant_tool.api.token_broker import ConfigTokenBroker
+from hh_applicant_tool.utils import Config
+
+
+def _response() -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.text = "{}"
+    response.json.return_value = {}
+    return response
+
+
+def _client(session: MagicMock | None = None, **kwargs) -> ApiClient:
+    if session is None:
+        session = MagicMock()
+        session.request.return_value = _response()
+    kwargs.setdefault("access_token", "USER_OLD")
+    kwargs.setdefault("refresh_token", "refresh_old")
+    return ApiClient(
+        session=session, limiter=TokenBucket(1000, burst=100), **kwargs
+    )
+
+
+def _new_token(n: int = 1) -> dict:
+    return {
+        "access_token": f"USER_NEW{n}",
+        "refresh_token": f"refresh_new{n}",
+        "access_expires_at": int(time.time()) + 3600,
+    }
+
+
+def test_refreshes_before_expiry_without_failed_request():
+    session = MagicMock()
+    session.request.return_value = _response()
+    client = _client(
+        session, access_expires_at=int(time.time()) + 10, refresh_margin=60
+    )
+    client.oauth_client.refresh_access_token = MagicMock(
+        return_value=_new_token()
+    )
+
+    client.get("/me")
+
+    client.oauth_client.refresh_access_token.assert_called_once_with(
+        "refresh_old"
+    )
+    headers = session.request.call_args.kwargs["headers"]
+    assert headers["authorization"] == "Bearer USER_NEW1"
+    assert session.request.call_count == 1
+
+
+def test_rejected_early_refresh_is_postponed():
+    client = _client(access_expires_at=int(time.time()) + 10, refresh_margin=60)
+    client.oauth_client.refresh_access_token = MagicMock(
+        side_effect=errors.BadRequest(MagicMock(), {})
+    )
+
+    client.get("/me")
+    client.get("/me")
+
+    # Токен еще действует: запросы идут со старым, повтор — при истечении
+    client.oauth_client.refresh_access_token.assert_called_once()
+    assert client.access_token == "USER_OLD"
+
+
+def test_concurrent_threads_refresh_once():
+    client = _client(access_expires_at=0)
+    calls = []
+
+    def refresh(refresh_token):
+        calls.append(refresh_token)
+        time.sleep(0.05)
+        return _new_token()
+
+    client.oauth_client.refresh_access_token = refresh
+    threads = [
+        threading.Thread(target=client.ensure_fresh_token) for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["refresh_old"]
+    assert client.access_token == "USER_NEW1"
+
+
+def test_process_picks_up_token_refreshed_by_another(tmp_path):
+    config_file = tmp_path / "config.json"
+    Config(config_file).save(
+        token={
+            "access_token": "USER_OLD",
+            "refresh_token": "refresh_old",
+            "access_expires_at": 0,
+        }
+    )
+    lock_path = tmp_path / "token.lock"
+
+    # Два процесса с одним профилем: у каждого свой Config
+    first = _client(
+        access_expires_at=0,
+        token_broker=ConfigTokenBroker(Config(config_file), lock_path),
+    )
+    first.oauth_client.refresh_access_token = MagicMock(
+        return_value=_new_token()
+    )
+    second = _client(
+        access_expires_at=0,
+        token_broker=ConfigTokenBroker(Config(config_file), lock_path),
+    )
+    second.oauth_client.refresh_access_token = MagicMock()
+
+    first.refresh_access_token()
+    second.refresh_access_token()
+
+    second.oauth_client.refresh_access_token.assert_not_called()
+    assert second.get_access_token() == first.get_access_token()
+    assert Config(config_file)["token"]["refresh_token"] == "refresh_new1"
+
+
+def test_expired_token_is_refreshed_before_request_by_default():
+    client = _client(access_expires_at=int(time.time()) + 10)
+    client.oauth_client.refresh_access_token = MagicMock(
+        return_value=_new_token()
+    )
+
+    client.get("/me")
+    client.oauth_client.refresh_access_token.assert_not_called()
+
+    client.access_expires_at = 0
+    client.get("/me")
+    client.oauth_client.refresh_access_token.assert_called_once()
+
+
+def test_broker_reloads_only_token_and_saves_atomically(tmp_path):
+    config_file = tmp_path / "config.json"
+    config = Config(config_file)
+    config.save(token={"access_token": "USER_OLD"}, api_delay=1)
+    broker = ConfigTokenBroker(config, tmp_path / "token.lock")
+
+    other = Config(config_file)
+    other.save(token=_new_token(), api_delay=5)
+    config["user_agent"] = "local"
+
+    assert broker.load()["access_token"] == "USER_NEW1"
+    assert config["api_delay"] == 1
+    assert config["user_agent"] == "local"
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
@@ -12,6 +12,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from hh_applicant_tool.api.negotiations_sync import NegotiationsSync
 from hh_applicant_tool.storage import StorageFacade
 from hh_applicant_tool.ui.api import Api
 
@@ -227,7 +228,7 @@ class TestErrorMessages:
     """Клиентский код не должен получать внутренние детали исключений."""
 
     def test_refresh_negotiations_generic_message(self, api, mock_tool):
-        mock_tool.get_negotiations.side_effect = Exception(
+        mock_tool.negotiations_sync.sync.side_effect = Exception(
             "internal path /etc/secret leaked"
         )
         result = api.refresh_negotiations("active")
@@ -441,7 +442,15 @@ class TestRefreshNegotiations:
             },
             "tags": [],
         }
-        mock_tool.get_negotiations.return_value = [item1, item2]
+        mock_tool.api_client.get.return_value = {
+            "items": [item1, item2],
+            "pages": 1,
+        }
+        mock_tool.negotiations_sync = NegotiationsSync(
+            mock_tool.api_client,
+            mock_tool.storage.negotiations,
+            mock_tool.storage.settings,
+        )
 
         result = api.refresh_negotiations()
 
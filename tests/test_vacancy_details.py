@@ -0,0 +1,111 @@
+"""Тесты кеша полных данных вакансий."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from hh_applicant_tool.api.vacancy_details import VacancyDetailStore
+from hh_applicant_tool.operations.apply_vacancies import Operation
+from hh_applicant_tool.storage.facade import StorageFacade
+
+FULL_VACANCY = {
+    "id": "100",
+    "name": "Python developer",
+    "description": "<p>Пишем на Python &amp; Go</p><ul><li>open space</li></ul>",
+    "key_skills": [{"name": "Python"}, {"name": "SQL"}],
+    "published_at": "2026-10-01T10:00:00+0300",
+}
+
+SEARCH_ITEM = {
+    "id": "100",
+    "name": "Python developer",
+    "alternate_url": "https://hh.ru/vacancy/100",
+    "published_at": "2026-10-01T10:00:00+0300",
+    "snippet": {},
+}
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:"))
+
+
+@pytest.fixture
+def client() -> MagicMock:
+    client = MagicMock()
+    client.get.return_value = FULL_VACANCY
+    return client
+
+
+def test_normalizes_and_memoizes(storage, client):
+    store = VacancyDetailStore(client, storage.vacancy_details)
+
+    detail = store.get(SEARCH_ITEM)
+    assert store.get(SEARCH_ITEM) is detail
+
+    assert detail.key_skills == ["Python", "SQL"]
+    assert "<" not in detail.description
+    assert "Python & Go" in detail.description
+    client.get.assert_called_once_with("/vacancies/100")
+
+
+def test_saved_copy_is_used_by_next_run(storage, client):
+    VacancyDetailStore(client, storage.vacancy_details).get(SEARCH_ITEM)
+    client.get.reset_mock()
+
+    detail = VacancyDetailStore(client, storage.vacancy_details).get(
+        SEARCH_ITEM
+    )
+
+    assert detail.key_skills == ["Python", "SQL"]
+    client.get.assert_not_called()
+
+
+def test_republished_or_expired_vacancy_is_refetched(storage, client):
+    VacancyDetailStore(client, storage.vacancy_details).get(SEARCH_ITEM)
+    client.get.reset_mock()
+
+    republished = SEARCH_ITEM | {"published_at": "2026-10-10T10:00:00+0300"}
+    VacancyDetailStore(client, storage.vacancy_details).get(republished)
+    assert client.get.call_count == 1
+
+    saved = storage.vacancy_details.get(100)
+    saved.fetched_at = datetime.now() - timedelta(days=30)
+    storage.vacancy_details.save(saved)
+    VacancyDetailStore(client, storage.vacancy_details).get(FULL_VACANCY)
+    assert client.get.call_count == 2
+
+
+def test_cached_does_not_fetch(storage, client):
+    store = VacancyDetailStore(client, storage.vacancy_details)
+    assert store.cached(SEARCH_ITEM) is None
+    client.get.assert_not_called()
+
+    store.get(SEARCH_ITEM)
+    assert store.cached(SEARCH_ITEM).key_skills == ["Python", "SQL"]
+    assert VacancyDetailStore(client, storage.vacancy_details).cached(
+        SEARCH_ITEM
+    ).key_skills == ["Python", "SQL"]
+    client.get.assert_called_once()
+
+
+def test_filters_share_one_request(storage, client):
+    op = Operation()
+    op.tool = MagicMock()
+    op.tool.vacancy_details = VacancyDetailStore(
+        client, storage.vacancy_details
+    )
+    op.excluded_filter = r"open\s*space"
+
+    assert op._is_excluded(SEARCH_ITEM)
+    context = op._build_vacancy_context(SEARCH_ITEM, include_full=True)
+    key_skills = op._get_vacancy_key_skills(SEARCH_ITEM)
+
+    assert "Пишем на Python" in context
+    assert key_skills == "Python, SQL"
+    client.get.assert_called_once()
+    op.tool.session.get.assert_not_called()
@@ -0,0 +1,95 @@
+"""Тесты отложенной записи в базу."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+
+import pytest
+
+from hh_applicant_tool.storage.facade import StorageFacade
+from hh_applicant_tool.storage.repositories.errors import RepositoryError
+
+
+@pytest.fixture
+def storage() -> StorageFacade:
+    return StorageFacade(sqlite3.connect(":memory:"), buffer_rows=3)
+
+
+def _skipped(vacancy_id: int, reason: str = "test") -> dict:
+    return {"resume_id": "r1", "vacancy_id": vacancy_id, "reason": reason}
+
+
+def test_rows_are_written_in_one_transaction(storage):
+    statements = []
+    storage.settings.conn.set_trace_callback(statements.append)
+
+    storage.buffer.save(storage.skipped_vacancies, _skipped(1))
+    storage.buffer.save(storage.settings, {"key": "a", "value": "1"})
+    assert storage.skipped_vacancies.count_total() == 0
+    assert len(storage.buffer) == 2
+
+    storage.buffer.save(storage.skipped_vacancies, _skipped(2))
+
+    assert len(storage.buffer) == 0
+    assert storage.skipped_vacancies.vacancy_ids("r1") == {1, 2}
+    assert storage.settings.get_value("a") == "1"
+    assert [s for s in statements if s in ("BEGIN IMMEDIATE", "COMMIT")] == [
+        "BEGIN IMMEDIATE",
+        "COMMIT",
+    ]
+
+
+def test_flush_by_delay_and_explicitly(storage):
+    storage.buffer.max_delay = 0
+    storage.buffer.save(storage.skipped_vacancies, _skipped(1))
+    assert storage.skipped_vacancies.count_total() == 1
+
+    storage.buffer.max_delay = 60
+    storage.buffer.save(storage.skipped_vacancies, _skipped(2))
+    assert storage.flush() == 1
+    assert storage.flush() == 0
+    assert storage.skipped_vacancies.count_total() == 2
+
+
+def test_flush_by_timer_without_new_saves():
+    storage = StorageFacade(
+        sqlite3.connect(":memory:", check_same_thread=False),
+        buffer_delay=0.05,
+    )
+
+    storage.buffer.save(storage.skipped_vacancies, _skipped(1))
+    assert storage.skipped_vacancies.count_total() == 0
+
+    deadline = time.monotonic() + 2
+    while len(storage.buffer) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage.skipped_vacancies.count_total() == 1
+
+
+def test_bad_row_does_not_lose_batch(storage):
+    storage.buffer.save(storage.skipped_vacancies, _skipped(1))
+    storage.buffer.save(storage.skipped_vacancies, _skipped(None))
+
+    storage.flush()
+
+    assert storage.skipped_vacancies.vacancy_ids("r1") == {1}
+    assert not storage.skipped_vacancies.conn.in_transaction
+
+
+def test_locked_database_keeps_rows(tmp_path):
+    path = tmp_path / "data.db"
+    storage = StorageFacade(sqlite3.connect(path, timeout=0.05))
+    storage.buffer.max_delay = 60
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+
+    storage.buffer.save(storage.skipped_vacancies, _skipped(1))
+    storage.buffer.save(storage.skipped_vacancies, _skipped(2))
+    with pytest.raises(RepositoryError, match="locked"):
+        storage.flush()
+    assert len(storage.buffer) == 2
+
+    other.rollback()
+    assert storage.flush() == 2
+    assert storage.skipped_vacancies.vacancy_ids("r1") == {1, 2}